@@ -0,0 +1,201 @@
+"""
+Arsip ZIP sebagai folder virtual.
+
+Rumah sakit sering mengirim dokumen tambahan sebagai arsip ZIP. Sebelumnya arsip harus diekstrak ke disk lebih
+dulu, sehingga file multi-GB ditulis lalu dibaca ulang sebelum penggabungan dimulai. Kini pemindai membaca daftar
+entri arsip (central directory, tanpa dekompresi) dan setiap entri .pdf mendapat path virtual
+<path arsip>/<folder dalam arsip>/<nama>.pdf, mis. D:\\Kiriman\\lab.zip\\2024\\x_1.pdf. Entri dibaca langsung
+dari arsip ke memori lalu dibuka dengan fitz.open(stream=...), tanpa file sementara.
+
+Semua akses file input (ukuran/mtime, baca isi, hash) memakai stat_path, read_bytes dan open_binary dari modul
+ini, yang meneruskan path biasa ke os.stat/open. Ukuran entri adalah ukuran setelah dekompresi; mtime entri
+adalah mtime arsipnya, sehingga arsip yang diganti membuat semua entrinya dianggap berubah (manifest, cache hash
+dan cache validasi).
+
+Handle ZipFile disimpan per proses agar central directory tidak diurai ulang untuk setiap entri; panggil
+close_archives() setelah proses selesai agar arsip tidak terkunci (Windows) di antara proses atau putaran pantau.
+ZipFile aman dibaca dari beberapa thread (validasi dan baca di muka) untuk entri yang berbeda, tetapi tidak dari
+beberapa proses: proses pekerja hasil fork (Linux) melupakan handle warisan dan membuka arsipnya sendiri.
+"""
+import os
+import threading
+import zipfile
+import zlib
+from collections import namedtuple
+
+ARCHIVE_SUFFIX = '.zip'
+
+# Pengganti os.stat_result untuk entri arsip; hanya atribut yang dipakai manifest dan cache.
+ArchiveMemberStat = namedtuple('ArchiveMemberStat', ['st_size', 'st_mtime_ns'])
+
+_open_archives = {} # path arsip -> (ukuran, mtime_ns, ZipFile)
+_archives_lock = threading.Lock()
+_inherited_archives = [] # Handle warisan proses induk di proses anak hasil fork; lihat _forget_inherited_archives
+
+# Galat dekompresi entri (stream deflate rusak, entri terpotong, metode kompresi tidak didukung seperti Deflate64
+# buatan Windows, entri terenkripsi) yang diubah menjadi OSError agar entri dilaporkan tidak valid dan dilewati.
+_MEMBER_READ_ERRORS = (zipfile.BadZipFile, RuntimeError, zlib.error, EOFError, NotImplementedError)
+
+
+def is_archive_name(name):
+    return name.lower().endswith(ARCHIVE_SUFFIX)
+
+
+def is_source_folder(path):
+    """
+    True bila path adalah folder, atau arsip ZIP yang dipakai sebagai folder sumber.
+    """
+    return bool(path) and (os.path.isdir(path) or (is_archive_name(path) and os.path.isfile(path)))
+
+
+def split_archive_path(path):
+    """
+    (path_arsip, nama_entri) bila path menunjuk ke entri di dalam arsip ZIP, selain itu None.
+    """
+    marker = ARCHIVE_SUFFIX + os.sep
+    lowered = path.lower()
+    start = lowered.find(marker)
+    while start != -1:
+        archive_path = path[:start + len(ARCHIVE_SUFFIX)]
+        if os.path.isfile(archive_path):
+            return archive_path, path[start + len(marker):].replace(os.sep, '/')
+        start = lowered.find(marker, start + 1) # Folder biasa yang namanya berakhiran .zip
+    return None
+
+
+def _open_archive(archive_path):
+    """
+    (ZipFile, os.stat_result arsip); handle dipakai ulang selama ukuran dan mtime arsip tidak berubah.
+    """
+    stat_result = os.stat(archive_path)
+    with _archives_lock:
+        cached = _open_archives.get(archive_path)
+        if cached is not None and cached[:2] == (stat_result.st_size, stat_result.st_mtime_ns):
+            return cached[2], stat_result
+        if cached is not None:
+            cached[2].close()
+        try:
+            archive = zipfile.ZipFile(archive_path)
+        except zipfile.BadZipFile as e:
+            raise OSError(f"arsip ZIP rusak: {e}") from e
+        _open_archives[archive_path] = (stat_result.st_size, stat_result.st_mtime_ns, archive)
+        return archive, stat_result
+
+
+def _member_info(archive, member):
+    try:
+        return archive.getinfo(member)
+    except KeyError:
+        pass
+    try:
+        return archive.getinfo(member.replace('/', '\\')) # Arsip buatan Windows yang memakai pemisah '\'
+    except KeyError:
+        raise FileNotFoundError(f"entri '{member}' tidak ada di arsip") from None
+
+
+def iter_archive_pdfs(archive_path):
+    """
+    (path virtual, nama) untuk setiap entri .pdf di arsip, sesuai urutan di arsip. Entri terenkripsi dan entri
+    dengan nama tidak aman ('..', path absolut) dilewati. Arsip yang tidak bisa dibuka menghasilkan daftar kosong.
+    """
+    try:
+        archive, _ = _open_archive(archive_path)
+    except OSError:
+        return []
+    pdf_files = []
+    for info in archive.infolist():
+        if info.is_dir() or info.flag_bits & 0x1 or not info.filename.lower().endswith('.pdf'):
+            continue
+        parts = info.filename.replace('\\', '/').split('/')
+        if any(part in ('', '.', '..') for part in parts):
+            continue
+        pdf_files.append((os.path.join(archive_path, *parts), parts[-1]))
+    return pdf_files
+
+
+def stat_path(path):
+    """
+    os.stat untuk path biasa; untuk entri arsip, ukuran entri (setelah dekompresi) dan mtime arsipnya.
+    """
+    location = split_archive_path(path)
+    if location is None:
+        return os.stat(path)
+    archive, archive_stat = _open_archive(location[0])
+    return ArchiveMemberStat(_member_info(archive, location[1]).file_size, archive_stat.st_mtime_ns)
+
+
+def read_bytes(path):
+    location = split_archive_path(path)
+    if location is None:
+        with open(path, 'rb') as f:
+            return f.read()
+    archive, _ = _open_archive(location[0])
+    try:
+        return archive.read(_member_info(archive, location[1]))
+    except _MEMBER_READ_ERRORS as e:
+        raise OSError(f"entri arsip tidak bisa dibaca: {e}") from e
+
+
+def open_binary(path):
+    """
+    File-like biner untuk dibaca berurutan (mis. hash per potongan). Galat dekompresi entri arsip saat membaca
+    juga dilaporkan sebagai OSError.
+    """
+    location = split_archive_path(path)
+    if location is None:
+        return open(path, 'rb')
+    archive, _ = _open_archive(location[0])
+    try:
+        return _ArchiveMemberReader(archive.open(_member_info(archive, location[1])))
+    except _MEMBER_READ_ERRORS as e:
+        raise OSError(f"entri arsip tidak bisa dibuka: {e}") from e
+
+
+class _ArchiveMemberReader:
+    """
+    Pembungkus ZipExtFile yang mengubah galat dekompresi menjadi OSError.
+    """
+    def __init__(self, member_file):
+        self._member_file = member_file
+
+    def read(self, size=-1):
+        try:
+            return self._member_file.read(size)
+        except _MEMBER_READ_ERRORS as e:
+            raise OSError(f"entri arsip tidak bisa dibaca: {e}") from e
+
+    def close(self):
+        self._member_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _forget_inherited_archives():
+    """
+    Dipanggil di proses anak setelah fork. ZipFile warisan berbagi file descriptor (dan posisi baca) dengan proses
+    induk dan pekerja lain, sehingga seek/read dari beberapa proses saling menimpa dan isi entri rusak. Handle itu
+    tidak ditutup (kunci internalnya bisa sedang dipegang thread induk saat fork) tetapi disimpan agar tidak dipakai
+    lagi; proses anak membuka arsipnya sendiri.
+    """
+    global _open_archives, _archives_lock
+    _inherited_archives.extend(archive for _, _, archive in _open_archives.values())
+    _open_archives = {}
+    _archives_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'): # Tidak ada di Windows; proses pekerja di sana dibuat dengan spawn
+    os.register_at_fork(after_in_child=_forget_inherited_archives)
+
+
+def close_archives():
+    """
+    Menutup semua handle arsip milik proses ini.
+    """
+    with _archives_lock:
+        for _, _, archive in _open_archives.values():
+            archive.close()
+        _open_archives.clear()
@@ -0,0 +1,114 @@
+"""
+Cache LRU dokumen lampiran yang sudah diurai (fitz.Document) di dalam satu proses.
+
+Sebagian file tambahan (formulir persetujuan standar, kop surat rumah sakit, lembar tarif) disisipkan ke ratusan
+file utama yang berbeda. Tanpa cache, merge_pair membuka dan mengurai ulang file yang sama untuk setiap pasangan;
+dengan AttachmentCache dokumen seperti itu diurai sekali per proses lalu dipakai ulang lewat insert_pdf.
+
+Dokumen dibuka dari bytes (bukan dari path) agar cache tidak menahan handle file, yang di Windows akan mengunci
+file di share. Kunci cache adalah path + ukuran + mtime, sehingga file yang diganti di tengah proses (mis. mode
+pantau) dibuka ulang. Batas memori dihitung dari ukuran file yang ditahan (perkiraan; objek hasil urai MuPDF
+tidak ikut dihitung), dan dokumen yang paling lama tidak dipakai ditutup lebih dulu.
+
+Cache tidak thread-safe: merge_pair dalam satu proses selalu dipanggil dari satu thread (thread MergeEngine
+dalam mode serial, atau proses pekerja dalam mode paralel), dan setiap proses pekerja memiliki cache sendiri.
+"""
+import collections
+
+try:
+    import pymupdf as fitz  # PyMuPDF; modul 'fitz' versi baru mencetak peringatan deprecation ke stdout
+except ImportError:
+    import fitz  # PyMuPDF versi lama (sebelum 1.24.3)
+
+from archives import read_bytes, stat_path
+
+
+class AttachmentCache:
+    """
+    Cache LRU dengan batas max_bytes. Dokumen dari open() dengan owned=True milik cache dan tidak boleh ditutup
+    pemanggil; file yang lebih besar dari batas tetap dibuka tetapi tidak disimpan (owned=False).
+
+    Statistik: hits (dipakai ulang), misses (diurai), evictions (dikeluarkan karena batas memori atau file berubah),
+    bytes_saved (byte file yang tidak perlu dibaca dan diurai ulang).
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = collections.OrderedDict() # path -> (ukuran, mtime_ns, dokumen)
+        self._held_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+
+    def _evict(self, path):
+        size, _, doc = self._entries.pop(path)
+        self._held_bytes -= size
+        self.evictions += 1
+        doc.close()
+
+    def open(self, path, data=None):
+        """
+        Mengembalikan (dokumen, ukuran_byte, owned). owned True berarti dokumen disimpan di cache dan tidak boleh
+        ditutup pemanggil. data (bytes hasil baca di muka) dipakai bila dokumen belum ada di cache.
+        """
+        stat_result = stat_path(path)
+        cached = self._entries.get(path)
+        if cached is not None:
+            if cached[0] == stat_result.st_size and cached[1] == stat_result.st_mtime_ns:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                self.bytes_saved += cached[0]
+                return cached[2], cached[0], True
+            self._evict(path)
+
+        self.misses += 1
+        if data is None:
+            data = read_bytes(path)
+        doc = fitz.open(stream=data, filetype="pdf")
+        size = len(data)
+        if size > self.max_bytes:
+            return doc, size, False
+        while self._entries and self._held_bytes + size > self.max_bytes:
+            self._evict(next(iter(self._entries)))
+        self._entries[path] = (size, stat_result.st_mtime_ns, doc)
+        self._held_bytes += size
+        return doc, size, True
+
+    def clear(self):
+        for path in list(self._entries):
+            self._evict(path)
+        self.evictions = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'bytes_saved': self.bytes_saved,
+        }
+
+
+_process_cache = None
+
+
+def get_attachment_cache(max_bytes):
+    """
+    Cache milik proses ini (dibuat sekali, atau dibuat ulang bila batasnya berubah).
+    """
+    global _process_cache
+    if _process_cache is None or _process_cache.max_bytes != max_bytes:
+        if _process_cache is not None:
+            _process_cache.clear()
+        _process_cache = AttachmentCache(max_bytes)
+    return _process_cache
+
+
+def clear_attachment_cache():
+    """
+    Menutup semua dokumen di cache proses ini (dipanggil MergeEngine setelah proses selesai agar GUI yang tetap
+    terbuka tidak menahan memori).
+    """
+    global _process_cache
+    if _process_cache is not None:
+        _process_cache.clear()
+        _process_cache = None
@@ -0,0 +1,236 @@
+"""
+Benchmark penggabungan PDF dengan korpus casemix sintetis yang dapat direproduksi.
+
+Korpus dibuat dengan PyMuPDF: N file utama, M file tambahan per prefiks dengan penamaan campuran
+('_1', ' (2)', ' 3'), jumlah halaman bervariasi, dan sebagian halaman berupa gambar hasil "scan".
+Tahap pindai, cocokkan dan gabung diukur lewat MergeEngine (logika yang sama dengan PdfMergerThread),
+lalu hasilnya disimpan ke JSON agar bisa dibandingkan antarversi.
+
+Contoh:
+    python benchmark.py --corpus /tmp/korpus --primaries 500 --additionals 3 --output hasil_baru.json
+    python benchmark.py --corpus /tmp/korpus --primaries 500 --additionals 3 --compare hasil_lama.json
+"""
+import sys
+import os
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+
+try:
+    import pymupdf as fitz  # PyMuPDF; modul 'fitz' versi baru mencetak peringatan deprecation ke stdout
+except ImportError:
+    import fitz  # PyMuPDF versi lama (sebelum 1.24.3)
+
+from scanner import extract_prefix_and_number, iter_pdf_files
+from merge_core import MergeEngine, SAVE_PROFILES, DEFAULT_SAVE_PROFILE
+
+CORPUS_PARAMS_FILENAME = "korpus.json"
+NAME_STYLES = ("_{n}", " ({n})", " {n}")
+
+
+def _make_pdf(path, page_count, image_pages, rng, label):
+    """
+    Membuat satu PDF: halaman teks biasa, dan image_pages halaman berisi gambar JPEG derau acak
+    (sulit dikompresi, mirip hasil scan kamera/scanner).
+    """
+    doc = fitz.open()
+    for page_number in range(page_count):
+        page = doc.new_page()
+        if page_number < image_pages:
+            width, height = rng.choice(((850, 1100), (1240, 1754)))
+            pixmap = fitz.Pixmap(fitz.csGRAY, width, height, rng.randbytes(width * height), False)
+            page.insert_image(page.rect, stream=pixmap.tobytes("jpeg", jpg_quality=rng.randint(60, 90)))
+        else:
+            page.insert_text((72, 72), f"{label} halaman {page_number + 1}", fontsize=14)
+            page.insert_text((72, 100), " ".join(f"{rng.random():.6f}" for _ in range(8)), fontsize=9)
+    doc.save(path, garbage=1, deflate=True)
+    doc.close()
+
+
+def generate_corpus(root, primaries, additionals, min_pages, max_pages, image_ratio, seed):
+    """
+    Membuat korpus di root/utama dan root/tambahan. Korpus yang sudah ada dengan parameter yang sama dipakai ulang.
+    Mengembalikan (folder_utama, folder_tambahan).
+    """
+    params = {
+        'primaries': primaries, 'additionals': additionals, 'min_pages': min_pages,
+        'max_pages': max_pages, 'image_ratio': image_ratio, 'seed': seed,
+    }
+    primary_folder = os.path.join(root, "utama")
+    additional_folder = os.path.join(root, "tambahan")
+    params_path = os.path.join(root, CORPUS_PARAMS_FILENAME)
+    try:
+        with open(params_path, 'r', encoding='utf-8') as f:
+            if json.load(f) == params:
+                return primary_folder, additional_folder
+    except (OSError, ValueError):
+        pass
+
+    shutil.rmtree(primary_folder, ignore_errors=True)
+    shutil.rmtree(additional_folder, ignore_errors=True)
+    os.makedirs(primary_folder)
+    os.makedirs(additional_folder)
+
+    rng = random.Random(seed)
+    for index in range(primaries):
+        prefix = f"{rng.randrange(10**12, 10**13)}-SEP{index:05d}"
+        # Sebagian klaim disimpan di subfolder sendiri, seperti struktur share di rumah sakit.
+        claim_folder = additional_folder
+        if rng.random() < 0.5:
+            claim_folder = os.path.join(additional_folder, f"klaim_{index // 100:03d}")
+            os.makedirs(claim_folder, exist_ok=True)
+
+        _make_pdf(os.path.join(primary_folder, f"{prefix}.pdf"),
+                  rng.randint(min_pages, max_pages), 0, rng, prefix)
+        for number in range(1, additionals + 1):
+            page_count = rng.randint(min_pages, max_pages)
+            image_pages = sum(1 for _ in range(page_count) if rng.random() < image_ratio)
+            name = prefix + rng.choice(NAME_STYLES).format(n=number) + ".pdf"
+            _make_pdf(os.path.join(claim_folder, name), page_count, image_pages, rng, name)
+
+    with open(params_path, 'w', encoding='utf-8') as f:
+        json.dump(params, f, indent=1)
+    return primary_folder, additional_folder
+
+
+def bench_filename_parsing(folders, repeat):
+    """
+    Mengukur extract_prefix_and_number pada semua nama file korpus (detik per seluruh korpus, nilai terbaik).
+    """
+    names = [name for folder in folders for _, name in iter_pdf_files(folder)]
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for name in names:
+            extract_prefix_and_number(name)
+        timings.append(time.perf_counter() - start)
+    return {'files': len(names), 'best_seconds': min(timings)}
+
+
+def bench_engine(primary_folder, additional_folder, jobs, save_profile, streaming, repeat):
+    """
+    Menjalankan MergeEngine penuh (tanpa manifest inkremental) sebanyak repeat kali ke folder output sementara
+    dan mengembalikan median waktu per tahap.
+    """
+    runs = []
+    for _ in range(repeat):
+        output_folder = tempfile.mkdtemp(prefix="penggabung-bench-")
+        try:
+            engine = MergeEngine(primary_folder, additional_folder, jobs=jobs, incremental=False,
+                                 save_profile=save_profile, streaming=streaming, output_folder=output_folder)
+            start = time.perf_counter()
+            success, message, _ = engine.run()
+            total_seconds = time.perf_counter() - start
+            if not success:
+                raise RuntimeError(message)
+            runs.append(dict(engine.stage_seconds, total=total_seconds,
+                             output_bytes=engine.total_output_bytes, pairs=engine.merged_pairs_count))
+        finally:
+            shutil.rmtree(output_folder, ignore_errors=True)
+
+    stages = ('scan', 'match', 'merge', 'total')
+    result = {stage: statistics.median(run[stage] for run in runs) for stage in stages}
+    result['pairs'] = runs[0]['pairs']
+    result['output_bytes'] = runs[0]['output_bytes']
+    result['pairs_per_second'] = result['pairs'] / result['total'] if result['total'] else 0.0
+    return result
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare_results(current, baseline, threshold_percent):
+    """
+    Membandingkan waktu per tahap dengan hasil sebelumnya. Mengembalikan daftar (tahap, lama, baru, persen, regresi).
+    Tahap di bawah 10 ms diabaikan dari deteksi regresi karena terlalu bising.
+    """
+    rows = []
+    for section in ('parsing', 'engine'):
+        for key, new_value in current[section].items():
+            old_value = baseline.get(section, {}).get(key)
+            if not key.endswith(('seconds', 'scan', 'match', 'merge', 'total')) or not isinstance(old_value, (int, float)):
+                continue
+            change = ((new_value - old_value) / old_value * 100) if old_value else 0.0
+            is_regression = change > threshold_percent and max(old_value, new_value) >= 0.01
+            rows.append((f"{section}.{key}", old_value, new_value, change, is_regression))
+    return rows
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark penggabungan PDF dengan korpus sintetis.")
+    parser.add_argument("--corpus", default=os.path.join(tempfile.gettempdir(), "penggabung-korpus"),
+                        help="Folder korpus (dibuat ulang bila parameternya berubah).")
+    parser.add_argument("--primaries", type=int, default=200, help="Jumlah file utama (prefiks).")
+    parser.add_argument("--additionals", type=int, default=3, help="Jumlah file tambahan per prefiks.")
+    parser.add_argument("--min-pages", type=int, default=1)
+    parser.add_argument("--max-pages", type=int, default=6)
+    parser.add_argument("--image-ratio", type=float, default=0.3,
+                        help="Proporsi halaman file tambahan yang berupa gambar scan (0-1).")
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--save-profile", choices=sorted(SAVE_PROFILES), default=DEFAULT_SAVE_PROFILE)
+    parser.add_argument("--streaming", action="store_true")
+    parser.add_argument("--repeat", type=int, default=3, help="Jumlah pengulangan; median yang dilaporkan.")
+    parser.add_argument("--output", default=None, help="Simpan hasil ke file JSON ini.")
+    parser.add_argument("--compare", default=None, help="Bandingkan dengan file hasil JSON sebelumnya.")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Persentase perlambatan yang dianggap regresi (bawaan: 10).")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    print(f"Menyiapkan korpus di '{args.corpus}'...", file=sys.stderr)
+    primary_folder, additional_folder = generate_corpus(
+        args.corpus, args.primaries, args.additionals, args.min_pages, args.max_pages, args.image_ratio, args.seed)
+
+    print("Mengukur penguraian nama file...", file=sys.stderr)
+    parsing = bench_filename_parsing([primary_folder, additional_folder], max(args.repeat, 5))
+    print("Mengukur pindai/cocokkan/gabung...", file=sys.stderr)
+    engine = bench_engine(primary_folder, additional_folder, args.jobs, args.save_profile, args.streaming, args.repeat)
+
+    result = {
+        'revision': _git_revision(),
+        'timestamp': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'python': platform.python_version(),
+        'pymupdf': getattr(fitz, 'VersionBind', ''),
+        'platform': platform.platform(),
+        'params': {key: value for key, value in vars(args).items() if key not in ('output', 'compare', 'threshold')},
+        'parsing': parsing,
+        'engine': engine,
+    }
+    print(json.dumps(result, indent=1))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=1)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('params') != result['params']:
+            print("Peringatan: parameter benchmark berbeda dengan hasil pembanding.", file=sys.stderr)
+        rows = compare_results(result, baseline, args.threshold)
+        regressions = 0
+        print(f"\nPerbandingan dengan {baseline.get('revision') or args.compare}:", file=sys.stderr)
+        for name, old_value, new_value, change, is_regression in rows:
+            marker = "  <-- REGRESI" if is_regression else ""
+            print(f"{name:24s} {old_value:10.4f} -> {new_value:10.4f} detik ({change:+6.1f}%){marker}", file=sys.stderr)
+            regressions += is_regression
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+Mode baris perintah (headless) untuk penggabungan PDF, memakai MergeEngine yang sama dengan GUI.
+
+Contoh:
+    python penggabung.py --primary X --additional Y --out Z --jobs 4
+    python penggabung.py --primary SEP --additional RESUME --additional BILLING --additional LAB
+
+Log dan kemajuan ditulis ke stderr; ringkasan akhir ditulis ke stdout sebagai JSON, atau ke file bila
+--summary-json diberikan. Skrip lain sebaiknya memakai --summary-json: file itu hanya berisi ringkasan, sedangkan
+stdout juga bisa berisi keluaran pustaka lain (mis. peringatan PyMuPDF).
+"""
+import sys
+import os
+import json
+import signal
+import argparse
+import datetime
+import functools
+import multiprocessing
+
+from settings import (SAVE_PROFILES, DEFAULT_SAVE_PROFILE, DEFAULT_IMAGE_QUALITY, DEDUP_MODES, DEFAULT_PREFETCH_PAIRS,
+                      DEFAULT_PREFETCH_MEMORY_MB, DEFAULT_ATTACHMENT_CACHE_MB, PRIMARY_POLICIES, DEFAULT_PRIMARY_POLICY)
+from matching import DEFAULT_RULE_SET, RULES_DIR, available_rule_sets
+from plan import MergePlan
+from watcher import DEFAULT_WATCH_QUIET_SECONDS, DEFAULT_WATCH_POLL_SECONDS, WatchDaemon
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="penggabung",
+        description="Menggabungkan file PDF utama dengan file tambahan yang memiliki prefiks nama yang sama.",
+    )
+    parser.add_argument("--primary", help="Folder Utama PDF atau arsip ZIP (wajib, kecuali dengan --list-match-rules).")
+    parser.add_argument("--additional", action="append", default=[],
+                        help="Folder Tambahan PDF (atau arsip ZIP). Boleh diulang (mis. SEP, resume medis, billing, lab); "
+                             "file tambahan digabungkan per folder sesuai urutan argumen.")
+    parser.add_argument("--primary-policy", choices=PRIMARY_POLICIES, default=DEFAULT_PRIMARY_POLICY,
+                        help="Bila satu prefiks memiliki beberapa File Utama: first (pakai satu, bawaan), "
+                             "separate (satu output per File Utama) atau combine (gabungkan ke satu output).")
+    parser.add_argument("--out", default=None,
+                        help="Folder output. Bawaan: 'Hasil Penggabungan' di sebelah Folder Utama.")
+    parser.add_argument("--jobs", type=int, default=1, help="Jumlah proses paralel (bawaan: 1 = serial).")
+    parser.add_argument("--no-incremental", action="store_true",
+                        help="Gabungkan ulang semua pasangan meskipun input tidak berubah.")
+    parser.add_argument("--save-profile", choices=sorted(SAVE_PROFILES), default=DEFAULT_SAVE_PROFILE,
+                        help="Profil simpan: fast (cepat, file lebih besar), balanced, max (kompresi maksimal, bawaan).")
+    parser.add_argument("--verify-hash", action="store_true",
+                        help="Simpan dan periksa hash SHA-256 input di manifest.")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Mulai menggabungkan sambil memindai Folder Tambahan (untuk share jaringan besar).")
+    parser.add_argument("--no-concurrent-scan", action="store_true",
+                        help="Pindai Folder Utama dan Folder Tambahan secara berurutan, bukan bersamaan.")
+    parser.add_argument("--memory-limit-mb", type=int, default=0,
+                        help="Mode hemat memori: batas RSS per proses dalam MB (bawaan: 0 = tanpa batas).")
+    parser.add_argument("--image-dpi", type=int, default=0,
+                        help="Optimasi gambar scan: downsample gambar di atas DPI ini (bawaan: 0 = nonaktif).")
+    parser.add_argument("--image-quality", type=int, default=DEFAULT_IMAGE_QUALITY,
+                        help=f"Kualitas JPEG untuk gambar yang dikompresi ulang (bawaan: {DEFAULT_IMAGE_QUALITY}).")
+    parser.add_argument("--dedup", choices=DEDUP_MODES, default="off",
+                        help="Lewati lampiran duplikat: file (isi file sama persis) atau page "
+                             "(juga dokumen yang semua halamannya sudah ada). Bawaan: off.")
+    parser.add_argument("--prefetch-pairs", type=int, default=DEFAULT_PREFETCH_PAIRS,
+                        help=f"Jumlah pasangan berikutnya yang dibaca di muka ke memori (bawaan: {DEFAULT_PREFETCH_PAIRS}, 0 = nonaktif).")
+    parser.add_argument("--prefetch-memory-mb", type=int, default=DEFAULT_PREFETCH_MEMORY_MB,
+                        help=f"Batas memori untuk baca di muka dalam MB (bawaan: {DEFAULT_PREFETCH_MEMORY_MB}).")
+    parser.add_argument("--attachment-cache-mb", type=int, default=DEFAULT_ATTACHMENT_CACHE_MB,
+                        help=f"Batas cache lampiran bersama per proses dalam MB: file tambahan yang dipakai banyak "
+                             f"pasangan hanya diurai sekali. Setiap proses pekerja memiliki cache sendiri "
+                             f"(bawaan: {DEFAULT_ATTACHMENT_CACHE_MB} = nonaktif; mis. 128).")
+    parser.add_argument("--resume", action="store_true",
+                        help="Lanjutkan proses yang terhenti (ditutup, dibatalkan, atau listrik padam): "
+                             "pasangan yang tercatat selesai di jurnal checkpoint dilewati.")
+    parser.add_argument("--match-rules", default=DEFAULT_RULE_SET,
+                        help=f"Aturan pencocokan nama file: nama preset, nama file JSON di '{RULES_DIR}', "
+                             f"atau path file JSON (bawaan: {DEFAULT_RULE_SET}). Lihat --list-match-rules.")
+    parser.add_argument("--list-match-rules", action="store_true",
+                        help="Tampilkan aturan pencocokan yang tersedia lalu keluar.")
+    parser.add_argument("--no-prevalidate", action="store_true",
+                        help="Lewati validasi awal PDF (header, xref/trailer, enkripsi, jumlah halaman) sebelum menggabungkan.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Mode pratinjau: hanya pindai dan cocokkan (tanpa membuka PDF), tampilkan ringkasan pasangan.")
+    parser.add_argument("--plan-csv", default=None,
+                        help="Dengan --dry-run: tulis rencana pasangan ke file CSV ini agar bisa diperiksa/disunting.")
+    parser.add_argument("--from-plan", default=None,
+                        help="Gabungkan sesuai file CSV rencana (hasil --plan-csv yang sudah disunting) tanpa memindai ulang.")
+    parser.add_argument("--watch", action="store_true",
+                        help="Mode pantau: pantau Folder Utama dan Folder Tambahan dan gabungkan setiap klaim begitu "
+                             "file-nya tenang, sampai dihentikan dengan Ctrl+C.")
+    parser.add_argument("--watch-quiet", type=float, default=DEFAULT_WATCH_QUIET_SECONDS,
+                        help=f"Dengan --watch: detik tanpa perubahan sebelum pasangan digabungkan (bawaan: {DEFAULT_WATCH_QUIET_SECONDS}).")
+    parser.add_argument("--watch-poll", type=float, default=DEFAULT_WATCH_POLL_SECONDS,
+                        help=f"Dengan --watch: interval pindai ulang bila memakai polling (bawaan: {DEFAULT_WATCH_POLL_SECONDS}).")
+    parser.add_argument("--watch-polling", action="store_true",
+                        help="Dengan --watch: selalu pakai polling, bukan inotify (mis. untuk share jaringan).")
+    parser.add_argument("--timing-report", action="store_true",
+                        help="Tulis laporan waktu per tahap dan per pasangan (JSON dan CSV) ke folder output.")
+    parser.add_argument("--summary-json", default=None,
+                        help="Tulis ringkasan JSON ke file ini, bukan ke stdout (disarankan untuk skrip).")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="Jangan tampilkan log per file, hanya kemajuan dan ringkasan.")
+    return parser
+
+
+def _print_err(message):
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] {message}", file=sys.stderr, flush=True)
+
+
+def _dry_run(engine, args):
+    plan = engine.build_plan()
+    if plan is None:
+        _print_err("Folder Utama tidak ditemukan.")
+        return 1
+    if args.plan_csv:
+        plan.write_csv(args.plan_csv)
+        _print_err(f"Rencana ditulis ke: {args.plan_csv}")
+    summary = {
+        'dry_run': True,
+        'primary_folder': engine.primary_folder,
+        'additional_folder': engine.additional_folder,
+        'additional_folders': engine.additional_folders,
+        'primary_policy': engine.primary_policy,
+        'match_rules': engine.match_rules.name,
+        'pair_count': len(plan.pairs),
+        'additional_in_pairs': sum(len(additionals) for _, additionals in plan.pairs),
+        'skipped_primary_files': engine.skipped_primary_files,
+        'skipped_additional_files': engine.skipped_additional_files,
+        'unmatched_candidates': engine.unmatched_candidates,
+        'stage_seconds': {stage: round(seconds, 3) for stage, seconds in engine.stage_seconds.items()},
+        'plan_csv': args.plan_csv,
+    }
+    if args.summary_json:
+        with open(args.summary_json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+    else:
+        print(json.dumps(summary, ensure_ascii=False), flush=True)
+    return 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.list_match_rules:
+        for name, description in available_rule_sets():
+            print(f"{name:16s} {description}")
+        return 0
+    if not args.primary:
+        parser.error("argumen --primary wajib diisi")
+    if args.dry_run and args.from_plan:
+        parser.error("--dry-run dan --from-plan tidak bisa dipakai bersamaan")
+    if args.watch and (args.dry_run or args.from_plan):
+        parser.error("--watch tidak bisa dipakai bersama --dry-run atau --from-plan")
+
+    # Diimpor di sini agar --help dan --list-match-rules tidak perlu memuat PyMuPDF.
+    from merge_core import MergeEngine
+
+    plan = None
+    additional_folders = [os.path.abspath(folder) for folder in args.additional if folder]
+    additional_folder = additional_folders[0] if additional_folders else ""
+    try:
+        if args.from_plan:
+            plan = MergePlan.read_csv(args.from_plan, os.path.abspath(args.primary), additional_folder)
+        engine_options = dict(
+            jobs=args.jobs,
+            incremental=not args.no_incremental,
+            verify_hash=args.verify_hash,
+            save_profile=args.save_profile,
+            output_folder=os.path.abspath(args.out) if args.out else None,
+            concurrent_scan=not args.no_concurrent_scan,
+            streaming=args.streaming,
+            timing_report=args.timing_report,
+            memory_limit_mb=args.memory_limit_mb,
+            image_dpi=args.image_dpi,
+            image_quality=args.image_quality,
+            dedup=args.dedup,
+            prefetch_pairs=args.prefetch_pairs,
+            prefetch_memory_mb=args.prefetch_memory_mb,
+            attachment_cache_mb=args.attachment_cache_mb,
+            additional_folders=additional_folders,
+            primary_policy=args.primary_policy,
+            resume=args.resume,
+            match_rules=args.match_rules,
+            prevalidate=not args.no_prevalidate,
+            log_callback=None if args.quiet else _print_err,
+            status_callback=_print_err,
+        )
+        engine = MergeEngine(os.path.abspath(args.primary), additional_folder, plan=plan, **engine_options)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    if args.dry_run:
+        return _dry_run(engine, args)
+
+    if args.watch:
+        # Setiap putaran membuat MergeEngine baru dengan opsi yang sama (dan rencana berisi pasangan yang siap).
+        runner = WatchDaemon(engine.primary_folder, engine.additional_folder,
+                             functools.partial(MergeEngine, engine.primary_folder, engine.additional_folder,
+                                               **engine_options),
+                             engine.match_rules, quiet_seconds=args.watch_quiet, poll_seconds=args.watch_poll,
+                             force_polling=args.watch_polling, output_folder=engine.output_folder_path,
+                             log_callback=engine_options['log_callback'], status_callback=_print_err,
+                             additional_folders=engine.additional_folders)
+        cancel = runner.stop
+    else:
+        runner = engine
+        cancel = engine.cancel
+
+    def request_cancel(signum, frame):
+        # Ctrl+C pertama: berhenti dengan bersih setelah pasangan yang sedang diproses; Ctrl+C kedua: hentikan paksa.
+        _print_err("Pembatalan diminta: menunggu pasangan yang sedang diproses selesai (Ctrl+C lagi untuk menghentikan paksa)...")
+        cancel()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    signal.signal(signal.SIGINT, request_cancel)
+    if args.watch and hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, request_cancel) # Mode pantau biasanya dijalankan sebagai layanan
+    success, message, _ = runner.run()
+
+    summary = runner.summary()
+    summary['success'] = success
+    summary['message'] = message
+    if args.summary_json:
+        with open(args.summary_json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+    else:
+        print(json.dumps(summary, ensure_ascii=False), flush=True)
+
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
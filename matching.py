@@ -0,0 +1,261 @@
+"""
+Aturan pencocokan nama file yang bisa dikonfigurasi per rumah sakit.
+
+Aturan bawaan sama persis dengan extract_prefix_and_number: prefiks sebelum '_angka', ' (angka)' atau ' angka'.
+Rumah sakit yang menamai file dengan nomor SEP atau nomor rekam medis di posisi lain dapat memakai preset
+('sep', 'rm') atau file JSON sendiri di RULES_DIR, misalnya:
+
+    {
+        "description": "RS Contoh: nomor SEP di mana saja dalam nama file",
+        "normalize": {"lowercase": true, "collapse_whitespace": true, "remove_chars": "-."},
+        "rules": [{"name": "sep", "pattern": "(?P<key>\\\\d{4}r\\\\d{3}\\\\d{4}v\\\\d{6})"}],
+        "fallback": "default",
+        "starts_with": false
+    }
+
+Setiap pola dikompilasi sekali saat aturan dimuat. Pencocokan awalan ("starts-with") dan pencarian kandidat
+terdekat memakai SortedPrefixIndex (daftar kunci terurut + bisect), sehingga tetap O(log n) per file
+untuk ratusan ribu nama file.
+"""
+import os
+import re
+import json
+import bisect
+import difflib
+
+from scanner import extract_prefix_and_number
+
+RULES_DIR = os.path.join(os.path.expanduser("~"), ".penggabung", "aturan")
+DEFAULT_RULE_SET = "bawaan"
+FALLBACK_MODES = ('default', 'basename', 'none')
+CANDIDATE_NEIGHBOURS = 4 # Tetangga di kiri/kanan posisi sisip yang dinilai sebagai kandidat terdekat
+CANDIDATE_WORD_STARTS = 6 # Awal kata dalam nama file yang ikut dicari di indeks
+CANDIDATE_MIN_RATIO = 0.6
+
+BUILTIN_RULE_SETS = {
+    'bawaan': {
+        'description': "Nama depan sebelum '_angka', ' (angka)' atau ' angka' (perilaku asli)",
+    },
+    'awalan': {
+        'description': "Seperti bawaan, ditambah pencocokan awalan (mis. '123 hasil lab.pdf' ikut '123.pdf')",
+        'starts_with': True,
+    },
+    'sep': {
+        'description': "Nomor SEP BPJS (mis. 0301R0011117V000001) di mana saja dalam nama file",
+        'normalize': {'remove_chars': " -._"},
+        'rules': [{'name': 'sep', 'pattern': r'(?P<key>\d{4}r\d{3}\d{4}v\d{6})'}],
+    },
+    'rm': {
+        'description': "Nomor rekam medis 6-10 digit (boleh diawali 'RM'), di awal atau setelah label RM",
+        'rules': [
+            {'name': 'rm_label', 'pattern': r'(?<![a-z])rm[\s._-]*(?P<key>\d{6,10})(?!\d)'},
+            {'name': 'rm_awal', 'pattern': r'^(?P<key>\d{6,10})(?!\d)'},
+        ],
+    },
+}
+
+
+class MatchRuleSet:
+    """
+    Aturan pencocokan yang sudah dikompilasi. parse(nama_file) mengembalikan (kunci, nomor, nama_dasar_lower)
+    dengan bentuk yang sama seperti extract_prefix_and_number, sehingga bisa langsung dipakai FolderIndex.
+
+    Urutan: nama dasar dinormalisasi, lalu pola dicoba berurutan (yang pertama cocok menang; grup 'key' menjadi
+    kunci, grup 'number' opsional menjadi nomor urut). Bila tidak ada pola yang cocok, fallback menentukan kunci:
+    'default' (aturan bawaan), 'basename' (seluruh nama dasar) atau 'none' (file tidak dipasangkan).
+    """
+    def __init__(self, name, config):
+        self.name = name
+        self.description = config.get('description', "")
+        normalize = config.get('normalize', {})
+        self.lowercase = bool(normalize.get('lowercase', True))
+        self.collapse_whitespace = bool(normalize.get('collapse_whitespace', False))
+        self.remove_chars = str(normalize.get('remove_chars', ""))
+        self.fallback = config.get('fallback', 'default')
+        if self.fallback not in FALLBACK_MODES:
+            raise ValueError(f"Fallback aturan '{name}' tidak dikenal: {self.fallback}")
+        self.starts_with = bool(config.get('starts_with', False))
+
+        self.rules = []
+        for index, rule in enumerate(config.get('rules', [])):
+            rule_name = rule.get('name') or f"aturan_{index + 1}"
+            try:
+                pattern = re.compile(rule['pattern'], re.IGNORECASE)
+            except (KeyError, re.error) as e:
+                raise ValueError(f"Pola '{rule_name}' pada aturan '{name}' tidak valid: {e}") from e
+            self.rules.append((rule_name, pattern))
+
+        self._remove_table = str.maketrans("", "", self.remove_chars) if self.remove_chars else None
+        self.is_default = (not self.rules and self.fallback == 'default' and self.lowercase
+                           and not self.collapse_whitespace and not self.remove_chars)
+
+    def normalize(self, text):
+        if self.lowercase:
+            text = text.lower()
+        if self.collapse_whitespace:
+            text = " ".join(text.split())
+        if self._remove_table is not None:
+            text = text.translate(self._remove_table)
+        return text
+
+    def parse(self, filename):
+        if self.is_default:
+            return extract_prefix_and_number(filename)
+
+        base_name = os.path.splitext(filename)[0]
+        base_name_lower = base_name.lower()
+        normalized = self.normalize(base_name)
+        for _, pattern in self.rules:
+            match = pattern.search(normalized)
+            if match is None:
+                continue
+            groups = match.groupdict()
+            key = groups['key'] if groups.get('key') is not None else match.group(0)
+            number = groups.get('number')
+            if number is not None:
+                return key, int(number), base_name_lower
+            # Nomor urut mengikuti akhiran bawaan ('_2', ' (2)', ' 2') bila pola tidak menentukannya,
+            # kecuali akhiran itu adalah kunci itu sendiri (mis. 'lab rm 1234567').
+            prefix, number, _ = extract_prefix_and_number(filename)
+            return key, number if key in self.normalize(prefix) else None, base_name_lower
+
+        if self.fallback == 'default':
+            prefix, number, _ = extract_prefix_and_number(filename)
+            return self.normalize(prefix), number, base_name_lower
+        if self.fallback == 'basename':
+            return normalized, None, base_name_lower
+        return None, None, base_name_lower
+
+
+def _rules_dir_files(rules_dir):
+    try:
+        return sorted(name for name in os.listdir(rules_dir) if name.lower().endswith('.json'))
+    except OSError:
+        return []
+
+
+def available_rule_sets(rules_dir=RULES_DIR):
+    """
+    Mengembalikan daftar (nama, deskripsi) aturan preset lalu aturan JSON di rules_dir.
+    File JSON yang tidak bisa dibaca tetap didaftar dengan deskripsi kosong (kesalahannya muncul saat dimuat).
+    """
+    rule_sets = [(name, config['description']) for name, config in BUILTIN_RULE_SETS.items()]
+    for filename in _rules_dir_files(rules_dir):
+        description = ""
+        try:
+            with open(os.path.join(rules_dir, filename), 'r', encoding='utf-8') as f:
+                description = json.load(f).get('description', "")
+        except (OSError, ValueError, AttributeError):
+            pass
+        rule_sets.append((os.path.splitext(filename)[0], description))
+    return rule_sets
+
+
+def load_rule_set(spec=None, rules_dir=RULES_DIR):
+    """
+    Memuat aturan dari nama preset, nama file JSON di rules_dir (tanpa .json), atau path file JSON.
+    MatchRuleSet yang sudah jadi dikembalikan apa adanya. ValueError bila aturan tidak ditemukan atau tidak valid.
+    """
+    if isinstance(spec, MatchRuleSet):
+        return spec
+    if not spec:
+        spec = DEFAULT_RULE_SET
+    if spec in BUILTIN_RULE_SETS:
+        return MatchRuleSet(spec, BUILTIN_RULE_SETS[spec])
+
+    path = spec if os.path.isfile(spec) else os.path.join(rules_dir, spec + ".json")
+    if not os.path.isfile(path):
+        raise ValueError(f"Aturan pencocokan tidak dikenal: {spec}")
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Gagal membaca aturan pencocokan '{path}': {e}") from e
+    if not isinstance(config, dict):
+        raise ValueError(f"Aturan pencocokan '{path}' harus berupa objek JSON.")
+    return MatchRuleSet(config.get('name') or os.path.splitext(os.path.basename(path))[0], config)
+
+
+def _common_prefix_length(a, b):
+    limit = min(len(a), len(b))
+    i = 0
+    while i < limit and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def _is_word_boundary(text, position):
+    return position >= len(text) or not text[position].isalnum()
+
+
+def _word_starts(text):
+    """
+    Posisi awal kata dalam text (karakter huruf/angka setelah karakter lain), dibatasi CANDIDATE_WORD_STARTS.
+    """
+    starts = [0]
+    for position in range(1, len(text)):
+        if text[position].isalnum() and not text[position - 1].isalnum():
+            starts.append(position)
+            if len(starts) == CANDIDATE_WORD_STARTS:
+                break
+    return starts
+
+
+class SortedPrefixIndex:
+    """
+    Indeks kunci terurut untuk pencarian awalan dan kandidat terdekat tanpa membandingkan semua pasangan kunci.
+
+    Memakai daftar terurut + bisect, bukan trie: untuk 100 ribu kunci trie berbasis dict memakan ratusan MB,
+    sedangkan daftar terurut hanya menyimpan string kuncinya.
+    """
+    def __init__(self, keys):
+        self._keys = sorted(key for key in set(keys) if key)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def longest_prefix(self, text):
+        """
+        Mengembalikan kunci terpanjang yang merupakan awalan text dan berakhir di batas kata
+        (akhir text atau karakter bukan huruf/angka), atau None. Kunci yang sama persis dengan text juga cocok.
+        """
+        probe = text
+        while probe:
+            position = bisect.bisect_right(self._keys, probe)
+            if position == 0:
+                return None
+            candidate = self._keys[position - 1]
+            if probe.startswith(candidate):
+                if _is_word_boundary(text, len(candidate)):
+                    return candidate
+                # Awalan yang lebih pendek dari candidate selalu <= candidate[:-1] dalam urutan.
+                probe = candidate[:-1]
+            else:
+                # Semua kunci di antara awalan bersama dan probe diawali awalan bersama itu.
+                probe = probe[:_common_prefix_length(candidate, probe)]
+        return None
+
+    def closest(self, text, limit=2):
+        """
+        Mengembalikan hingga limit kunci yang paling mirip dengan text. Kandidat diambil dari tetangga di posisi
+        sisip text dan setiap awal katanya (mis. 'sep 0301r...' juga dicari sebagai '0301r...'), lalu dinilai
+        dengan difflib.
+        """
+        if not text or not self._keys:
+            return []
+        neighbours = set()
+        for start in _word_starts(text):
+            position = bisect.bisect_left(self._keys, text[start:])
+            neighbours.update(self._keys[max(0, position - CANDIDATE_NEIGHBOURS):position + CANDIDATE_NEIGHBOURS])
+        scored = []
+        # seq2 (text) dianalisis sekali; quick_ratio adalah batas atas ratio yang murah untuk menyaring kunci.
+        matcher = difflib.SequenceMatcher(None, "", text)
+        for key in neighbours:
+            matcher.set_seq1(key)
+            if matcher.quick_ratio() < CANDIDATE_MIN_RATIO:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= CANDIDATE_MIN_RATIO:
+                scored.append((ratio, key))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [key for _, key in scored[:limit]]
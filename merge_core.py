@@ -0,0 +1,1863 @@
+"""
+Inti penggabungan PDF tanpa ketergantungan Qt: pemindaian folder, pencocokan prefiks,
+dan penggabungan pasangan file. Dipakai oleh GUI (penggabung.py) maupun mode baris perintah (cli.py).
+"""
+import sys
+import os
+import csv
+import json
+import hashlib
+import time # Import modul time untuk mengukur durasi
+import queue
+import collections
+import signal
+import threading
+import contextlib
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
+
+try:
+    import pymupdf as fitz  # PyMuPDF; modul 'fitz' versi baru mencetak peringatan deprecation ke stdout
+except ImportError:
+    import fitz  # PyMuPDF versi lama (sebelum 1.24.3)
+
+from scanner import FolderIndex, combine_indexes, iter_pdf_dirs, scan_folder, scan_folder_list
+from prefetch import InputPrefetcher
+from scheduling import WeightedProgress, format_duration, schedule_pairs
+from metrics import METRICS_EMIT_INTERVAL_SECONDS, LiveMetrics
+from attachment_cache import get_attachment_cache, clear_attachment_cache
+from archives import close_archives, is_source_folder, open_binary, read_bytes, split_archive_path, stat_path
+from matching import DEFAULT_RULE_SET, SortedPrefixIndex, load_rule_set
+from plan import MergePlan
+from validation import VALIDATION_THREADS, validate_pdf
+from output_writer import OutputWriter, PARTIAL_SUFFIX, save_atomic, remove_partial_files
+# Konstanta opsi dan logger berkas ada di settings (tanpa fitz) agar GUI bisa tampil sebelum PyMuPDF dimuat;
+# tetap diekspor dari sini untuk kode yang sudah mengimpornya dari merge_core.
+from settings import (SAVE_PROFILES, DEFAULT_SAVE_PROFILE, DEFAULT_IMAGE_QUALITY, DEDUP_MODES, DEFAULT_PREFETCH_PAIRS,
+                      DEFAULT_PREFETCH_MEMORY_MB, DEFAULT_ATTACHMENT_CACHE_MB, PRIMARY_POLICIES, DEFAULT_PRIMARY_POLICY,
+                      LOG_DIR, LOG_FILENAME, get_file_logger)
+
+OUTPUT_FOLDER_NAME = "Hasil Penggabungan"
+
+# Mode hemat memori: dokumen ditulis sementara ke disk saat RSS melewati MEMORY_SPILL_RATIO x batas,
+# atau setiap MEMORY_BOUNDED_FALLBACK_DOCS file tambahan bila RSS tidak bisa dibaca di platform ini.
+MEMORY_SPILL_RATIO = 0.75
+MEMORY_BOUNDED_FALLBACK_DOCS = 8
+# Batas memori harus menyisakan ruang ini di atas RSS proses saat MergeEngine dibuat (interpreter + MuPDF + GUI);
+# batas yang lebih kecil membuat setiap pasangan dibatalkan.
+MEMORY_LIMIT_MIN_HEADROOM_MB = 64
+
+# Optimasi gambar: hanya gambar di atas IMAGE_DPI_THRESHOLD_RATIO x DPI target yang di-downsample
+# (sama seperti ambang bawaan Ghostscript), agar gambar yang hanya sedikit di atas target tidak dikompresi ulang.
+IMAGE_DPI_THRESHOLD_RATIO = 1.5
+# garbage=4 membandingkan isi stream sehingga gambar duplikat antarhalaman digabung menjadi satu objek.
+IMAGE_DEDUP_GARBAGE_LEVEL = 4
+
+HASH_CACHE_FILENAME = ".penggabung_hash_cache.json"
+# Hasil validasi awal per file (validation.validate_pdf), dengan format cache yang sama.
+VALIDATION_CACHE_FILENAME = ".penggabung_validasi.json"
+# Jurnal checkpoint: satu baris JSON per pasangan yang selesai, ditulis (fsync) segera setelah file output tertulis.
+JOURNAL_FILENAME = ".penggabung_journal.jsonl"
+
+TIMING_REPORT_BASENAME = "laporan_waktu_penggabungan" # .json dan .csv di folder output
+SLOWEST_PAIRS_IN_SUMMARY = 5
+# Kandidat terdekat hanya dicari untuk sejumlah file tanpa pasangan ini (pencarian per file murah,
+# tetapi laporan untuk puluhan ribu file tidak terbaca).
+UNMATCHED_CANDIDATE_LIMIT = 2000
+PAIR_METRIC_FIELDS = ['primary_file', 'additional_count', 'merged', 'open_seconds', 'insert_seconds',
+                      'save_seconds', 'total_seconds', 'page_count', 'input_bytes', 'output_bytes',
+                      'peak_rss_bytes', 'spill_count', 'optimize_seconds', 'image_bytes_before',
+                      'image_bytes_after', 'write_seconds']
+
+def _new_pair_result(primary_file_path, additional_count):
+    """
+    Dict hasil kosong untuk satu pasangan: status, penghitung, waktu per tahap (detik), jumlah halaman dan byte.
+    """
+    return {
+        'primary_file_path': primary_file_path,
+        'additional_count': additional_count,
+        'merged': False,
+        'skipped_primary_due_to_corruption': 0,
+        'skipped_additional_due_to_corruption': 0,
+        'skipped_memory_limit': 0,
+        'open_seconds': 0.0,
+        'insert_seconds': 0.0,
+        'save_seconds': 0.0,
+        'write_seconds': 0.0,
+        'total_seconds': 0.0,
+        'page_count': 0,
+        'input_bytes': 0,
+        'output_bytes': 0,
+        'peak_rss_bytes': 0,
+        'spill_count': 0,
+        'optimize_seconds': 0.0,
+        'image_bytes_before': 0,
+        'image_bytes_after': 0,
+        'duplicate_files': [],
+        'attachment_cache': {'hits': 0, 'misses': 0, 'evictions': 0, 'bytes_saved': 0},
+        'hash_entries': {},
+        'logs': [],
+    }
+
+class MemoryLimitExceeded(Exception):
+    """
+    Dilempar bila RSS proses tetap di atas batas memori meskipun dokumen sudah ditulis sementara ke disk.
+    """
+
+def current_rss_bytes():
+    """
+    RSS (working set) proses saat ini dalam byte, atau None bila tidak bisa dibaca di platform ini.
+    """
+    if sys.platform.startswith('linux'):
+        try:
+            with open('/proc/self/statm', 'r') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError):
+            return None
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        if ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(),
+                                                    ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+    return None
+
+def _spill_to_disk(doc, spill_paths, output_filepath, spill_number):
+    """
+    Menulis dokumen yang sedang dibangun ke file sementara di sebelah output, menutupnya, lalu membukanya lagi
+    dari disk. Halaman yang sudah disisipkan tidak lagi ditahan di memori; MuPDF membacanya ulang bila perlu.
+    Nama file sementara berselang-seling (.bagian0/.bagian1) karena dokumen yang sedang terbuka
+    berasal dari file sementara sebelumnya.
+    """
+    spill_path = f"{output_filepath}.bagian{spill_number % 2}{PARTIAL_SUFFIX}"
+    doc.save(spill_path, **SAVE_PROFILES['fast'])
+    doc.close()
+    if spill_paths:
+        os.remove(spill_paths.pop())
+    spill_paths.append(spill_path)
+    fitz.TOOLS.store_shrink(100)
+    return fitz.open(spill_path)
+
+def _image_stream_stats(doc):
+    """
+    Mengembalikan (jumlah_gambar, total_byte_stream, byte_duplikat) untuk gambar yang dipakai halaman dokumen
+    (termasuk soft mask). Gambar lama yang sudah tidak dirujuk tidak dihitung karena dibuang saat simpan.
+    byte_duplikat adalah ukuran stream yang isinya sama persis dengan gambar lain (akan digabung saat simpan).
+    """
+    xrefs = set()
+    for page in doc:
+        for image_info in page.get_images(full=True):
+            xrefs.update(xref for xref in image_info[:2] if xref > 0) # (xref, smask, ...)
+    seen_digests = set()
+    total_bytes = duplicate_bytes = 0
+    for xref in xrefs:
+        raw = doc.xref_stream_raw(xref) or b""
+        total_bytes += len(raw)
+        digest = hashlib.sha1(raw).digest()
+        if digest in seen_digests:
+            duplicate_bytes += len(raw)
+        else:
+            seen_digests.add(digest)
+    return len(xrefs), total_bytes, duplicate_bytes
+
+def optimize_images(doc, dpi_target, quality=DEFAULT_IMAGE_QUALITY):
+    """
+    Men-downsample gambar di atas IMAGE_DPI_THRESHOLD_RATIO x dpi_target ke dpi_target dan mengompresnya ulang
+    (JPEG dengan kualitas quality; gambar hitam-putih tetap bitonal). Gambar duplikat dibuang saat dokumen disimpan
+    dengan garbage >= IMAGE_DEDUP_GARBAGE_LEVEL.
+    Mengembalikan (jumlah_gambar, byte_sebelum, byte_sesudah), dengan byte_sesudah sudah tanpa gambar duplikat.
+    """
+    image_count, bytes_before, _ = _image_stream_stats(doc)
+    if image_count:
+        doc.rewrite_images(dpi_threshold=int(dpi_target * IMAGE_DPI_THRESHOLD_RATIO), dpi_target=dpi_target,
+                           quality=quality, lossy=True, lossless=True, bitonal=True, color=True, gray=True)
+    _, bytes_after, duplicate_bytes = _image_stream_stats(doc)
+    return image_count, bytes_before, bytes_after - duplicate_bytes
+
+def _page_digest(doc, page):
+    """
+    Hash satu halaman: content stream, stream gambar/form XObject yang dipakai, dan ukuran halaman.
+    """
+    digest = hashlib.sha256(page.read_contents())
+    xrefs = {info[0] for info in page.get_images(full=True)} | {info[0] for info in page.get_xobjects()}
+    for xref in sorted(xrefs):
+        if xref > 0:
+            digest.update(doc.xref_stream_raw(xref) or b"")
+    digest.update(repr(tuple(page.rect)).encode())
+    return digest.hexdigest()
+
+def _open_input(path, prefetched):
+    """
+    Membuka file input dari bytes hasil baca di muka bila tersedia, selain itu langsung dari disk.
+    Entri arsip ZIP dibaca dari arsip langsung ke memori, tanpa file sementara. Mengembalikan (dokumen, ukuran_byte).
+    """
+    data = prefetched.get(path) if prefetched else None
+    if data is None and split_archive_path(path) is not None:
+        data = read_bytes(path)
+    if data is not None:
+        return fitz.open(stream=data, filetype="pdf"), len(data)
+    doc = fitz.open(path)
+    return doc, os.path.getsize(path)
+
+def _dedup_entry(path, known_hashes, result, doc=None, prefetched=None):
+    """
+    Entri hash sebuah file (sidik file_fingerprint + sha256, dan page_hashes bila doc diberikan).
+    Entri dari cache (known_hashes) dipakai bila ada; yang baru dihitung dicatat di result['hash_entries']
+    agar MergeEngine bisa menyimpannya ke HashCache.
+    """
+    entry = result['hash_entries'].get(path) or (known_hashes or {}).get(path)
+    if entry is None:
+        entry = file_fingerprint(path, with_hash=True, data=prefetched.get(path) if prefetched else None)
+        result['hash_entries'][path] = entry
+    if doc is not None and 'page_hashes' not in entry:
+        entry = dict(entry, page_hashes=[_page_digest(doc, page) for page in doc])
+        result['hash_entries'][path] = entry
+    return entry
+
+def merge_pair(primary_file_path, additional_file_paths_list, output_filepath, save_profile=DEFAULT_SAVE_PROFILE,
+               memory_limit_mb=0, image_options=None, dedup='off', known_hashes=None, prefetched=None,
+               return_bytes=False, attachment_cache_mb=0, hash_inputs=False):
+    """
+    Menggabungkan satu pasangan file (file utama + file tambahan) dan menyimpannya ke output_filepath
+    dengan opsi dari SAVE_PROFILES[save_profile].
+    Bila memory_limit_mb > 0 (mode hemat memori), cache sumber daya MuPDF dikosongkan setelah setiap file tambahan
+    dan dokumen ditulis sementara ke disk begitu RSS mendekati batas; bila RSS tetap di atas batas,
+    pasangan dibatalkan.
+    Bila image_options ({'dpi': ..., 'quality': ...}) diberikan, gambar hasil scan di-downsample dan dikompresi ulang
+    lewat optimize_images sebelum disimpan.
+    Bila dedup bukan 'off', file tambahan yang duplikat (lihat DEDUP_MODES) tidak disisipkan; known_hashes berisi
+    entri HashCache untuk path pasangan ini sehingga hash tidak dihitung ulang.
+    prefetched (path -> bytes) berisi file yang sudah dibaca di muka oleh InputPrefetcher.
+    Bila return_bytes=True, hasil tidak ditulis ke disk tetapi dikembalikan sebagai result['output_data']
+    untuk OutputWriter (kecuali dalam mode hemat memori); selain itu disimpan secara atomik lewat file sementara.
+    Bila attachment_cache_mb > 0 (dan bukan mode hemat memori), file tambahan diurai lewat AttachmentCache milik
+    proses ini sehingga lampiran yang dipakai banyak pasangan hanya diurai sekali; statistiknya per pasangan ada di
+    result['attachment_cache'].
+    Bila hash_inputs=True (verifikasi hash manifest), hash SHA-256 semua input dihitung sebelum dibuka, dari isi yang
+    dibaca di muka bila ada, dan dikembalikan di result['hash_entries'] agar manifest tidak membaca ulang file.
+    Fungsi ini tidak menyentuh objek Qt sehingga bisa dijalankan di proses pekerja;
+    pesan log dan penghitung dikembalikan sebagai dict.
+    """
+    result = _new_pair_result(primary_file_path, len(additional_file_paths_list))
+    logs = result['logs']
+    output_filename = os.path.basename(output_filepath)
+    pair_start = time.perf_counter()
+    memory_limit_bytes = memory_limit_mb * 1024 * 1024
+    spill_paths = []
+    primary_doc = None
+    attachment_cache = None
+    if attachment_cache_mb and not memory_limit_bytes:
+        attachment_cache = get_attachment_cache(attachment_cache_mb * 1024 * 1024)
+        cache_stats_before = attachment_cache.stats()
+
+    try:
+        logs.append("----------------------------------------") # Garis putus-putus sebelum penggabungan
+        logs.append(f"Memproses pasangan: '{os.path.basename(primary_file_path)}'")
+
+        if hash_inputs:
+            for path in [primary_file_path] + additional_file_paths_list:
+                try:
+                    _dedup_entry(path, known_hashes, result, prefetched=prefetched)
+                except OSError:
+                    pass # File hilang/tidak terbaca ditangani saat dibuka di bawah
+
+        open_start = time.perf_counter()
+        primary_doc, primary_size = _open_input(primary_file_path, prefetched)
+        result['open_seconds'] += time.perf_counter() - open_start
+        result['input_bytes'] += primary_size
+        logs.append(f"File utama        : {os.path.basename(primary_file_path)}'")
+
+        seen_file_hashes = {} # sha256 -> nama file pertama dengan isi tersebut
+        seen_page_hashes = set()
+        if dedup != 'off':
+            entry = _dedup_entry(primary_file_path, known_hashes, result, primary_doc if dedup == 'page' else None,
+                                 prefetched)
+            seen_file_hashes[entry['sha256']] = os.path.basename(primary_file_path)
+            seen_page_hashes.update(entry.get('page_hashes', ()))
+
+        docs_since_spill = 0
+        for ad_path in additional_file_paths_list:
+            try:
+                if dedup != 'off':
+                    entry = _dedup_entry(ad_path, known_hashes, result, prefetched=prefetched)
+                    original_name = seen_file_hashes.get(entry['sha256'])
+                    if original_name is not None:
+                        logs.append(f"Duplikat dilewati : {os.path.basename(ad_path)}' (isi sama dengan '{original_name}')")
+                        result['duplicate_files'].append(f"{os.path.basename(ad_path)} (sama dengan {original_name})")
+                        continue
+                    seen_file_hashes[entry['sha256']] = os.path.basename(ad_path)
+
+                open_start = time.perf_counter()
+                if attachment_cache is not None:
+                    ad_doc, ad_size, cached = attachment_cache.open(ad_path, prefetched.get(ad_path) if prefetched else None)
+                else:
+                    (ad_doc, ad_size), cached = _open_input(ad_path, prefetched), False
+                # Dokumen milik cache tetap terbuka untuk pasangan berikutnya.
+                with contextlib.nullcontext(ad_doc) if cached else ad_doc:
+                    insert_start = time.perf_counter()
+                    result['open_seconds'] += insert_start - open_start
+                    if dedup == 'page':
+                        page_hashes = _dedup_entry(ad_path, known_hashes, result, ad_doc)['page_hashes']
+                        if page_hashes and seen_page_hashes.issuperset(page_hashes):
+                            logs.append(f"Duplikat dilewati : {os.path.basename(ad_path)}' (semua halaman sudah ada)")
+                            result['duplicate_files'].append(f"{os.path.basename(ad_path)} (semua halaman sudah ada)")
+                            continue
+                        seen_page_hashes.update(page_hashes)
+                        insert_start = time.perf_counter()
+                    primary_doc.insert_pdf(ad_doc)
+                    result['insert_seconds'] += time.perf_counter() - insert_start
+                    result['input_bytes'] += ad_size
+                    logs.append(f"File tambahan     : {os.path.basename(ad_path)}'")
+            except (fitz.FileNotFoundError, FileNotFoundError):
+                logs.append(f"Error: File tambahan '{os.path.basename(ad_path)}' tidak ditemukan. Dilewati.")
+                result['skipped_additional_due_to_corruption'] += 1
+            except Exception as e:
+                logs.append(f"Error: File tambahan '{os.path.basename(ad_path)}' kemungkinan rusak. Dilewati. ({e})")
+                result['skipped_additional_due_to_corruption'] += 1
+
+            if memory_limit_bytes:
+                fitz.TOOLS.store_shrink(100) # Lepaskan gambar/font sumber yang sudah selesai disisipkan
+                docs_since_spill += 1
+                rss = current_rss_bytes()
+                if rss is not None:
+                    result['peak_rss_bytes'] = max(result['peak_rss_bytes'], rss)
+                if (rss is None and docs_since_spill >= MEMORY_BOUNDED_FALLBACK_DOCS) or \
+                        (rss is not None and rss > memory_limit_bytes * MEMORY_SPILL_RATIO):
+                    primary_doc = _spill_to_disk(primary_doc, spill_paths, output_filepath, result['spill_count'])
+                    result['spill_count'] += 1
+                    docs_since_spill = 0
+                    rss = current_rss_bytes()
+                    if rss is not None and rss > memory_limit_bytes:
+                        raise MemoryLimitExceeded(f"RSS {rss / (1024 * 1024):.0f} MB melebihi batas {memory_limit_mb} MB")
+
+        save_options = dict(SAVE_PROFILES[save_profile])
+        if image_options:
+            if hasattr(primary_doc, 'rewrite_images'):
+                optimize_start = time.perf_counter()
+                image_count, result['image_bytes_before'], result['image_bytes_after'] = optimize_images(
+                    primary_doc, image_options['dpi'], image_options.get('quality', DEFAULT_IMAGE_QUALITY))
+                result['optimize_seconds'] = time.perf_counter() - optimize_start
+                save_options['garbage'] = max(save_options['garbage'], IMAGE_DEDUP_GARBAGE_LEVEL)
+                logs.append(f"Optimasi gambar   : {image_count} gambar, {result['image_bytes_before'] / 1024:.0f} KB -> "
+                            f"{result['image_bytes_after'] / 1024:.0f} KB "
+                            f"(hemat {(result['image_bytes_before'] - result['image_bytes_after']) / 1024:.0f} KB, "
+                            f"{result['optimize_seconds']:.2f} detik)")
+            else:
+                logs.append("Peringatan: Versi PyMuPDF ini belum mendukung optimasi gambar (Document.rewrite_images). Dilewati.")
+
+        logs.append(f"Menyimpan hasil ke {output_filename}'")
+        save_start = time.perf_counter()
+        if return_bytes and not memory_limit_bytes:
+            result['output_data'] = primary_doc.tobytes(**save_options)
+            result['output_bytes'] = len(result['output_data'])
+        else:
+            save_atomic(primary_doc, output_filepath, save_options)
+            result['output_bytes'] = os.path.getsize(output_filepath)
+        result['save_seconds'] = time.perf_counter() - save_start
+        # Sesaat setelah simpan biasanya titik memori tertinggi pasangan (dokumen gabungan + bytes output).
+        result['peak_rss_bytes'] = max(result['peak_rss_bytes'], current_rss_bytes() or 0)
+        result['page_count'] = primary_doc.page_count
+        result['merged'] = True
+        if result['spill_count']:
+            logs.append(f"Mode hemat memori: dokumen ditulis sementara ke disk {result['spill_count']} kali.")
+        logs.append(f"Penggabungan berhasil: '{output_filename}' ({result['output_bytes'] / 1024:.0f} KB, simpan {result['save_seconds']:.2f} detik)")
+        logs.append("----------------------------------------") # Garis putus-putus setelah penggabungan
+
+    except fitz.FileNotFoundError:
+        logs.append(f"Error: File utama '{os.path.basename(primary_file_path)}' tidak ditemukan. Seluruh pasangan dilewati.")
+        result['skipped_primary_due_to_corruption'] += 1
+        logs.append("----------------------------------------") # Garis putus-putus setelah error
+    except MemoryLimitExceeded as e:
+        logs.append(f"Error: Pasangan '{os.path.basename(primary_file_path)}' dibatalkan karena batas memori. ({e})")
+        result['skipped_memory_limit'] += 1
+        logs.append("----------------------------------------") # Garis putus-putus setelah error
+    except Exception as e:
+        logs.append(f"Error: Terjadi kesalahan tidak terduga saat memproses file '{os.path.basename(primary_file_path)}' atau pasangannya. Pasangan ini dilewati. ({e})")
+        result['skipped_primary_due_to_corruption'] += 1
+        logs.append("----------------------------------------") # Garis putus-putus setelah error
+    finally:
+        if primary_doc is not None:
+            primary_doc.close()
+        if attachment_cache is not None:
+            result['attachment_cache'] = {key: value - cache_stats_before[key]
+                                          for key, value in attachment_cache.stats().items()}
+        for spill_path in spill_paths:
+            try:
+                os.remove(spill_path)
+            except OSError:
+                pass
+
+    if memory_limit_bytes:
+        fitz.TOOLS.store_shrink(100)
+    result['total_seconds'] = time.perf_counter() - pair_start
+    return result
+
+_worker_cancel_event = None # multiprocessing.Event milik MergeEngine, diset oleh _init_worker di proses pekerja
+
+def _init_worker(cancel_event=None):
+    """
+    Initializer proses pekerja: Ctrl+C ditangani oleh proses utama (pembatalan bersih lewat MergeEngine.cancel),
+    jadi pekerja mengabaikan SIGINT agar pasangan yang sedang diproses tetap selesai.
+    """
+    global _worker_cancel_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_cancel_event = cancel_event
+
+def _release_prefetched(prefetcher, prefetched, _future):
+    prefetcher.release(prefetched)
+
+def _merge_pair_unless_cancelled(*args):
+    """
+    merge_pair di proses pekerja. ProcessPoolExecutor sudah mengirim beberapa pekerjaan ke antrean pekerja sebelum
+    dimulai (Future-nya tidak bisa dibatalkan lagi), jadi pekerja memeriksa pembatalan sebelum memulai pasangan;
+    pasangan yang dibatalkan menghasilkan None.
+    """
+    if _worker_cancel_event is not None and _worker_cancel_event.is_set():
+        return None
+    return merge_pair(*args)
+
+def _sorted_additional_paths(entries):
+    """
+    Mengurutkan file tambahan sebuah prefiks: bernomor naik lebih dulu, lalu yang tanpa nomor.
+    """
+    sorted_additional = sorted(entries, key=lambda x: (x.number is None, x.number if x.number is not None else float('inf')))
+    return [ad.path for ad in sorted_additional]
+
+def _failed_pair_result(primary_file_path, error):
+    """
+    Hasil pengganti bila proses pekerja gagal total (misalnya proses mati) sebelum mengembalikan hasil.
+    """
+    result = _new_pair_result(primary_file_path, 0)
+    result['skipped_primary_due_to_corruption'] = 1
+    result['logs'] += [
+        f"Error: Proses pekerja gagal saat memproses file '{os.path.basename(primary_file_path)}'. Pasangan ini dilewati. ({error})",
+        "----------------------------------------",
+    ]
+    return result
+
+MANIFEST_FILENAME = ".penggabung_manifest.json"
+
+def _with_sha256(path, fingerprint, hash_entries):
+    """
+    fingerprint ditambah sha256 dari hash_entries (path -> entri HashCache) bila entri path itu dibuat dari
+    isi dengan ukuran dan mtime yang sama.
+    """
+    if fingerprint is None or 'sha256' in fingerprint:
+        return fingerprint
+    entry = hash_entries.get(path)
+    if entry is None or 'sha256' not in entry or entry.get('size') != fingerprint['size'] \
+            or entry.get('mtime_ns') != fingerprint['mtime_ns']:
+        return fingerprint
+    return dict(fingerprint, sha256=entry['sha256'])
+
+def _sha256_file(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open_binary(path) as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def file_fingerprint(path, with_hash=False, data=None):
+    """
+    Sidik file untuk manifest: path, ukuran, mtime, dan (opsional) hash SHA-256 isinya.
+    Bila isi file sudah ada di memori (data), hash dihitung dari sana tanpa membaca ulang.
+    """
+    stat_result = stat_path(path)
+    fingerprint = {
+        'path': os.path.abspath(path),
+        'size': stat_result.st_size,
+        'mtime_ns': stat_result.st_mtime_ns,
+    }
+    if with_hash:
+        fingerprint['sha256'] = hashlib.sha256(data).hexdigest() if data is not None else _sha256_file(path)
+    return fingerprint
+
+class MergeManifest:
+    """
+    Manifest di folder output yang mencatat, untuk setiap file hasil, sidik semua file input-nya.
+    Dipakai untuk melewati pasangan yang input-nya tidak berubah sejak proses sebelumnya.
+    """
+    def __init__(self, output_folder):
+        self.path = os.path.join(output_folder, MANIFEST_FILENAME)
+        self.entries = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.entries = data.get('outputs', {})
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        if not self.dirty:
+            return
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'outputs': self.entries}, f, indent=1)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+
+    def is_up_to_date(self, output_filepath, input_paths, verify_hash=False, save_profile=DEFAULT_SAVE_PROFILE,
+                      output_options=None):
+        """
+        True bila file output masih ada, dibuat dengan profil simpan dan opsi output lain (optimasi gambar, dedup)
+        yang sama, dan semua input sama dengan yang tercatat.
+        Input dianggap sama bila ukuran dan mtime-nya sama, atau (jika verify_hash aktif)
+        bila ukurannya sama dan hash isinya cocok dengan hash yang tercatat.
+        """
+        entry = self.entries.get(os.path.basename(output_filepath))
+        if not entry or len(entry['inputs']) != len(input_paths):
+            return False
+        if entry.get('save_profile', DEFAULT_SAVE_PROFILE) != save_profile:
+            return False
+        if entry.get('output_options') != output_options:
+            return False
+        try:
+            if os.path.getsize(output_filepath) != entry['output_size']:
+                return False
+            for recorded, path in zip(entry['inputs'], input_paths):
+                if recorded['path'] != os.path.abspath(path):
+                    return False
+                stat_result = stat_path(path)
+                if stat_result.st_size != recorded['size']:
+                    return False
+                if stat_result.st_mtime_ns == recorded['mtime_ns']:
+                    continue
+                if not verify_hash or 'sha256' not in recorded or _sha256_file(path) != recorded['sha256']:
+                    return False
+                # Isi sama tetapi mtime berubah (mis. disalin ulang): perbarui agar proses berikutnya cepat.
+                recorded['mtime_ns'] = stat_result.st_mtime_ns
+                self.dirty = True
+        except OSError:
+            return False
+        return True
+
+    def record(self, output_filepath, input_paths, with_hash=False, save_profile=DEFAULT_SAVE_PROFILE,
+               output_options=None, fingerprints=None):
+        """
+        Mencatat sidik input sebuah file output. Mengembalikan entri yang dicatat, atau None bila gagal.
+        fingerprints berisi sidik input yang diambil sebelum pasangan digabungkan (lihat MergeEngine._input_fingerprints);
+        tanpa itu sidik diambil sekarang, sehingga file yang berubah selama penggabungan tercatat dengan sidik barunya.
+        """
+        entry = None
+        try:
+            if fingerprints is None or any(fingerprint is None for fingerprint in fingerprints):
+                fingerprints = [file_fingerprint(path, with_hash) for path in input_paths]
+            entry = {
+                'output_size': os.path.getsize(output_filepath),
+                'save_profile': save_profile,
+                'output_options': output_options,
+                'inputs': fingerprints,
+            }
+            self.entries[os.path.basename(output_filepath)] = entry
+        except OSError:
+            self.entries.pop(os.path.basename(output_filepath), None)
+        self.dirty = True
+        return entry
+
+    def apply(self, entries):
+        """
+        Menerapkan entri dari jurnal checkpoint (nama output -> entri, None = dihapus), mis. setelah proses
+        sebelumnya terhenti sebelum manifest sempat disimpan.
+        """
+        for output_name, entry in entries.items():
+            if entry is None:
+                self.entries.pop(output_name, None)
+            else:
+                self.entries[output_name] = entry
+        self.dirty = self.dirty or bool(entries)
+
+    def forget(self, output_filepath):
+        if self.entries.pop(os.path.basename(output_filepath), None) is not None:
+            self.dirty = True
+
+class HashCache:
+    """
+    Cache hash isi file input (SHA-256 dan, untuk dedup 'page', hash per halaman) di folder output,
+    dikunci dengan path, ukuran, dan mtime sehingga file yang tidak berubah tidak di-hash ulang pada proses berikutnya.
+    Juga dipakai untuk hasil validasi awal (filename=VALIDATION_CACHE_FILENAME).
+    """
+    def __init__(self, output_folder, filename=HASH_CACHE_FILENAME):
+        self.path = os.path.join(output_folder, filename)
+        self.entries = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.entries = data.get('files', {})
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        if not self.dirty:
+            return
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'files': self.entries}, f)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+
+    def lookup(self, paths):
+        """
+        Entri tersimpan untuk paths yang ukuran dan mtime-nya masih sama, sebagai dict path -> entri.
+        """
+        found = {}
+        for path in paths:
+            entry = self.entries.get(path)
+            if entry is None:
+                continue
+            try:
+                stat_result = stat_path(path)
+            except OSError:
+                continue
+            if stat_result.st_size == entry['size'] and stat_result.st_mtime_ns == entry['mtime_ns']:
+                found[path] = entry
+        return found
+
+    def update(self, entries):
+        if entries:
+            self.entries.update(entries)
+            self.dirty = True
+
+class MergeJournal:
+    """
+    Jurnal checkpoint di folder output. Setiap pasangan yang selesai ditambahkan sebagai satu baris JSON
+    dan langsung di-fsync, sehingga setelah aplikasi ditutup, dibatalkan, atau listrik padam, proses berikutnya
+    tahu persis pasangan mana yang sudah selesai. Jurnal dihapus setelah proses selesai dengan lengkap
+    (isinya sudah tersimpan di manifest).
+    """
+    def __init__(self, output_folder):
+        self.path = os.path.join(output_folder, JOURNAL_FILENAME)
+        self._file = None
+
+    def load(self):
+        """
+        Mengembalikan dict nama output -> entri manifest (None = pasangan gagal dan dilupakan) dari jurnal yang ada.
+        Baris terakhir yang terpotong karena proses mati di tengah penulisan diabaikan.
+        """
+        entries = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        entries[record['output']] = record.get('entry')
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except OSError:
+            pass
+        return entries
+
+    def open(self, keep_existing):
+        self._file = open(self.path, 'a' if keep_existing else 'w', encoding='utf-8')
+
+    def record(self, output_name, entry):
+        self._file.write(json.dumps({'output': output_name, 'entry': entry}) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+# MergeEngine Class
+class MergeEngine:
+    """
+    Pipeline pindai -> cocokkan -> gabungkan tanpa Qt. Kemajuan dilaporkan lewat callback
+    (log_callback, progress_callback, status_callback) sehingga bisa dipakai oleh GUI maupun CLI;
+    metrics_callback menerima dict snapshot LiveMetrics (laju, perkiraan sisa waktu, aktivitas pekerja, memori).
+    """
+    def __init__(self, primary_folder, additional_folder, jobs=1, incremental=True, verify_hash=False,
+                 save_profile=DEFAULT_SAVE_PROFILE, output_folder=None, concurrent_scan=True, streaming=False,
+                 timing_report=False, memory_limit_mb=0, image_dpi=0, image_quality=DEFAULT_IMAGE_QUALITY,
+                 dedup='off', prefetch_pairs=DEFAULT_PREFETCH_PAIRS, prefetch_memory_mb=DEFAULT_PREFETCH_MEMORY_MB,
+                 resume=False, match_rules=DEFAULT_RULE_SET, plan=None, prevalidate=True,
+                 attachment_cache_mb=DEFAULT_ATTACHMENT_CACHE_MB, additional_folders=None,
+                 primary_policy=DEFAULT_PRIMARY_POLICY, log_callback=None, progress_callback=None,
+                 status_callback=None, metrics_callback=None):
+        self.primary_folder = primary_folder
+        # Folder Tambahan berurutan (mis. SEP, resume medis, billing, lab): file tambahan satu klaim disisipkan
+        # per folder sesuai urutan ini. additional_folder tetap didukung sebagai satu-satunya Folder Tambahan.
+        if additional_folders is None:
+            additional_folders = [additional_folder]
+        self.additional_folders = [folder for folder in additional_folders if folder]
+        self.additional_folder = additional_folder or (self.additional_folders[0] if self.additional_folders else "")
+        if primary_policy not in PRIMARY_POLICIES:
+            raise ValueError(f"Kebijakan file utama ganda tidak dikenal: {primary_policy}")
+        self.primary_policy = primary_policy
+        self.jobs = max(1, jobs)
+        self.incremental = incremental
+        self.verify_hash = verify_hash
+        if save_profile not in SAVE_PROFILES:
+            raise ValueError(f"Profil simpan tidak dikenal: {save_profile}")
+        self.save_profile = save_profile
+        self.concurrent_scan = concurrent_scan
+        # Streaming memasangkan per subfolder klaim saat memindai satu Folder Tambahan; dengan beberapa Folder Tambahan
+        # semua folder dipindai bersamaan lebih dulu (lihat run).
+        self.streaming_requested = streaming
+        self.streaming = streaming and len(self.additional_folders) <= 1
+        self.timing_report = timing_report
+        self.memory_limit_mb = max(0, memory_limit_mb or 0)
+        if self.memory_limit_mb:
+            rss = current_rss_bytes()
+            minimum_mb = int(rss / (1024 * 1024)) + MEMORY_LIMIT_MIN_HEADROOM_MB if rss is not None else 0
+            if self.memory_limit_mb < minimum_mb:
+                raise ValueError(f"Batas memori {self.memory_limit_mb} MB terlalu kecil: proses ini sudah memakai "
+                                 f"{rss / (1024 * 1024):.0f} MB. Gunakan minimal {minimum_mb} MB.")
+        # None = optimasi gambar nonaktif.
+        self.image_options = {'dpi': image_dpi, 'quality': image_quality} if image_dpi else None
+        if dedup not in DEDUP_MODES:
+            raise ValueError(f"Mode dedup tidak dikenal: {dedup}")
+        self.dedup = dedup
+        self.prefetch_pairs = max(0, prefetch_pairs)
+        self.prefetch_memory_mb = max(0, prefetch_memory_mb)
+        self.resume = resume
+        self.match_rules = load_rule_set(match_rules)
+        self.plan = plan # MergePlan yang sudah dikonfirmasi: pemindaian dan pencocokan dilewati
+        self.prevalidate = prevalidate
+        self.attachment_cache_mb = max(0, attachment_cache_mb or 0)
+        self.output_base_dir = os.path.dirname(primary_folder)
+        self.requested_output_folder = output_folder
+        self.final_output_folder_path = ""
+
+        self.log_callback = log_callback
+        self.progress_callback = progress_callback
+        self.metrics_callback = metrics_callback
+        self.status_callback = status_callback
+
+        self.merged_pairs_count = 0
+        self.skipped_primary_due_to_corruption = 0
+        self.skipped_additional_due_to_corruption = 0
+        self.skipped_primary_no_pair = 0
+        self.skipped_additional_no_pair = 0
+        self.skipped_unchanged_count = 0
+        self.skipped_resumed_count = 0
+        self.skipped_memory_limit = 0
+        self.skipped_duplicate_files = []
+        self.skipped_primary_files = []
+        self.skipped_additional_files = []
+        self.unmatched_candidates = {}
+        self.invalid_files = []
+        self.total_duration = 0.0
+        self.total_save_seconds = 0.0
+        self.total_write_seconds = 0.0
+        self.total_output_bytes = 0
+        self.total_image_bytes_saved = 0
+        self.stage_seconds = {'scan': 0.0, 'match': 0.0, 'validate': 0.0, 'merge': 0.0}
+        self.pair_metrics = []
+        self.timing_report_paths = []
+
+        self._paired_primary_paths = set()
+        self._paired_additional_paths = set()
+        self._handled_primary_paths = set()
+        self._job_fingerprints = {} # id(job) -> sidik input sebelum pasangan digabungkan (lihat _input_fingerprints)
+        self._processed_count = 0
+        self._total_hint = 0
+        self._progress_weights = None
+        self._live_metrics = None
+        self._last_metrics_emit = 0.0
+        self.schedule_order = None
+        self._hash_cache = None
+        self._validation_cache = None
+        self._validation_results = {} # path -> hasil validate_pdf dari validasi awal proses ini (ukuran, halaman)
+        self._prefetcher = None
+        self.prefetch_stats = {}
+        self.attachment_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'bytes_saved': 0}
+        self._writer = None
+        self._journal = None
+        self._resumed_outputs = set()
+        self._cancel_event = threading.Event()
+        self._worker_cancel_event = None # Salinan _cancel_event untuk proses pekerja (mode paralel)
+
+    def cancel(self):
+        """
+        Meminta proses berhenti dengan bersih: tidak ada pasangan baru yang dimulai, pasangan yang sedang
+        diproses diselesaikan dan dicatat di jurnal, lalu run() kembali. Aman dipanggil dari thread lain.
+        """
+        self._cancel_event.set()
+        if self._worker_cancel_event is not None:
+            self._worker_cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def _output_options(self):
+        """
+        Opsi yang mengubah isi output selain profil simpan, dicatat di manifest agar perubahan opsi
+        memicu penggabungan ulang. None bila semuanya bawaan (kompatibel dengan manifest lama).
+        """
+        options = {}
+        if self.image_options:
+            options['image'] = self.image_options
+        if self.dedup != 'off':
+            options['dedup'] = self.dedup
+        return options or None
+
+    def _log(self, message):
+        if self.log_callback:
+            self.log_callback(message)
+
+    def _progress(self, value):
+        if self.progress_callback:
+            self.progress_callback(value)
+
+    def _status(self, message):
+        if self.status_callback:
+            self.status_callback(message)
+
+    def _apply_merge_result(self, result, is_remerge=False):
+        """
+        Meneruskan log dan menjumlahkan penghitung dari hasil `merge_pair` (serial maupun paralel).
+        is_remerge=True dipakai untuk penggabungan ulang pasangan yang sudah dihitung (mode streaming).
+        """
+        for message in result['logs']:
+            self._log(message)
+        if not is_remerge:
+            if result['merged']:
+                self.merged_pairs_count += 1
+            self.skipped_primary_due_to_corruption += result['skipped_primary_due_to_corruption']
+            self.skipped_additional_due_to_corruption += result['skipped_additional_due_to_corruption']
+            self.skipped_memory_limit += result['skipped_memory_limit']
+        self.total_save_seconds += result['save_seconds']
+        self.total_write_seconds += result['write_seconds']
+        self.total_output_bytes += result['output_bytes']
+        self.total_image_bytes_saved += result['image_bytes_before'] - result['image_bytes_after']
+        self.skipped_duplicate_files.extend(name for name in result['duplicate_files']
+                                            if name not in self.skipped_duplicate_files)
+        for key, value in result['attachment_cache'].items():
+            self.attachment_cache_stats[key] += value
+        if self._hash_cache is not None:
+            self._hash_cache.update(result['hash_entries'])
+
+    def _input_fingerprints(self, input_paths, known_hashes):
+        """
+        Sidik input (ukuran, mtime) sebuah pasangan, diambil sebelum pasangan digabungkan: file yang berubah selama
+        penggabungan tetap tercatat dengan sidik lamanya, sehingga proses berikutnya menggabungkannya ulang.
+        Hash dari HashCache ikut dicatat bila ukuran dan mtime-nya sama; sisanya diisi dari hasil merge_pair
+        (hash_inputs). None untuk file yang tidak bisa di-stat (sidik diambil ulang saat dicatat).
+        """
+        fingerprints = []
+        for path in input_paths:
+            try:
+                fingerprint = file_fingerprint(path)
+            except OSError:
+                fingerprint = None
+            if self.verify_hash:
+                fingerprint = _with_sha256(path, fingerprint, known_hashes or {})
+            fingerprints.append(fingerprint)
+        return fingerprints
+
+    def _update_manifest(self, manifest, job, result):
+        primary_file_path, additional_file_paths_list, output_filepath = job
+        entry = None
+        input_paths = [primary_file_path] + additional_file_paths_list
+        fingerprints = self._job_fingerprints.pop(id(job), None)
+        if result['merged']:
+            if fingerprints is not None and self.verify_hash:
+                fingerprints = [_with_sha256(path, fingerprint, result['hash_entries'])
+                                for path, fingerprint in zip(input_paths, fingerprints)]
+            entry = manifest.record(output_filepath, input_paths, self.verify_hash, self.save_profile,
+                                    self._output_options(), fingerprints)
+        else:
+            manifest.forget(output_filepath)
+        if self._journal is not None:
+            try:
+                self._journal.record(os.path.basename(output_filepath), entry)
+            except OSError as e:
+                self._log(f"Peringatan: Gagal menulis jurnal checkpoint. ({e})")
+
+    def _metrics_snapshot(self, final=False):
+        remaining_weight = self._progress_weights.remaining() if self._progress_weights is not None else None
+        return self._live_metrics.snapshot(self._processed_count, max(self._total_hint, self._processed_count),
+                                           remaining_weight, current_rss_bytes(), final)
+
+    def _emit_metrics(self, final=False):
+        """
+        Mengirim snapshot metrik ke metrics_callback, paling sering sekali per METRICS_EMIT_INTERVAL_SECONDS.
+        """
+        if self.metrics_callback is None or self._live_metrics is None:
+            return
+        now = time.perf_counter()
+        if not final and now - self._last_metrics_emit < METRICS_EMIT_INTERVAL_SECONDS:
+            return
+        self._last_metrics_emit = now
+        self.metrics_callback(self._metrics_snapshot(final))
+
+    def _report_progress(self, processed_count, total_files_to_process):
+        if self._progress_weights is None:
+            # Mode streaming: jumlah pasangan belum diketahui di muka, jadi kemajuan dihitung per pasangan.
+            progress = int((processed_count / max(total_files_to_process, processed_count, 1)) * 100)
+        else:
+            progress = int(self._progress_weights.fraction() * 100)
+        self._progress(progress)
+        eta = self._metrics_snapshot()['eta_seconds'] if self._live_metrics is not None else None
+        remaining = f", sisa ± {format_duration(eta)}" if eta is not None and processed_count < total_files_to_process else ""
+        self._status(f"Memproses {processed_count}/{total_files_to_process} pasangan file{remaining}...")
+        self._emit_metrics()
+
+    def _schedule(self, pairs, largest_first):
+        """
+        Memperkirakan biaya setiap pasangan (ukuran file + jumlah halaman dari validasi awal) untuk kemajuan
+        berbobot; dengan largest_first (beberapa proses pekerja) pasangan terbesar dikerjakan lebih dulu.
+        Ukuran dan jumlah halaman diambil dari hasil validasi awal proses ini tanpa stat ulang; file lain di-stat.
+        """
+        validation = self._validation_results
+        page_counts = {path: entry.get('page_count', 0) for path, entry in validation.items()} or None
+        sizes = {path: entry['size'] for path, entry in validation.items() if entry.get('size') is not None}
+        scheduled = schedule_pairs(pairs, page_counts, largest_first, sizes)
+        self._progress_weights = WeightedProgress({primary: cost for (primary, _), cost in scheduled})
+        self.schedule_order = 'largest_first' if largest_first else 'input_order'
+        if largest_first and scheduled:
+            (largest_primary, _), largest_cost = scheduled[0]
+            self._log(f"Penjadwalan: {len(scheduled)} pasangan diurutkan dari perkiraan biaya terbesar "
+                      f"(total {self._progress_weights.total / (1024 * 1024):.1f} MB setara"
+                      f"{', termasuk jumlah halaman dari validasi awal' if page_counts else ''}); "
+                      f"terbesar '{os.path.basename(largest_primary)}' ({largest_cost / (1024 * 1024):.1f} MB setara).")
+        return [pair for pair, _ in scheduled]
+
+    def _build_pairs(self, primary_index, additional_indexes):
+        """
+        Mencocokkan indeks Folder Utama dengan indeks setiap Folder Tambahan dalam satu kali join per prefiks;
+        mengembalikan daftar (file_utama, [file_tambahan, ...]) terurut berdasarkan prefiks. File tambahan disusun
+        per folder sesuai urutan Folder Tambahan, lalu berdasarkan nomor urut.
+        """
+        files_to_merge_pairs = []
+        folder_groups = [self._group_additional(primary_index, index) for index in additional_indexes]
+        for primary_prefix, primary_entry in sorted(primary_index.primary_by_prefix.items()):
+            primary_file_path = primary_entry.path
+            sorted_additional_paths = [path for groups in folder_groups
+                                       for path in _sorted_additional_paths(groups.get(primary_prefix, ()))]
+
+            if sorted_additional_paths:
+                self._log(f"Menganalisis pasangan untuk prefiks '{primary_prefix}' (File Utama: '{os.path.basename(primary_file_path)}')")
+                for pair in self._apply_primary_policy(primary_index, primary_prefix, sorted_additional_paths):
+                    files_to_merge_pairs.append(pair)
+                    self._log(f"Pasangan ditemukan: '{os.path.basename(pair[0])}' dengan {len(pair[1])} file tambahan.")
+            else:
+                self._log(f"Melewatkan file utama (tidak ada pasangan di folder tambahan untuk prefiks '{primary_prefix}'): '{os.path.basename(primary_file_path)}'")
+        return files_to_merge_pairs
+
+    def _apply_primary_policy(self, primary_index, prefix, additional_paths):
+        """
+        Pasangan untuk satu prefiks sesuai primary_policy bila prefiks itu memiliki beberapa File Utama
+        (lihat PRIMARY_POLICIES). File Utama terpilih (tanpa nomor diutamakan) selalu menjadi nama output pertama.
+        """
+        chosen = primary_index.primary_by_prefix[prefix]
+        entries = primary_index.by_prefix[prefix]
+        if len(entries) == 1:
+            return [(chosen.path, additional_paths)]
+        other_paths = _sorted_additional_paths([entry for entry in entries if entry is not chosen])
+        if self.primary_policy == 'separate':
+            return [(path, list(additional_paths)) for path in [chosen.path] + other_paths]
+        if self.primary_policy == 'combine':
+            return [(chosen.path, other_paths + additional_paths)]
+        self._log(f"Peringatan: {len(other_paths)} File Utama lain dengan prefiks '{prefix}' dilewati "
+                  f"(memakai '{os.path.basename(chosen.path)}'). Pilih kebijakan file utama ganda 'separate' atau "
+                  f"'combine' untuk ikut menggabungkannya.")
+        return [(chosen.path, additional_paths)]
+
+    def _primary_output_count(self, primary_index):
+        """
+        Jumlah output yang mungkin dibuat dari Folder Utama (satu per prefiks, atau satu per File Utama untuk 'separate').
+        """
+        if self.primary_policy == 'separate':
+            return sum(len(primary_index.by_prefix[prefix]) for prefix in primary_index.primary_by_prefix)
+        return len(primary_index.primary_by_prefix)
+
+    def _primary_prefix_index(self, primary_index):
+        """
+        Indeks awalan prefiks File Utama, atau None bila aturan tidak memakai pencocokan awalan.
+        """
+        if not self.match_rules.starts_with:
+            return None
+        return SortedPrefixIndex(primary_index.primary_by_prefix)
+
+    @staticmethod
+    def _resolve_prefix(prefix, primary_index, prefix_index):
+        """
+        Menentukan prefiks File Utama untuk prefiks file tambahan: sama persis, atau (dengan pencocokan awalan)
+        prefiks File Utama terpanjang yang menjadi awalannya. None bila tidak ada pasangan.
+        """
+        if prefix in primary_index.primary_by_prefix:
+            return prefix
+        if prefix_index is None or prefix is None:
+            return None
+        return prefix_index.longest_prefix(prefix)
+
+    def _group_additional(self, primary_index, additional_index):
+        """
+        Mengelompokkan file tambahan per prefiks File Utama.
+        """
+        prefix_index = self._primary_prefix_index(primary_index)
+        if prefix_index is None:
+            return additional_index.by_prefix
+        groups = {}
+        for prefix, entries in additional_index.by_prefix.items():
+            target_prefix = self._resolve_prefix(prefix, primary_index, prefix_index)
+            if target_prefix is not None:
+                groups.setdefault(target_prefix, []).extend(entries)
+        return groups
+
+    def _find_unmatched_candidates(self, primary_index, additional_index, skipped_primary, skipped_additional):
+        """
+        Mencari nama file terdekat untuk file tanpa pasangan (mis. salah ketik nomor SEP): file utama dibandingkan
+        dengan prefiks Folder Tambahan dan sebaliknya. Mengembalikan dict nama_file -> [nama_file_kandidat, ...].
+        """
+        candidates = {}
+        sides = ((skipped_primary, additional_index.by_prefix, lambda entries: entries[0].name),
+                 (skipped_additional, primary_index.primary_by_prefix, lambda entry: entry.name))
+        remaining = UNMATCHED_CANDIDATE_LIMIT
+        for skipped_entries, other_by_prefix, display_name in sides:
+            if not skipped_entries or not other_by_prefix:
+                continue
+            other_index = SortedPrefixIndex(other_by_prefix)
+            for entry in skipped_entries[:remaining]:
+                closest = other_index.closest(entry.prefix or entry.original_base_name_lower)
+                if closest:
+                    candidates[entry.name] = [display_name(other_by_prefix[key]) for key in closest]
+            remaining -= min(remaining, len(skipped_entries))
+        return candidates
+
+    def _log_skipped_files(self, title, names):
+        self._log(title)
+        for fname in names:
+            closest = self.unmatched_candidates.get(fname)
+            if closest:
+                self._log(f"- {fname} (kandidat terdekat: {', '.join(closest)})")
+            else:
+                self._log(f"- {fname}")
+
+    def _iter_streaming_pairs(self, primary_index, additional_index):
+        """
+        Memindai Folder Tambahan per folder dan menghasilkan pasangan begitu folder yang memuat prefiksnya
+        selesai didaftar. Mengasumsikan file tambahan satu klaim berada di satu folder; prefiks yang muncul lagi
+        di folder berikutnya dihasilkan ulang di akhir pemindaian dengan daftar lengkap sehingga output tetap benar.
+        Dijalankan di thread produsen.
+        """
+        emitted_prefixes = set()
+        late_prefixes = []
+        prefix_index = self._primary_prefix_index(primary_index)
+        additional_groups = {}
+        if is_source_folder(additional_index.folder):
+            # Waktu pindai diukur tanpa waktu menunggu di yield (antrean penuh saat penggabungan lebih lambat).
+            # Pencocokan berlangsung di dalam pemindaian, jadi ikut dihitung sebagai waktu pindai.
+            scan_start = time.perf_counter()
+            for _, pdf_files in iter_pdf_dirs(additional_index.folder):
+                completed_prefixes = {}
+                for path, name in pdf_files:
+                    entry = additional_index.add(path, name)
+                    target_prefix = self._resolve_prefix(entry.prefix, primary_index, prefix_index)
+                    if target_prefix is not None:
+                        additional_groups.setdefault(target_prefix, []).append(entry)
+                        completed_prefixes[target_prefix] = True
+                self.stage_seconds['scan'] += time.perf_counter() - scan_start
+                for prefix in completed_prefixes:
+                    if prefix in emitted_prefixes:
+                        if prefix not in late_prefixes:
+                            late_prefixes.append(prefix)
+                        continue
+                    emitted_prefixes.add(prefix)
+                    for primary_path, additional_paths in self._apply_primary_policy(
+                            primary_index, prefix, _sorted_additional_paths(additional_groups[prefix])):
+                        yield primary_path, additional_paths, False
+                scan_start = time.perf_counter()
+
+        for prefix in late_prefixes:
+            for primary_path, additional_paths in self._apply_primary_policy(
+                    primary_index, prefix, _sorted_additional_paths(additional_groups[prefix])):
+                yield primary_path, additional_paths, True
+
+    def _stream_pairs(self, primary_index, additional_index):
+        """
+        Produsen/konsumen: pemindaian Folder Tambahan berjalan di thread latar, sementara pasangan yang sudah
+        lengkap langsung diteruskan ke penggabungan.
+        """
+        pair_queue = queue.Queue(maxsize=max(4, self.jobs * 4))
+        stop_event = threading.Event() # Konsumen berhenti lebih awal (dibatalkan atau error)
+
+        def put(item):
+            while not stop_event.is_set():
+                try:
+                    pair_queue.put(item, timeout=0.2)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        validation_executor = (ThreadPoolExecutor(max_workers=VALIDATION_THREADS, thread_name_prefix="penggabung-validasi")
+                               if self.prevalidate else None)
+
+        def produce():
+            try:
+                for pair in self._iter_streaming_pairs(primary_index, additional_index):
+                    prefetcher = self._prefetcher
+                    if prefetcher is not None:
+                        # Antrean yang terbatas sekaligus membatasi kedalaman baca di muka.
+                        prefetcher.request([pair[0]] + pair[1])
+                    # Validasi di thread produsen agar berjalan bersamaan dengan penggabungan pasangan sebelumnya;
+                    # pengecualian dan penghitungannya tetap dilakukan konsumen.
+                    validation = {}
+                    if validation_executor is not None:
+                        validate_start = time.perf_counter()
+                        validation = self._validate_paths([pair[0]] + pair[1], validation_executor)
+                        self.stage_seconds['validate'] += time.perf_counter() - validate_start
+                    if not put(('pair', (pair, validation))):
+                        return
+                put(('done', None))
+            except BaseException as e:
+                put(('error', e))
+
+        producer = threading.Thread(target=produce, name="penggabung-scanner", daemon=True)
+        producer.start()
+        try:
+            while True:
+                kind, payload = pair_queue.get()
+                if kind == 'done':
+                    break
+                if kind == 'error':
+                    raise payload
+                (primary_file_path, sorted_additional_paths, is_late), validation = payload
+                valid_additional_paths = self._exclude_invalid(primary_file_path, sorted_additional_paths, validation)
+                if self._prefetcher is not None:
+                    # Lepaskan hasil baca di muka untuk file yang dikecualikan.
+                    kept_paths = set() if valid_additional_paths is None else {primary_file_path, *valid_additional_paths}
+                    excluded_paths = [p for p in [primary_file_path] + sorted_additional_paths if p not in kept_paths]
+                    if excluded_paths:
+                        self._prefetcher.discard(excluded_paths)
+                if valid_additional_paths is None:
+                    continue
+                sorted_additional_paths = valid_additional_paths
+                if is_late:
+                    self._log(f"Peringatan: File tambahan untuk '{os.path.basename(primary_file_path)}' tersebar di beberapa folder. Pasangan ini digabungkan ulang dengan {len(sorted_additional_paths)} file tambahan.")
+                else:
+                    self._log(f"Pasangan ditemukan: '{os.path.basename(primary_file_path)}' dengan {len(sorted_additional_paths)} file tambahan.")
+                yield primary_file_path, sorted_additional_paths
+        finally:
+            stop_event.set()
+            producer.join()
+            if validation_executor is not None:
+                validation_executor.shutdown(cancel_futures=True)
+
+    @property
+    def output_folder_path(self):
+        return self.requested_output_folder or os.path.join(self.output_base_dir, OUTPUT_FOLDER_NAME)
+
+    def _prepare_output_folder(self):
+        self.final_output_folder_path = self.output_folder_path
+
+        os.makedirs(self.final_output_folder_path, exist_ok=True)
+        self._log(f"--- Membuat Folder Output: '{self.final_output_folder_path}' ---")
+        self._status(f"Membuat folder output: '{os.path.basename(self.final_output_folder_path)}'")
+        removed = remove_partial_files(self.final_output_folder_path)
+        if removed:
+            self._log(f"{removed} file sementara sisa proses sebelumnya yang terhenti dihapus.")
+        if self.prevalidate:
+            self._validation_cache = HashCache(self.final_output_folder_path, VALIDATION_CACHE_FILENAME)
+
+    def _validate_paths(self, paths, executor, report_progress=False):
+        """
+        Memvalidasi paths secara paralel di executor; hasil yang tersimpan di cache (ukuran dan mtime sama) dipakai
+        ulang. Mengembalikan dict path -> hasil validate_pdf; file yang hilang tidak ada di dict.
+        """
+        results = self._validation_cache.lookup(paths)
+        futures = {executor.submit(validate_pdf, path): path for path in paths if path not in results}
+        new_entries = {}
+        try:
+            for done_count, future in enumerate(as_completed(futures), start=1):
+                if self._cancel_event.is_set():
+                    break
+                result = future.result()
+                if result is not None:
+                    results[futures[future]] = new_entries[futures[future]] = result
+                if report_progress and done_count % 100 == 0:
+                    self._status(f"Memvalidasi file PDF: {done_count}/{len(futures)}")
+        finally:
+            for future in futures:
+                future.cancel()
+            self._validation_cache.update(new_entries)
+        return results
+
+    def _exclude_invalid(self, primary_file_path, additional_paths, validation):
+        """
+        Mengecualikan file yang gagal validasi awal dan menghitungnya sebagai file rusak. Mengembalikan daftar file
+        tambahan yang valid, atau None bila File Utama tidak valid (pasangan dilewati).
+        File tanpa hasil validasi (hilang atau dibatalkan) tetap diteruskan dan ditangani merge_pair seperti biasa.
+        """
+        primary_result = validation.get(primary_file_path)
+        if primary_result is not None and not primary_result['ok']:
+            self._record_invalid(primary_file_path, 'utama', primary_result['reason'])
+            self._log(f"Melewatkan pasangan: File Utama tidak valid '{os.path.basename(primary_file_path)}' ({primary_result['reason']}).")
+            self.skipped_primary_due_to_corruption += 1
+            return None
+        valid_paths = []
+        for path in [primary_file_path] + additional_paths:
+            result = validation.get(path)
+            if result is not None and result.get('warning'):
+                self._log(f"Peringatan: '{os.path.basename(path)}' {result['warning']}.")
+            if path == primary_file_path:
+                continue
+            if result is not None and not result['ok']:
+                self._record_invalid(path, 'tambahan', result['reason'])
+                self._log(f"File tambahan tidak valid dikecualikan: '{os.path.basename(path)}' ({result['reason']}).")
+                self.skipped_additional_due_to_corruption += 1
+            else:
+                valid_paths.append(path)
+        return valid_paths
+
+    def _record_invalid(self, path, role, reason):
+        self.invalid_files.append({'file': os.path.basename(path), 'path': path, 'role': role, 'reason': reason})
+
+    def _prevalidate_pairs(self, pairs):
+        """
+        Validasi awal semua file pasangan sebelum penggabungan dimulai. Mengembalikan pasangan tanpa file yang tidak valid.
+        """
+        validate_start = time.perf_counter()
+        paths = list(dict.fromkeys(path for primary, additionals in pairs for path in [primary] + additionals))
+        self._log(f"--- Validasi Awal {len(paths)} File PDF ---")
+        self._status(f"Memvalidasi {len(paths)} file PDF...")
+        cached_count = len(self._validation_cache.lookup(paths))
+        with ThreadPoolExecutor(max_workers=VALIDATION_THREADS, thread_name_prefix="penggabung-validasi") as executor:
+            validation = self._validate_paths(paths, executor, report_progress=True)
+        self._validation_results = validation
+        valid_pairs = []
+        for primary_file_path, additional_paths in pairs:
+            valid_additional_paths = self._exclude_invalid(primary_file_path, additional_paths, validation)
+            if valid_additional_paths is not None:
+                valid_pairs.append((primary_file_path, valid_additional_paths))
+        self.stage_seconds['validate'] = time.perf_counter() - validate_start
+        self._log(f"Validasi awal selesai dalam {self.stage_seconds['validate']:.2f} detik: {len(paths)} file "
+                  f"({cached_count} dari cache), {len(self.invalid_files)} tidak valid dan dikecualikan.")
+        return valid_pairs
+
+    def _save_validation_cache(self):
+        if self._validation_cache is None:
+            return
+        try:
+            self._validation_cache.save()
+        except OSError as e:
+            self._log(f"Peringatan: Gagal menyimpan cache validasi. ({e})")
+
+    def _pending_jobs(self, pairs, manifest):
+        """
+        Mengubah pasangan menjadi job (utama, tambahan, output) dan melewati pasangan yang tidak berubah menurut manifest.
+        """
+        for primary_file_path, additional_file_paths_list in pairs:
+            job = (primary_file_path, additional_file_paths_list,
+                   os.path.join(self.final_output_folder_path, os.path.basename(primary_file_path)))
+            self._paired_primary_paths.add(primary_file_path)
+            self._paired_additional_paths.update(additional_file_paths_list)
+
+            is_resumed = os.path.basename(job[2]) in self._resumed_outputs
+            if (is_resumed or self.incremental) and manifest.is_up_to_date(job[2], [job[0]] + job[1], self.verify_hash,
+                                                                            self.save_profile, self._output_options()):
+                if is_resumed:
+                    self.skipped_resumed_count += 1
+                    self._log(f"Sudah selesai pada proses yang terhenti, dilewati: '{os.path.basename(primary_file_path)}'")
+                else:
+                    self.skipped_unchanged_count += 1
+                    self._log(f"Tidak berubah sejak proses sebelumnya, dilewati: '{os.path.basename(primary_file_path)}'")
+                if self._prefetcher is not None:
+                    self._prefetcher.discard([job[0]] + job[1])
+                if self._progress_weights is not None:
+                    self._progress_weights.skip(primary_file_path)
+                self._processed_count += 1
+                self._report_progress(self._processed_count, self._total_hint)
+                continue
+            yield job
+
+    def _read_ahead(self, jobs):
+        """
+        Menahan hingga prefetch_pairs job berikutnya dan meminta file-nya dibaca di muka
+        selagi job sebelumnya digabungkan.
+        """
+        window = collections.deque()
+        for job in jobs:
+            self._prefetcher.request([job[0]] + job[1])
+            window.append(job)
+            if len(window) > self.prefetch_pairs:
+                yield window.popleft()
+        while window:
+            yield window.popleft()
+
+    def _merge_all(self, pairs, total_hint):
+        """
+        Konsumen: menggabungkan pasangan dari `pairs` (list atau generator) secara serial atau di ProcessPoolExecutor.
+        Pasangan yang tidak berubah menurut manifest dilewati. total_hint dipakai untuk persentase kemajuan.
+        File pasangan berikutnya dibaca di muka oleh InputPrefetcher: dalam mode batch lewat _read_ahead,
+        dalam mode streaming oleh thread pemindai saat pasangan masuk antrean.
+        """
+        manifest = MergeManifest(self.final_output_folder_path)
+        self._processed_count = 0
+        self._total_hint = total_hint
+        self._progress_weights = None
+        self._last_metrics_emit = 0.0
+
+        self._log("--- Memulai Penggabungan Pasangan File ---")
+        self._journal = MergeJournal(self.final_output_folder_path)
+        journal_entries = self._journal.load()
+        if journal_entries:
+            # Proses sebelumnya terhenti: manifest mungkin belum sempat disimpan, jadi pulihkan dari jurnal.
+            manifest.apply(journal_entries)
+            manifest.save()
+            completed = sum(1 for entry in journal_entries.values() if entry is not None)
+            if self.resume:
+                self._resumed_outputs = {name for name, entry in journal_entries.items() if entry is not None}
+                self._log(f"Melanjutkan proses yang terhenti: {completed} pasangan sudah selesai dan akan dilewati.")
+            else:
+                self._log(f"Ditemukan jurnal proses yang terhenti ({completed} pasangan selesai). "
+                          f"Aktifkan opsi lanjutkan untuk melewati pasangan tersebut.")
+        self._journal.open(keep_existing=self.resume)
+        self._log(f"Profil simpan: '{self.save_profile}' {SAVE_PROFILES[self.save_profile]}")
+        if self.memory_limit_mb:
+            self._log(f"Mode hemat memori: batas {self.memory_limit_mb} MB per proses.")
+        if self.image_options:
+            self._log(f"Optimasi gambar: maks {self.image_options['dpi']} DPI, kualitas JPEG {self.image_options['quality']}")
+        if self.dedup != 'off':
+            self._log(f"Deduplikasi lampiran: mode '{self.dedup}'")
+        if self.dedup != 'off' or self.verify_hash:
+            self._hash_cache = HashCache(self.final_output_folder_path)
+        if self.prefetch_pairs and self.prefetch_memory_mb:
+            self._log(f"Baca di muka: {self.prefetch_pairs} pasangan, maks {self.prefetch_memory_mb} MB")
+            self._prefetcher = InputPrefetcher(self.prefetch_memory_mb * 1024 * 1024)
+        if self.attachment_cache_mb and not self.memory_limit_mb:
+            self._log(f"Cache lampiran bersama: maks {self.attachment_cache_mb} MB per proses")
+        # Argumen merge_pair setelah job; known_hashes dan prefetched ditambahkan per pasangan.
+        merge_options = (self.save_profile, self.memory_limit_mb, self.image_options, self.dedup)
+        # Hasil diserialisasi oleh merge_pair (tobytes) dan ditulis di thread penulis selagi pasangan berikutnya digabungkan.
+        self._writer = OutputWriter(max_pending=max(2, self.jobs))
+
+        executor = None
+        worker_count = 1
+        if self.jobs > 1 and total_hint > 1:
+            worker_count = min(self.jobs, total_hint)
+            self._log(f"Mode paralel: {worker_count} proses pekerja.")
+            self._worker_cancel_event = multiprocessing.Event()
+            if self._cancel_event.is_set():
+                self._worker_cancel_event.set()
+            executor = ProcessPoolExecutor(max_workers=worker_count, initializer=_init_worker,
+                                           initargs=(self._worker_cancel_event,))
+        self._live_metrics = LiveMetrics(worker_count)
+        if isinstance(pairs, list):
+            # Mode serial tetap urut prefiks: urutan tidak mengubah total waktu bila hanya ada satu pekerja.
+            pairs = self._schedule(pairs, largest_first=worker_count > 1)
+        else:
+            self.schedule_order = 'streaming'
+        in_flight = {}
+        self._cancelled_queued_count = 0
+
+        try:
+            jobs = self._pending_jobs(pairs, manifest)
+            if self._prefetcher is not None and not self.streaming:
+                jobs = self._read_ahead(jobs)
+            for job in jobs:
+                if self._cancel_event.is_set():
+                    self._log("Pembatalan diminta: tidak ada pasangan baru yang dimulai, menunggu pasangan yang sedang diproses...")
+                    break
+                input_paths = [job[0]] + job[1]
+                known_hashes = self._hash_cache.lookup(input_paths) if self._hash_cache is not None else None
+                prefetched = self._prefetcher.take(input_paths) if self._prefetcher is not None else None
+                self._live_metrics.start_job(job[0], os.path.basename(job[0]))
+                if executor is None:
+                    self._emit_metrics()
+                    self._job_fingerprints[id(job)] = self._input_fingerprints(input_paths, known_hashes)
+                    try:
+                        result = merge_pair(*job, *merge_options, known_hashes, prefetched, True, self.attachment_cache_mb,
+                                            self.verify_hash)
+                    finally:
+                        if prefetched:
+                            self._prefetcher.release(prefetched)
+                    self._handle_merge_result(manifest, job, result)
+                    continue
+
+                # Batasi jumlah pekerjaan yang mengantre, dan jangan menulis file output yang sama secara bersamaan.
+                while in_flight and (len(in_flight) >= worker_count * 2
+                                     or any(other[2] == job[2] for other in in_flight.values())):
+                    self._collect_finished(manifest, in_flight, block=True)
+                self._job_fingerprints[id(job)] = self._input_fingerprints(input_paths, known_hashes)
+                future = executor.submit(_merge_pair_unless_cancelled, *job, *merge_options, known_hashes, prefetched,
+                                         True, self.attachment_cache_mb, self.verify_hash)
+                if prefetched:
+                    # Bytes yang dibaca di muka tetap dihitung selama pekerjaan mengantre di pool; dilepas saat selesai
+                    # atau dibatalkan.
+                    future.add_done_callback(functools.partial(_release_prefetched, self._prefetcher, prefetched))
+                in_flight[future] = job
+                self._collect_finished(manifest, in_flight, block=False)
+
+            while in_flight:
+                if self._cancel_event.is_set():
+                    self._cancel_queued(in_flight)
+                    if not in_flight:
+                        break
+                self._collect_finished(manifest, in_flight, block=True)
+        finally:
+            if hasattr(pairs, 'close'):
+                pairs.close() # Hentikan thread pemindai mode streaming bila berhenti lebih awal
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+            self._writer.close()
+            self._collect_written(manifest)
+            self._writer = None
+            if self._prefetcher is not None:
+                self.prefetch_stats = self._prefetcher.stats()
+                self._prefetcher.close()
+                self._prefetcher = None
+            clear_attachment_cache() # Cache proses utama (mode serial); proses pekerja berhenti bersama executor
+            manifest.save()
+            self._journal.close()
+            if self._hash_cache is not None:
+                try:
+                    self._hash_cache.save()
+                except OSError as e:
+                    self._log(f"Peringatan: Gagal menyimpan cache hash. ({e})")
+
+        if self._cancelled_queued_count:
+            self._log(f"{self._cancelled_queued_count} pasangan yang belum dimulai dibatalkan.")
+        if not self._cancel_event.is_set():
+            self._journal.remove() # Selesai lengkap: semua catatan sudah ada di manifest.
+        self._journal = None
+        if self.skipped_unchanged_count:
+            self._log(f"{self.skipped_unchanged_count} pasangan tidak berubah sejak proses sebelumnya dan dilewati.")
+        if self.prefetch_stats:
+            self._log(f"Baca di muka: {self.prefetch_stats['hits']} file siap, {self.prefetch_stats['waits']} file ditunggu, "
+                      f"{self.prefetch_stats['misses']} file dibaca langsung dari disk "
+                      f"({self.prefetch_stats['prefetched_bytes'] / (1024 * 1024):.1f} MB dibaca di muka)")
+        cache_stats = self.attachment_cache_stats
+        if cache_stats['hits'] or cache_stats['misses']:
+            self._log(f"Cache lampiran bersama: {cache_stats['hits']} kali dipakai ulang, {cache_stats['misses']} file diurai, "
+                      f"{cache_stats['evictions']} dikeluarkan "
+                      f"({cache_stats['bytes_saved'] / (1024 * 1024):.1f} MB tidak perlu diurai ulang)")
+        self._progress(100)
+        self._emit_metrics(final=True)
+
+    def _cancel_queued(self, in_flight):
+        """
+        Membatalkan pasangan di in_flight yang belum diambil proses pekerja, sehingga setelah pembatalan hanya pasangan
+        yang sedang diproses yang ditunggu. Pasangan yang dibatalkan tidak dicatat di jurnal dan dikerjakan pada
+        proses berikutnya (--resume).
+        """
+        cancelled = [future for future in in_flight if future.cancel()]
+        for future in cancelled:
+            job = in_flight.pop(future)
+            self._live_metrics.cancel_job(job[0])
+            self._job_fingerprints.pop(id(job), None)
+        self._cancelled_queued_count += len(cancelled)
+
+    def _collect_finished(self, manifest, in_flight, block):
+        done, _ = wait(in_flight, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        for future in done:
+            job = in_flight.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                result = _failed_pair_result(job[0], e)
+            if result is None: # Dibatalkan di proses pekerja sebelum dimulai (lihat _merge_pair_unless_cancelled)
+                self._live_metrics.cancel_job(job[0])
+                self._job_fingerprints.pop(id(job), None)
+                self._cancelled_queued_count += 1
+                continue
+            self._handle_merge_result(manifest, job, result)
+
+    def _handle_merge_result(self, manifest, job, result):
+        """
+        Bytes output diteruskan ke OutputWriter; pasangan baru dihitung dan dicatat di manifest
+        setelah file-nya benar-benar tertulis (lihat _collect_written).
+        """
+        output_data = result.pop('output_data', None)
+        if output_data is not None:
+            self._writer.submit(job[2], output_data, (job, result))
+        else:
+            self._finish_merge_result(manifest, job, result)
+        self._collect_written(manifest)
+
+    def _collect_written(self, manifest):
+        for (job, result), error, write_seconds in self._writer.completed():
+            result['write_seconds'] = write_seconds
+            if error is not None:
+                result['merged'] = False
+                result['output_bytes'] = 0
+                result['skipped_primary_due_to_corruption'] += 1
+                result['logs'].append(f"Error: Gagal menulis file output '{os.path.basename(job[2])}'. Pasangan ini dilewati. ({error})")
+            self._finish_merge_result(manifest, job, result)
+
+    def _finish_merge_result(self, manifest, job, result):
+        is_remerge = job[0] in self._handled_primary_paths
+        self._handled_primary_paths.add(job[0])
+        metrics = {field: result[field] for field in PAIR_METRIC_FIELDS if field in result}
+        metrics['primary_file'] = os.path.basename(job[0])
+        self.pair_metrics.append(metrics)
+        self._apply_merge_result(result, is_remerge=is_remerge)
+        self._update_manifest(manifest, job, result)
+        weight = 0
+        if not is_remerge:
+            self._processed_count += 1
+            if self._progress_weights is not None:
+                weight = self._progress_weights.complete(job[0])
+        self._live_metrics.finish_job(job[0], result, weight)
+        self._report_progress(self._processed_count, self._total_hint)
+
+    def _record_paired(self, pairs):
+        for primary_file_path, sorted_additional_paths in pairs:
+            self._paired_primary_paths.add(primary_file_path)
+            self._paired_additional_paths.update(sorted_additional_paths)
+
+    def _scan_and_match(self):
+        """
+        Tahap pindai dan cocokkan (tanpa membuka PDF). Mengembalikan (indeks_utama, indeks_tambahan, pasangan).
+        """
+        scan_start = time.perf_counter()
+        # Semua folder dipindai bersamaan, satu kali per folder; additional_index gabungan dipakai untuk ringkasan.
+        primary_index, *additional_indexes = scan_folder_list([self.primary_folder] + self.additional_folders,
+                                                              concurrent=self.concurrent_scan,
+                                                              parse_name=self.match_rules.parse)
+        additional_index = combine_indexes(additional_indexes, self.additional_folder)
+        self.stage_seconds['scan'] = time.perf_counter() - scan_start
+        self._log(f"Ditemukan {len(primary_index.all_paths)} file di Folder Utama dan {len(additional_index.all_paths)} file di Folder Tambahan.")
+        if len(additional_indexes) > 1:
+            for order, index in enumerate(additional_indexes, start=1):
+                self._log(f"  Folder Tambahan {order}: '{index.folder}' ({len(index.all_paths)} file)")
+
+        self._log("--- Menganalisis Pasangan File untuk Penggabungan ---")
+        match_start = time.perf_counter()
+        files_to_merge_pairs = self._build_pairs(primary_index, additional_indexes)
+        self.stage_seconds['match'] = time.perf_counter() - match_start
+        self._record_paired(files_to_merge_pairs)
+        return primary_index, additional_index, files_to_merge_pairs
+
+    def _set_skipped(self, primary_index, additional_index):
+        # Dengan kebijakan 'combine', File Utama lain dengan prefiks yang sama disisipkan sebagai file tambahan.
+        skipped_primary_entries = [e for e in primary_index.entries if e.path not in self._paired_primary_paths
+                                   and e.path not in self._paired_additional_paths]
+        skipped_additional_entries = [e for e in additional_index.entries if e.path not in self._paired_additional_paths]
+        self.skipped_primary_files = [e.name for e in skipped_primary_entries]
+        self.skipped_additional_files = [e.name for e in skipped_additional_entries]
+        self.unmatched_candidates = self._find_unmatched_candidates(
+            primary_index, additional_index, skipped_primary_entries, skipped_additional_entries)
+
+    def _set_skipped_from_plan(self, plan):
+        self.skipped_primary_files = [os.path.basename(p) for p in plan.primary_paths if p not in self._paired_primary_paths]
+        self.skipped_additional_files = [os.path.basename(p) for p in plan.additional_paths if p not in self._paired_additional_paths]
+        skipped_names = set(self.skipped_primary_files) | set(self.skipped_additional_files)
+        self.unmatched_candidates = {name: closest for name, closest in plan.unmatched_candidates.items()
+                                     if name in skipped_names}
+
+    def build_plan(self):
+        """
+        Mode pratinjau (dry-run): hanya memindai dan mencocokkan, tanpa membuka PDF atau membuat folder output.
+        Mengembalikan MergePlan, atau None bila Folder Utama tidak ditemukan.
+        """
+        self._log("--- Membuat Rencana Penggabungan (Pratinjau) ---")
+        self._status("Memindai dan mencocokkan file untuk pratinjau...")
+        if not is_source_folder(self.primary_folder):
+            self._log(f"Error: Folder Utama '{self.primary_folder}' tidak ditemukan atau bukan direktori.")
+            return None
+        try:
+            primary_index, additional_index, pairs = self._scan_and_match()
+        finally:
+            close_archives() # Jangan mengunci arsip ZIP di antara putaran mode pantau
+        self._set_skipped(primary_index, additional_index)
+        self._log(f"Rencana: {len(pairs)} pasangan; {len(self.skipped_primary_files)} file utama dan "
+                  f"{len(self.skipped_additional_files)} file tambahan tanpa pasangan "
+                  f"(pindai {self.stage_seconds['scan']:.2f} detik, cocokkan {self.stage_seconds['match']:.2f} detik).")
+        self._status(f"Pratinjau selesai: {len(pairs)} pasangan.")
+        return MergePlan(self.primary_folder, self.additional_folder, pairs,
+                         primary_paths=[e.path for e in primary_index.entries],
+                         additional_paths=[e.path for e in additional_index.entries],
+                         primary_count=self._primary_output_count(primary_index),
+                         unmatched_candidates=self.unmatched_candidates)
+
+    def run(self):
+        """
+        Logika utama untuk mencari, mencocokkan, dan menggabungkan file PDF menggunakan PyMuPDF.
+        Mengembalikan tuple (berhasil, pesan, folder_output).
+        """
+        start_time = time.time() # Mulai timer
+
+        try:
+            self._log("--- Memulai Proses Penggabungan PDF ---")
+            if self.match_rules.name != DEFAULT_RULE_SET:
+                self._log(f"Aturan pencocokan nama file: '{self.match_rules.name}' {self.match_rules.description}".rstrip())
+            self._status("Memvalidasi folder dan mencari file PDF...")
+
+            if not is_source_folder(self.primary_folder):
+                self._log(f"Error: Folder Utama '{self.primary_folder}' tidak ditemukan atau bukan direktori.")
+                return False, "Folder Utama tidak ditemukan.", ""
+
+            if self.plan is None:
+                self._log(f"Mencari file PDF di Folder Utama: '{self.primary_folder}'...")
+                for additional_folder in self.additional_folders:
+                    if is_source_folder(additional_folder):
+                        self._log(f"Mencari file PDF di Folder Tambahan: '{additional_folder}'...")
+                    else:
+                        self._log(f"Peringatan: Folder Tambahan '{additional_folder}' tidak ditemukan atau bukan direktori. Hanya akan memproses file berpasangan jika folder ini ada.")
+                if self.primary_policy != DEFAULT_PRIMARY_POLICY:
+                    self._log(f"Kebijakan file utama ganda: '{self.primary_policy}'")
+
+            if self.plan is not None:
+                self._log(f"Memakai rencana penggabungan yang sudah dikonfirmasi: {len(self.plan.pairs)} pasangan (tanpa memindai ulang).")
+                files_to_merge_pairs = self.plan.pairs
+                self._record_paired(files_to_merge_pairs)
+                primary_count = self.plan.primary_count
+                self._set_skipped_from_plan(self.plan)
+            elif self.streaming:
+                # Folder Utama dipindai penuh lebih dulu (biasanya satu file per klaim), lalu Folder Tambahan
+                # dipindai sambil menggabungkan.
+                scan_start = time.perf_counter()
+                primary_index = scan_folder(self.primary_folder, self.match_rules.parse)
+                self.stage_seconds['scan'] += time.perf_counter() - scan_start
+                additional_index = FolderIndex(self.additional_folder, self.match_rules.parse)
+                self._log(f"Mode streaming: {len(primary_index.all_paths)} file di Folder Utama, penggabungan dimulai sambil memindai Folder Tambahan.")
+                self._prepare_output_folder()
+                merge_start = time.perf_counter()
+                self._merge_all(self._stream_pairs(primary_index, additional_index),
+                                total_hint=self._primary_output_count(primary_index))
+                self.stage_seconds['merge'] = time.perf_counter() - merge_start
+                self._log(f"Ditemukan {len(additional_index.all_paths)} file di Folder Tambahan.")
+                primary_count = self._primary_output_count(primary_index)
+                self._set_skipped(primary_index, additional_index)
+            else:
+                if self.streaming_requested and self.plan is None:
+                    self._log(f"Mode streaming hanya untuk satu Folder Tambahan; {len(self.additional_folders)} folder "
+                              f"dipindai bersamaan lebih dulu, lalu digabungkan.")
+                primary_index, additional_index, files_to_merge_pairs = self._scan_and_match()
+                primary_count = self._primary_output_count(primary_index)
+                self._set_skipped(primary_index, additional_index)
+
+            skipped_primary_files = self.skipped_primary_files
+            skipped_additional_files = self.skipped_additional_files
+
+            if not self._paired_primary_paths:
+                self._log("Tidak ada pasangan file PDF yang ditemukan untuk digabungkan.")
+                self._log("Pastikan file di Folder Utama memiliki nama depan yang sama dengan file di Folder Tambahan (sebelum '_' atau ' (angka)' atau ' angka').")
+                if skipped_primary_files:
+                    self._log_skipped_files("\n--- Ringkasan File Utama yang Dilewati (Tidak Ada Pasangan): ---",
+                                            skipped_primary_files)
+                if skipped_additional_files:
+                    self._log_skipped_files("\n--- Ringkasan File Tambahan yang Dilewati (Tidak Ada Pasangan): ---",
+                                            skipped_additional_files)
+
+                return False, "Tidak ada pasangan file yang ditemukan untuk digabungkan.", ""
+
+            if self.plan is not None or not self.streaming:
+                self._prepare_output_folder()
+                if self.prevalidate:
+                    files_to_merge_pairs = self._prevalidate_pairs(files_to_merge_pairs)
+                    self._save_validation_cache()
+                merge_start = time.perf_counter()
+                self._merge_all(files_to_merge_pairs, total_hint=len(files_to_merge_pairs))
+                self.stage_seconds['merge'] = time.perf_counter() - merge_start
+            else:
+                self._save_validation_cache()
+
+            end_time = time.time() # Akhiri timer
+            self.total_duration = end_time - start_time
+            self._log(f"--- Total waktu penggabungan: {self.total_duration:.2f} detik ---") # Log durasi
+
+            if self._cancel_event.is_set():
+                done_count = (self.merged_pairs_count + self.skipped_unchanged_count + self.skipped_resumed_count)
+                self._log("--- Proses Dibatalkan ---")
+                self._log(f"Pasangan selesai sebelum dibatalkan: {self.merged_pairs_count} digabungkan, "
+                          f"{self.skipped_unchanged_count + self.skipped_resumed_count} dilewati.")
+                self._log("Jalankan lagi dengan opsi lanjutkan untuk meneruskan dari pasangan berikutnya.")
+                return False, (f"Proses dibatalkan. {done_count} pasangan sudah selesai dan tercatat; "
+                               f"jalankan lagi dengan opsi lanjutkan untuk meneruskan."), self.final_output_folder_path
+
+            self._log("--- Proses Penggabungan Selesai! ---")
+            
+            self.skipped_primary_no_pair = (primary_count - self.merged_pairs_count
+                                            - self.skipped_unchanged_count - self.skipped_resumed_count
+                                            - self.skipped_primary_due_to_corruption
+                                            - self.skipped_memory_limit)
+            self.skipped_primary_no_pair = max(0, self.skipped_primary_no_pair)
+
+            self.skipped_additional_no_pair = len(skipped_additional_files)
+
+            self._log("\n--- Ringkasan Proses ---")
+            self._log(f"Total pasangan berhasil digabungkan: {self.merged_pairs_count}")
+            if self.merged_pairs_count > 0:
+                self._log(f"Profil simpan '{self.save_profile}': waktu simpan total {self.total_save_seconds:.2f} detik "
+                          f"(rata-rata {self.total_save_seconds / self.merged_pairs_count:.2f} detik/pasangan), "
+                          f"ukuran output total {self.total_output_bytes / (1024 * 1024):.2f} MB")
+            if self.image_options:
+                self._log(f"Optimasi gambar menghemat {self.total_image_bytes_saved / (1024 * 1024):.2f} MB")
+            if self.skipped_unchanged_count > 0:
+                self._log(f"Pasangan dilewati (tidak berubah sejak proses sebelumnya): {self.skipped_unchanged_count}")
+            if self.skipped_resumed_count > 0:
+                self._log(f"Pasangan dilewati (sudah selesai pada proses yang terhenti): {self.skipped_resumed_count}")
+            self._log_timing_summary()
+            if self.skipped_primary_no_pair > 0:
+                self._log(f"File Utama dilewati (tidak ada pasangan): {self.skipped_primary_no_pair}")
+            if self.skipped_primary_due_to_corruption > 0:
+                self._log(f"File Utama dilewati (rusak): {self.skipped_primary_due_to_corruption}")
+            if self.skipped_memory_limit > 0:
+                self._log(f"Pasangan dibatalkan (melebihi batas memori {self.memory_limit_mb} MB): {self.skipped_memory_limit}")
+            if self.skipped_additional_no_pair > 0:
+                self._log(f"File Tambahan dilewati (tidak ada pasangan): {self.skipped_additional_no_pair}")
+            if self.skipped_additional_due_to_corruption > 0:
+                self._log(f"File Tambahan dilewati (rusak): {self.skipped_additional_due_to_corruption}")
+            if self.skipped_duplicate_files:
+                self._log(f"File Tambahan dilewati (duplikat): {len(self.skipped_duplicate_files)}")
+            
+            if skipped_primary_files:
+                self._log_skipped_files("\n--- Detail File Utama yang Dilewati (Tidak Ada Pasangan di Folder Tambahan): ---",
+                                        skipped_primary_files)
+            else:
+                self._log("\nTidak ada file dari Folder Utama yang dilewati karena tidak memiliki pasangan di Folder Tambahan.")
+            
+            if skipped_additional_files:
+                self._log_skipped_files("\n--- Detail File Tambahan yang Dilewati (Tidak Ada Pasangan di Folder Utama): ---",
+                                        skipped_additional_files)
+            else:
+                self._log("\nTidak ada file dari Folder Tambahan yang dilewati karena tidak memiliki pasangan di Folder Utama.")
+
+            if self.invalid_files:
+                self._log("\n--- Detail File PDF Tidak Valid (Dikecualikan Saat Validasi Awal): ---")
+                for invalid in self.invalid_files:
+                    self._log(f"- [{invalid['role']}] {invalid['file']}: {invalid['reason']}")
+
+            if self.skipped_duplicate_files:
+                self._log("\n--- Detail File Tambahan Duplikat yang Dilewati: ---")
+                for fname in self.skipped_duplicate_files:
+                    self._log(f"- {fname}")
+
+            if self.skipped_memory_limit and not self.merged_pairs_count:
+                return False, (f"Semua {self.skipped_memory_limit} pasangan dibatalkan karena melebihi batas memori "
+                               f"{self.memory_limit_mb} MB. Naikkan batas memori lalu jalankan lagi."), \
+                    self.final_output_folder_path
+
+            return True, "Penggabungan file PDF berpasangan selesai!", self.final_output_folder_path
+
+        except Exception as e:
+            self._log(f"--- Terjadi Kesalahan Fatal Selama Proses: {e} ---")
+            return False, f"Terjadi kesalahan: {e}", ""
+        finally:
+            close_archives() # Handle arsip ZIP proses utama (pemindaian, validasi, baca di muka, mode serial)
+
+    def _log_timing_summary(self):
+        """
+        Menampilkan waktu per tahap, total waktu buka/sisip/simpan, dan pasangan paling lambat;
+        bila timing_report aktif, laporan lengkap per pasangan ditulis ke JSON dan CSV di folder output.
+        """
+        merged_metrics = [m for m in self.pair_metrics if m['merged']]
+        self._log(f"Waktu per tahap: pindai {self.stage_seconds['scan']:.2f} detik, cocokkan {self.stage_seconds['match']:.2f} detik, "
+                  f"validasi {self.stage_seconds['validate']:.2f} detik, gabung {self.stage_seconds['merge']:.2f} detik")
+        if merged_metrics:
+            total_open = sum(m['open_seconds'] for m in merged_metrics)
+            total_insert = sum(m['insert_seconds'] for m in merged_metrics)
+            total_save = sum(m['save_seconds'] for m in merged_metrics)
+            total_pages = sum(m['page_count'] for m in merged_metrics)
+            total_input = sum(m['input_bytes'] for m in merged_metrics)
+            self._log(f"Total fitz.open {total_open:.2f} detik, insert_pdf {total_insert:.2f} detik, save {total_save:.2f} detik, "
+                      f"tulis {self.total_write_seconds:.2f} detik (thread penulis); "
+                      f"{total_pages} halaman, input {total_input / (1024 * 1024):.2f} MB")
+
+            slowest = sorted(merged_metrics, key=lambda m: m['total_seconds'], reverse=True)[:SLOWEST_PAIRS_IN_SUMMARY]
+            self._log("Pasangan paling lambat:")
+            for m in slowest:
+                self._log(f"- {m['primary_file']}: {m['total_seconds']:.2f} detik (buka {m['open_seconds']:.2f}, sisip {m['insert_seconds']:.2f}, "
+                          f"simpan {m['save_seconds']:.2f}), {m['page_count']} halaman, "
+                          f"{m['input_bytes'] / (1024 * 1024):.1f} MB -> {m['output_bytes'] / (1024 * 1024):.1f} MB")
+
+        if self.timing_report:
+            try:
+                self.timing_report_paths = self.write_timing_report(
+                    os.path.join(self.final_output_folder_path, TIMING_REPORT_BASENAME))
+                self._log(f"Laporan waktu disimpan di: {', '.join(self.timing_report_paths)}")
+            except OSError as e:
+                self._log(f"Error: Gagal menyimpan laporan waktu. ({e})")
+
+    def write_timing_report(self, base_path):
+        """
+        Menulis laporan waktu ke base_path + '.json' (tahap + per pasangan) dan base_path + '.csv' (per pasangan).
+        Mengembalikan daftar path yang ditulis.
+        """
+        json_path = base_path + ".json"
+        csv_path = base_path + ".csv"
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'stage_seconds': {stage: round(seconds, 4) for stage, seconds in self.stage_seconds.items()},
+                'save_profile': self.save_profile,
+                'jobs': self.jobs,
+                'pairs': self.pair_metrics,
+            }, f, indent=1, ensure_ascii=False)
+        with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=PAIR_METRIC_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.pair_metrics)
+        return [json_path, csv_path]
+
+    def summary(self):
+        """
+        Ringkasan hasil proses dalam bentuk dict yang bisa diserialisasi ke JSON.
+        """
+        return {
+            'primary_folder': self.primary_folder,
+            'additional_folder': self.additional_folder,
+            'additional_folders': self.additional_folders,
+            'primary_policy': self.primary_policy,
+            'output_folder': self.final_output_folder_path,
+            'jobs': self.jobs,
+            'streaming': self.streaming,
+            'schedule_order': self.schedule_order,
+            'from_plan': self.plan is not None,
+            'save_profile': self.save_profile,
+            'match_rules': self.match_rules.name,
+            'memory_limit_mb': self.memory_limit_mb,
+            'image_options': self.image_options,
+            'dedup': self.dedup,
+            'prefetch': self.prefetch_stats,
+            'attachment_cache_mb': self.attachment_cache_mb,
+            'attachment_cache': self.attachment_cache_stats,
+            'total_image_bytes_saved': self.total_image_bytes_saved,
+            'total_save_seconds': round(self.total_save_seconds, 3),
+            'total_write_seconds': round(self.total_write_seconds, 3),
+            'total_output_bytes': self.total_output_bytes,
+            'merged_pairs_count': self.merged_pairs_count,
+            'skipped_unchanged_count': self.skipped_unchanged_count,
+            'skipped_resumed_count': self.skipped_resumed_count,
+            'cancelled': self.cancelled,
+            'skipped_primary_due_to_corruption': self.skipped_primary_due_to_corruption,
+            'skipped_memory_limit': self.skipped_memory_limit,
+            'skipped_additional_due_to_corruption': self.skipped_additional_due_to_corruption,
+            'skipped_primary_no_pair': self.skipped_primary_no_pair,
+            'skipped_additional_no_pair': self.skipped_additional_no_pair,
+            'skipped_primary_files': self.skipped_primary_files,
+            'skipped_additional_files': self.skipped_additional_files,
+            'skipped_duplicate_files': self.skipped_duplicate_files,
+            'prevalidate': self.prevalidate,
+            'invalid_files': self.invalid_files,
+            'unmatched_candidates': self.unmatched_candidates,
+            'total_duration_seconds': round(self.total_duration, 3),
+            'stage_seconds': {stage: round(seconds, 3) for stage, seconds in self.stage_seconds.items()},
+            'slowest_pairs': sorted(self.pair_metrics, key=lambda m: m['total_seconds'], reverse=True)[:SLOWEST_PAIRS_IN_SUMMARY],
+            'timing_report_paths': self.timing_report_paths,
+        }
+
+
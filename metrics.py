@@ -0,0 +1,125 @@
+"""
+Metrik langsung (live) proses penggabungan untuk panel metrik di GUI.
+
+LiveMetrics mencatat pasangan yang sedang diproses dan pasangan yang selesai dalam jendela bergulir
+(METRICS_WINDOW_SECONDS), lalu snapshot() menghasilkan satu dict terstruktur: laju pasangan, halaman, dan MB
+baca/tulis per detik, perkiraan sisa waktu dari laju terbaru, aktivitas pekerja, dan memori. Dengan jendela
+bergulir, share yang melambat atau batch yang tertahan langsung terlihat, tidak teredam rata-rata sejak awal.
+
+Semua metode dipanggil dari thread MergeEngine; snapshot berisi tipe dasar saja sehingga aman dikirim lewat
+sinyal Qt atau ditulis sebagai JSON.
+"""
+import collections
+import time
+
+METRICS_WINDOW_SECONDS = 30.0
+METRICS_EMIT_INTERVAL_SECONDS = 0.5 # Batas frekuensi snapshot ke GUI; snapshot akhir selalu dikirim
+
+
+class LiveMetrics:
+    """
+    workers: jumlah proses pekerja. Pasangan yang dikirim ke pool diproses berurutan (FIFO), jadi `workers`
+    pasangan terlama yang belum selesai dianggap sedang diproses dan sisanya mengantre; waktu mulai pasangan
+    dihitung sejak ia masuk ke kelompok yang sedang diproses.
+    """
+    def __init__(self, workers=1, window_seconds=METRICS_WINDOW_SECONDS):
+        self.workers = max(1, workers)
+        self.window_seconds = window_seconds
+        self.start = time.perf_counter()
+        self._in_flight = collections.OrderedDict() # kunci -> [nama, waktu mulai diproses atau None]
+        self._window = collections.deque() # (waktu selesai, bobot, halaman, byte baca, byte tulis)
+        self.completed_pairs = 0
+        self.merged_pairs = 0
+        self.total_pages = 0
+        self.total_read_bytes = 0
+        self.total_written_bytes = 0
+        self.peak_rss_bytes = 0
+        self.last_completion = None
+
+    def _promote(self, now):
+        for position, activity in enumerate(self._in_flight.values()):
+            if position >= self.workers:
+                break
+            if activity[1] is None:
+                activity[1] = now
+
+    def start_job(self, key, name):
+        self._in_flight[key] = [name, None]
+        self._promote(time.perf_counter())
+
+    def cancel_job(self, key):
+        """
+        Mengeluarkan pasangan yang dibatalkan sebelum diproses dari daftar aktivitas.
+        """
+        self._in_flight.pop(key, None)
+        self._promote(time.perf_counter())
+
+    def finish_job(self, key, result, weight=0):
+        """
+        Mencatat pasangan selesai dari dict hasil merge_pair (page_count, input_bytes, output_bytes, peak_rss_bytes).
+        """
+        now = time.perf_counter()
+        self._in_flight.pop(key, None)
+        self._promote(now)
+        self.last_completion = now
+        self.completed_pairs += 1
+        self.peak_rss_bytes = max(self.peak_rss_bytes, result.get('peak_rss_bytes') or 0)
+        if not result.get('merged'):
+            return
+        self.merged_pairs += 1
+        self.total_pages += result['page_count']
+        self.total_read_bytes += result['input_bytes']
+        self.total_written_bytes += result['output_bytes']
+        self._window.append((now, weight, result['page_count'], result['input_bytes'], result['output_bytes']))
+
+    def observe_rss(self, rss):
+        if rss:
+            self.peak_rss_bytes = max(self.peak_rss_bytes, rss)
+
+    def snapshot(self, processed_pairs, total_pairs, remaining_weight=None, rss=None, final=False):
+        """
+        Dict metrik saat ini. remaining_weight (biaya pasangan yang belum selesai, lihat WeightedProgress) dipakai
+        untuk perkiraan sisa waktu; tanpa itu perkiraan dihitung dari jumlah pasangan yang tersisa.
+        """
+        now = time.perf_counter()
+        self.observe_rss(rss)
+        while self._window and now - self._window[0][0] > self.window_seconds:
+            self._window.popleft()
+        span = max(min(self.window_seconds, now - self.start), 1e-6)
+        window_pairs = len(self._window)
+        window_weight = sum(entry[1] for entry in self._window)
+        window_pages = sum(entry[2] for entry in self._window)
+        window_read = sum(entry[3] for entry in self._window)
+        window_written = sum(entry[4] for entry in self._window)
+
+        eta_seconds = None
+        if not final:
+            if remaining_weight is not None and window_weight > 0:
+                eta_seconds = remaining_weight / (window_weight / span)
+            elif window_pairs:
+                eta_seconds = max(0, total_pairs - processed_pairs) / (window_pairs / span)
+
+        activities = list(self._in_flight.values())
+        return {
+            'elapsed_seconds': now - self.start,
+            'processed_pairs': processed_pairs,
+            'total_pairs': total_pairs,
+            'completed_pairs': self.completed_pairs,
+            'merged_pairs': self.merged_pairs,
+            'pairs_per_second': window_pairs / span,
+            'pages_per_second': window_pages / span,
+            'read_mb_per_second': window_read / span / (1024 * 1024),
+            'written_mb_per_second': window_written / span / (1024 * 1024),
+            'eta_seconds': eta_seconds,
+            'seconds_since_completion': now - (self.last_completion or self.start),
+            'workers': self.workers,
+            'active': [{'file': name, 'seconds': now - started}
+                       for name, started in activities if started is not None],
+            'queued_count': sum(1 for _, started in activities if started is None),
+            'rss_bytes': rss,
+            'peak_rss_bytes': self.peak_rss_bytes,
+            'total_pages': self.total_pages,
+            'total_read_bytes': self.total_read_bytes,
+            'total_written_bytes': self.total_written_bytes,
+            'final': final,
+        }
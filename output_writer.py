@@ -0,0 +1,116 @@
+"""
+Tahap penulisan output: file hasil ditulis ke file sementara lalu di-rename secara atomik,
+sehingga setiap file .pdf di folder output selalu lengkap meskipun proses terhenti di tengah jalan.
+
+OutputWriter menjalankan penulisan di satu thread latar dengan antrean terbatas, agar penggabungan pasangan
+berikutnya tidak menunggu disk output yang lambat.
+"""
+import os
+import time
+import queue
+import threading
+
+PARTIAL_SUFFIX = ".part" # File yang belum selesai ditulis; tidak berakhiran .pdf sehingga tidak terbaca sebagai hasil
+DEFAULT_MAX_PENDING_WRITES = 4
+
+
+def write_atomic(path, data):
+    """
+    Menulis data ke path + PARTIAL_SUFFIX, memastikan isinya sampai ke disk (fsync), lalu mengganti path secara atomik.
+    """
+    temp_path = path + PARTIAL_SUFFIX
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def save_atomic(doc, path, save_options):
+    """
+    Seperti write_atomic, tetapi langsung dari Document.save (dipakai bila isi output tidak ditahan di memori).
+    Document.save tidak melakukan fsync, jadi file sementara dibuka ulang dan di-fsync sebelum di-rename.
+    """
+    temp_path = path + PARTIAL_SUFFIX
+    try:
+        doc.save(temp_path, **save_options)
+        with open(temp_path, 'rb+') as f: # Mode tulis: os.fsync di Windows memerlukan handle yang bisa ditulis
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def remove_partial_files(folder):
+    """
+    Menghapus file PARTIAL_SUFFIX sisa proses sebelumnya yang terhenti. Mengembalikan jumlah file yang dihapus.
+    """
+    removed = 0
+    try:
+        with os.scandir(folder) as it:
+            for dir_entry in it:
+                if dir_entry.name.endswith(PARTIAL_SUFFIX) and dir_entry.is_file():
+                    try:
+                        os.remove(dir_entry.path)
+                        removed += 1
+                    except OSError:
+                        pass
+    except OSError:
+        pass
+    return removed
+
+
+class OutputWriter:
+    """
+    Penulis output di thread latar. submit() memblokir bila sudah ada max_pending file yang menunggu ditulis
+    (membatasi memori yang dipegang oleh bytes output). Hasil penulisan diambil lewat completed()
+    sebagai daftar (token, error_atau_None, detik_tulis), dalam urutan penulisan.
+    """
+    def __init__(self, max_pending=DEFAULT_MAX_PENDING_WRITES):
+        self._queue = queue.Queue(maxsize=max(1, max_pending))
+        self._done = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="penggabung-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            path, data, token = item
+            write_start = time.perf_counter()
+            try:
+                write_atomic(path, data)
+                self._done.put((token, None, time.perf_counter() - write_start))
+            except Exception as e:
+                self._done.put((token, e, time.perf_counter() - write_start))
+
+    def submit(self, path, data, token):
+        self._queue.put((path, data, token))
+
+    def completed(self):
+        finished = []
+        while True:
+            try:
+                finished.append(self._done.get_nowait())
+            except queue.Empty:
+                return finished
+
+    def close(self):
+        """
+        Menunggu semua file dalam antrean selesai ditulis dan menghentikan thread penulis.
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
@@ -1,74 +1,158 @@
+import time
+_STARTUP_T0 = time.perf_counter() # Diukur sedini mungkin untuk mode --measure-startup
+
 import sys
 import os
+import json
 import datetime
+import functools
 import shutil
 import subprocess
-import re
-import time # Import modul time untuk mengukur durasi
+import threading
+import multiprocessing
+
+STARTUP_MEASURE_FLAG = "--measure-startup"
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support() # Wajib untuk ProcessPoolExecutor pada exe PyInstaller di Windows
+    if len(sys.argv) > 1 and sys.argv[1:] != [STARTUP_MEASURE_FLAG]:
+        # Mode baris perintah (headless): jalankan tanpa memuat PyQt6/qtawesome sama sekali.
+        from cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
 
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton,
     QLabel, QFileDialog, QLineEdit, QProgressBar, QMessageBox,
-    QHBoxLayout, QTextEdit, QSizePolicy, QScrollArea, QFrame,
+    QHBoxLayout, QGridLayout, QTextEdit, QSizePolicy, QScrollArea, QFrame, QSpinBox, QCheckBox,
+    QComboBox, QDialog, QTableView, QHeaderView,
 )
-from PyQt6.QtCore import QThread, pyqtSignal, Qt, QDateTime, QTimer
+from PyQt6.QtCore import (QThread, pyqtSignal, Qt, QDateTime, QTimer, QAbstractTableModel, QModelIndex,
+                          QSortFilterProxyModel)
+
+# PyMuPDF (lewat merge_core) dan font ikon qtawesome tidak diimpor di sini: keduanya dimuat setelah jendela tampil
+# (lihat PdfMergerApp._finish_startup) agar waktu sampai jendela pertama tetap singkat pada exe PyInstaller.
+from settings import (DEFAULT_SAVE_PROFILE, DEFAULT_IMAGE_QUALITY, DEFAULT_PREFETCH_PAIRS, DEFAULT_ATTACHMENT_CACHE_MB,
+                      DEFAULT_PRIMARY_POLICY, LOG_DIR, LOG_FILENAME, get_file_logger)
+from matching import DEFAULT_RULE_SET, RULES_DIR, available_rule_sets
+from plan import MergePlan
+from watcher import DEFAULT_WATCH_QUIET_SECONDS, WatchDaemon
+from scheduling import format_duration
+
+LOG_FLUSH_INTERVAL_MS = 100 # Log dari thread dikirim ke QTextEdit per batch, bukan per baris
+LOG_MAX_LINES = 5000 # Batas riwayat di QTextEdit; log lengkap tersimpan di file log
+
+# Panel metrik langsung: (kunci, judul), ditampilkan dalam tiga kolom.
+METRIC_PANEL_FIELDS = [
+    ('pairs', "Pasangan/detik"), ('pages', "Halaman/detik"), ('eta', "Perkiraan sisa"),
+    ('read', "Baca MB/detik"), ('written', "Tulis MB/detik"), ('memory', "Memori (puncak)"),
+]
+METRICS_REFRESH_INTERVAL_MS = 1000 # Durasi aktivitas dan waktu sejak pasangan terakhir diperbarui tiap detik
+STALL_WARNING_SECONDS = 120 # Tanpa pasangan selesai selama ini: share mungkin melambat atau pasangan tertahan
+
+STARTUP_TARGET_SECONDS = 1.0 # Target waktu sampai jendela pertama tampil (mode --measure-startup)
+STARTUP_REPORT_FILENAME = "waktu_start.json" # Di LOG_DIR
+_startup_marks = [("modul dimuat", time.perf_counter() - _STARTUP_T0)]
+
 
-import fitz  # PyMuPDF
-import qtawesome as qta
+def _mark_startup(label):
+    _startup_marks.append((label, time.perf_counter() - _STARTUP_T0))
 
-# Helper function to extract prefix and number from a filename
-def extract_prefix_and_number(filename):
+
+def _process_age_seconds():
+    """
+    Umur proses sejak dibuat OS, termasuk waktu bootloader PyInstaller dan inisialisasi interpreter yang terjadi
+    sebelum _STARTUP_T0. None bila tidak bisa dibaca di platform ini.
     """
-    Mengekstrak prefiks (nama depan) dan angka urutan dari nama file.
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+            creation, exit_time, kernel, user, now = (wintypes.FILETIME() for _ in range(5))
+            if not ctypes.windll.kernel32.GetProcessTimes(ctypes.windll.kernel32.GetCurrentProcess(),
+                                                          ctypes.byref(creation), ctypes.byref(exit_time),
+                                                          ctypes.byref(kernel), ctypes.byref(user)):
+                return None
+            ctypes.windll.kernel32.GetSystemTimeAsFileTime(ctypes.byref(now))
+            to_ticks = lambda filetime: (filetime.dwHighDateTime << 32) | filetime.dwLowDateTime
+            return (to_ticks(now) - to_ticks(creation)) / 1e7 # FILETIME dalam satuan 100 ns
+        with open("/proc/self/stat", "r") as f:
+            # Kolom setelah nama proses (yang bisa berisi spasi); starttime adalah kolom ke-22 dari awal.
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", "r") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _icon(name, **options):
     """
-    base_name = os.path.splitext(filename)[0]
-    base_name_lower = base_name.lower()
-
-    match_paren_with_char = re.search(r'\s*([a-z0-9_.-]*)\((\d+)\)$', base_name_lower)
-    match_underscore = re.search(r'(_(\d+))$', base_name_lower)
-    match_space_number = re.search(r'\s(\d+)$', base_name_lower)
-
-    if match_paren_with_char:
-        number_str = match_paren_with_char.group(2)
-        prefix = base_name_lower[:match_paren_with_char.start()]
-        prefix = prefix.rstrip(' ')
-        return prefix, int(number_str), base_name_lower
-    elif match_underscore:
-        number_str = match_underscore.group(2)
-        prefix = base_name_lower[:match_underscore.start(1)]
-        return prefix, int(number_str), base_name_lower
-    elif match_space_number:
-        number_str = match_space_number.group(1)
-        prefix = base_name_lower[:match_space_number.start(1) - 1]
-        prefix = prefix.rstrip(' ')
-        return prefix, int(number_str), base_name_lower
-    else:
-        return base_name_lower, None, base_name_lower
+    Ikon qtawesome putih. qtawesome diimpor saat ikon pertama dibutuhkan (memuat font ikon cukup lama).
+    """
+    import qtawesome as qta
+    return qta.icon(name, color='white', **options)
 
 # PdfMergerThread Class
 class PdfMergerThread(QThread):
     progress_signal = pyqtSignal(int)
     status_signal = pyqtSignal(str)
-    log_signal = pyqtSignal(str)
     finished_signal = pyqtSignal(bool, str, str)
-
-    def __init__(self, primary_folder, additional_folder, parent=None):
+    plan_ready_signal = pyqtSignal(object) # MergePlan hasil mode pratinjau (None bila gagal)
+    metrics_signal = pyqtSignal(object) # dict snapshot LiveMetrics (lihat metrics.py)
+
+    def __init__(self, primary_folder, additional_folder, jobs=1, incremental=True, verify_hash=False,
+                 save_profile=DEFAULT_SAVE_PROFILE, streaming=False, timing_report=False, memory_limit_mb=0,
+                 image_dpi=0, image_quality=DEFAULT_IMAGE_QUALITY, dedup='off', prefetch_pairs=DEFAULT_PREFETCH_PAIRS,
+                 resume=False, match_rules=DEFAULT_RULE_SET, prevalidate=True, attachment_cache_mb=DEFAULT_ATTACHMENT_CACHE_MB,
+                 additional_folders=None, primary_policy=DEFAULT_PRIMARY_POLICY, plan=None, plan_only=False, watch=False, watch_quiet_seconds=DEFAULT_WATCH_QUIET_SECONDS, parent=None):
         super().__init__(parent)
-        self.primary_folder = primary_folder
-        self.additional_folder = additional_folder
-        self.output_base_dir = os.path.dirname(primary_folder)
-        self.final_output_folder_path = ""
+        self.plan_only = plan_only
+        self._log_lock = threading.Lock()
+        self._pending_logs = []
+        self.file_logger = get_file_logger()
+        from merge_core import MergeEngine # Biasanya sudah dimuat di latar belakang setelah jendela tampil
+        engine_options = dict(
+            jobs=jobs, incremental=incremental, verify_hash=verify_hash, save_profile=save_profile,
+            streaming=streaming, timing_report=timing_report, memory_limit_mb=memory_limit_mb,
+            image_dpi=image_dpi, image_quality=image_quality, dedup=dedup, prefetch_pairs=prefetch_pairs,
+            resume=resume, match_rules=match_rules, prevalidate=prevalidate, attachment_cache_mb=attachment_cache_mb,
+            additional_folders=additional_folders, primary_policy=primary_policy,
+            log_callback=self._log,
+            progress_callback=self.progress_signal.emit,
+            status_callback=self.status_signal.emit,
+            metrics_callback=self.metrics_signal.emit,
+        )
+        self.engine = MergeEngine(primary_folder, additional_folder, plan=plan, **engine_options)
+        self.watch_daemon = None
+        if watch:
+            self.watch_daemon = WatchDaemon(
+                primary_folder, additional_folder,
+                functools.partial(MergeEngine, primary_folder, additional_folder, **engine_options),
+                self.engine.match_rules, quiet_seconds=watch_quiet_seconds,
+                output_folder=self.engine.output_folder_path,
+                log_callback=self._log, status_callback=self.status_signal.emit,
+                additional_folders=self.engine.additional_folders,
+            )
+
+    def cancel(self):
+        """
+        Membatalkan penggabungan, atau menghentikan mode pantau. Aman dipanggil dari thread UI.
+        """
+        if self.watch_daemon is not None:
+            self.watch_daemon.stop()
+        else:
+            self.engine.cancel()
 
-        self.merged_pairs_count = 0
-        self.skipped_primary_due_to_corruption = 0
-        self.skipped_additional_due_to_corruption = 0
-        self.skipped_primary_no_pair = 0
-        self.skipped_additional_no_pair = 0
+    @property
+    def cancelled(self):
+        return self.watch_daemon is None and self.engine.cancelled
 
     def _log(self, message):
         """
-        Mengirim pesan log ke UI dengan timestamp dan pewarnaan berdasarkan jenis pesan.
+        Menulis pesan ke file log dan menampungnya (dengan timestamp dan pewarnaan berdasarkan jenis pesan)
+        sampai diambil UI lewat take_pending_logs.
         """
+        self.file_logger.info(message)
         timestamp = QDateTime.currentDateTime().toString("yyyy-MM-dd hh:mm:ss")
         formatted_message = ""
 
@@ -81,222 +165,293 @@ class PdfMergerThread(QThread):
               "Terjadi Kesalahan Fatal Selama Proses" in message or
               message.startswith("Error:") or
               "file PDF rusak" in message or
+              "tidak valid" in message or
               "Ringkasan Proses" in message):
             formatted_message = f"<span style='color: #dc3545;'>[{timestamp}] {message}</span>"
         else:
             formatted_message = f"[{timestamp}] {message}"
-        
-        self.log_signal.emit(formatted_message)
+
+        with self._log_lock:
+            self._pending_logs.append(formatted_message)
+
+    def take_pending_logs(self):
+        """
+        Mengambil dan mengosongkan semua pesan log yang belum ditampilkan. Aman dipanggil dari thread UI.
+        """
+        with self._log_lock:
+            pending_logs, self._pending_logs = self._pending_logs, []
+        return pending_logs
 
     def run(self):
         """
-        Logika utama untuk mencari, mencocokkan, dan menggabungkan file PDF menggunakan PyMuPDF.
+        Menjalankan MergeEngine di thread ini dan meneruskan hasilnya ke UI.
+        Dengan plan_only hanya rencana (pindai dan cocokkan) yang dibuat.
         """
-        start_time = time.time() # Mulai timer
+        if self.plan_only:
+            self.plan_ready_signal.emit(self.engine.build_plan())
+            return
+        runner = self.watch_daemon if self.watch_daemon is not None else self.engine
+        success, message, output_folder_path = runner.run()
+        self.finished_signal.emit(success, message, output_folder_path)
 
-        try:
-            self._log("--- Memulai Proses Penggabungan PDF ---")
-            self.status_signal.emit("Memvalidasi folder dan mencari file PDF...")
+PLAN_COLUMNS = ("Gabung", "File Utama", "Urutan", "File Tambahan", "Keterangan")
+PLAN_EDITED_NOTE = "disunting"
+PLAN_SUMMARY_DELAY_MS = 150 # Ringkasan rencana dihitung ulang sekali setelah rentetan suntingan, bukan per klik
 
-            if not os.path.isdir(self.primary_folder):
-                self._log(f"Error: Folder Utama '{self.primary_folder}' tidak ditemukan atau bukan direktori.")
-                self.finished_signal.emit(False, "Folder Utama tidak ditemukan.", "")
-                return
 
-            primary_files_for_matching = {}
-            all_primary_file_paths = set()
-
-            self._log(f"Mencari file PDF di Folder Utama: '{self.primary_folder}'...")
-            for root, _, files in os.walk(self.primary_folder):
-                for file in files:
-                    if file.lower().endswith('.pdf'):
-                        file_path = os.path.join(root, file)
-                        all_primary_file_paths.add(file_path)
-                        prefix, number, _ = extract_prefix_and_number(file)
-                        
-                        if prefix not in primary_files_for_matching:
-                            primary_files_for_matching[prefix] = file_path
-                        else:
-                            current_candidate_path = primary_files_for_matching[prefix]
-                            _, current_candidate_number, _ = extract_prefix_and_number(os.path.basename(current_candidate_path))
-                            if number is None and current_candidate_number is not None:
-                                primary_files_for_matching[prefix] = file_path
-
-            additional_files_by_prefix = {}
-            all_additional_file_paths = set()
-
-            if self.additional_folder and os.path.isdir(self.additional_folder):
-                self._log(f"Mencari file PDF di Folder Tambahan: '{self.additional_folder}'...")
-                for root, _, files in os.walk(self.additional_folder):
-                    for file in files:
-                        if file.lower().endswith('.pdf'):
-                            file_path = os.path.join(root, file)
-                            all_additional_file_paths.add(file_path)
-                            prefix, number, original_base_name_lower = extract_prefix_and_number(file)
-                            additional_files_by_prefix.setdefault(prefix, []).append({
-                                'path': file_path,
-                                'number': number,
-                                'original_base_name_lower': original_base_name_lower
-                            })
-            elif self.additional_folder:
-                self._log(f"Peringatan: Folder Tambahan '{self.additional_folder}' tidak ditemukan atau bukan direktori. Hanya akan memproses file berpasangan jika folder ini ada.")
-
-            self._log("--- Menganalisis Pasangan File untuk Penggabungan ---")
-            files_to_merge_pairs = []
-            merged_primary_paths = set()
-            merged_additional_paths = set()
-
-            for primary_prefix, primary_file_path in sorted(primary_files_for_matching.items()):
-                matching_additional_files = additional_files_by_prefix.get(primary_prefix)
-
-                if matching_additional_files:
-                    self._log(f"Menganalisis pasangan untuk prefiks '{primary_prefix}' (File Utama: '{os.path.basename(primary_file_path)}')")
-                    sorted_additional = sorted(matching_additional_files, key=lambda x: (x['number'] is None, x['number'] if x['number'] is not None else float('inf')))
-                    
-                    sorted_additional_paths = [ad['path'] for ad in sorted_additional]
-                    files_to_merge_pairs.append((primary_file_path, sorted_additional_paths))
-                    
-                    merged_primary_paths.add(primary_file_path)
-                    merged_additional_paths.update(sorted_additional_paths)
-
-                    self._log(f"Pasangan ditemukan: '{os.path.basename(primary_file_path)}' dengan {len(sorted_additional_paths)} file tambahan.")
-                else:
-                    self._log(f"Melewatkan file utama (tidak ada pasangan di folder tambahan untuk prefiks '{primary_prefix}'): '{os.path.basename(primary_file_path)}'")
-                    self.skipped_primary_no_pair += 1
-            
-            skipped_primary_files = [os.path.basename(p) for p in all_primary_file_paths if p not in merged_primary_paths]
-            skipped_additional_files = [os.path.basename(p) for p in all_additional_file_paths if p not in merged_additional_paths]
-
-            if not files_to_merge_pairs:
-                self._log("Tidak ada pasangan file PDF yang ditemukan untuk digabungkan.")
-                self._log("Pastikan file di Folder Utama memiliki nama depan yang sama dengan file di Folder Tambahan (sebelum '_' atau ' (angka)' atau ' angka').")
-                if skipped_primary_files:
-                    self._log("\n--- Ringkasan File Utama yang Dilewati (Tidak Ada Pasangan): ---")
-                    for fname in skipped_primary_files:
-                        self._log(f"- {fname}")
-                if skipped_additional_files:
-                    self._log("\n--- Ringkasan File Tambahan yang Dilewati (Tidak Ada Pasangan): ---")
-                    for fname in skipped_additional_files:
-                        self._log(f"- {fname}")
-
-                self.finished_signal.emit(False, "Tidak ada pasangan file yang ditemukan untuk digabungkan.", "")
-                return
+def _display_path(path, folder):
+    """
+    Path relatif terhadap folder bila file berada di dalamnya, selain itu path lengkap.
+    """
+    if path and folder:
+        relative = os.path.relpath(path, folder)
+        if not relative.startswith(os.pardir):
+            return relative
+    return path
 
-            output_folder_name = "Hasil Penggabungan"
-            self.final_output_folder_path = os.path.join(self.output_base_dir, output_folder_name)
-            
-            os.makedirs(self.final_output_folder_path, exist_ok=True)
-            self._log(f"--- Membuat Folder Output: '{self.final_output_folder_path}' ---")
-            self.status_signal.emit(f"Membuat folder output: '{os.path.basename(self.final_output_folder_path)}'")
-
-            total_files_to_process = len(files_to_merge_pairs)
-            processed_count = 0
-
-            self._log("--- Memulai Penggabungan Pasangan File ---")
-            for primary_file_path, additional_file_paths_list in files_to_merge_pairs:
-                
-                output_filename = os.path.basename(primary_file_path)
-                output_filepath = os.path.join(self.final_output_folder_path, output_filename)
-                
-                try:
-                    self._log("----------------------------------------") # Garis putus-putus sebelum penggabungan
-                    self._log(f"Memproses pasangan: '{os.path.basename(primary_file_path)}'")
-                    
-                    with fitz.open(primary_file_path) as primary_doc:
-                        self._log(f"File utama        : {os.path.basename(primary_file_path)}'")
-                        
-                        for ad_path in additional_file_paths_list:
-                            try:
-                                with fitz.open(ad_path) as ad_doc:
-                                    primary_doc.insert_pdf(ad_doc)
-                                    self._log(f"File tambahan     : {os.path.basename(ad_path)}'")
-                            except fitz.FileNotFoundError:
-                                self._log(f"Error: File tambahan '{os.path.basename(ad_path)}' tidak ditemukan. Dilewati.")
-                                self.skipped_additional_due_to_corruption += 1
-                            except Exception as e:
-                                self._log(f"Error: File tambahan '{os.path.basename(ad_path)}' kemungkinan rusak. Dilewati. ({e})")
-                                self.skipped_additional_due_to_corruption += 1
-                        
-                        self._log(f"Menyimpan hasil ke {os.path.basename(output_filepath)}'")
-                        primary_doc.save(output_filepath, garbage=4, deflate=True, clean=True)
-                        self.merged_pairs_count += 1
-                        self._log(f"Penggabungan berhasil: '{output_filename}'")
-                        self._log("----------------------------------------") # Garis putus-putus setelah penggabungan
-                        
-
-                except fitz.FileNotFoundError:
-                    self._log(f"Error: File utama '{os.path.basename(primary_file_path)}' tidak ditemukan. Seluruh pasangan dilewati.")
-                    self.skipped_primary_due_to_corruption += 1
-                    self._log("----------------------------------------") # Garis putus-putus setelah error
-                except Exception as e:
-                    self._log(f"Error: Terjadi kesalahan tidak terduga saat memproses file '{os.path.basename(primary_file_path)}' atau pasangannya. Pasangan ini dilewati. ({e})")
-                    self.skipped_primary_due_to_corruption += 1
-                    self._log("----------------------------------------") # Garis putus-putus setelah error
-
-                processed_count += 1
-                progress = int((processed_count / total_files_to_process) * 100)
-                self.progress_signal.emit(progress)
-                self.status_signal.emit(f"Memproses {processed_count}/{total_files_to_process} pasangan file...")
-
-            end_time = time.time() # Akhiri timer
-            total_duration = end_time - start_time
-            self._log(f"--- Total waktu penggabungan: {total_duration:.2f} detik ---") # Log durasi
-
-            self._log("--- Proses Penggabungan Selesai! ---")
-            
-            self.skipped_primary_no_pair = len(primary_files_for_matching) - self.merged_pairs_count - self.skipped_primary_due_to_corruption
-            self.skipped_primary_no_pair = max(0, self.skipped_primary_no_pair)
-
-            self.skipped_additional_no_pair = len(all_additional_file_paths) - len(merged_additional_paths)
-
-            self._log("\n--- Ringkasan Proses ---")
-            self._log(f"Total pasangan berhasil digabungkan: {self.merged_pairs_count}")
-            if self.skipped_primary_no_pair > 0:
-                self._log(f"File Utama dilewati (tidak ada pasangan): {self.skipped_primary_no_pair}")
-            if self.skipped_primary_due_to_corruption > 0:
-                self._log(f"File Utama dilewati (rusak): {self.skipped_primary_due_to_corruption}")
-            if self.skipped_additional_no_pair > 0:
-                self._log(f"File Tambahan dilewati (tidak ada pasangan): {self.skipped_additional_no_pair}")
-            if self.skipped_additional_due_to_corruption > 0:
-                self._log(f"File Tambahan dilewati (rusak): {self.skipped_additional_due_to_corruption}")
-            
-            if skipped_primary_files:
-                self._log("\n--- Detail File Utama yang Dilewati (Tidak Ada Pasangan di Folder Tambahan): ---")
-                for fname in skipped_primary_files:
-                    self._log(f"- {fname}")
-            else:
-                self._log("\nTidak ada file dari Folder Utama yang dilewati karena tidak memiliki pasangan di Folder Tambahan.")
-            
-            if skipped_additional_files:
-                self._log("\n--- Detail File Tambahan yang Dilewati (Tidak Ada Pasangan di Folder Utama): ---")
-                for fname in skipped_additional_files:
-                    self._log(f"- {fname}")
+
+class PlanTableModel(QAbstractTableModel):
+    """
+    Tabel rencana penggabungan yang bisa disunting, satu baris per file tambahan (format yang sama dengan CSV rencana).
+    Kolom File Utama diisi path relatif terhadap Folder Utama, atau nama file saja bila nama itu unik.
+    """
+    def __init__(self, plan, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.set_plan(plan)
+
+    def set_plan(self, plan):
+        self.beginResetModel()
+        self.plan = plan
+        self._primary_lookup = {}
+        ambiguous_names = set()
+        for path in plan.primary_paths:
+            self._primary_lookup[_display_path(path, plan.primary_folder).lower()] = path
+            name = os.path.basename(path).lower()
+            if name in self._primary_lookup and self._primary_lookup[name] != path:
+                ambiguous_names.add(name)
+            self._primary_lookup.setdefault(name, path)
+        for name in ambiguous_names:
+            del self._primary_lookup[name]
+        self.rows = [dict(row, include=bool(row['primary_file'] and row['additional_file'])) for row in plan.rows()]
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(PLAN_COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return PLAN_COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        row = self.rows[index.row()]
+        column = index.column()
+        if column == 0:
+            if role == Qt.ItemDataRole.CheckStateRole and row['additional_file']:
+                return Qt.CheckState.Checked if row['include'] else Qt.CheckState.Unchecked
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            if column == 1:
+                return _display_path(row['primary_file'], self.plan.primary_folder)
+            if column == 2:
+                return str(row['order'])
+            if column == 3:
+                return _display_path(row['additional_file'], self.plan.additional_folder)
+            return row['note']
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return {1: row['primary_file'], 3: row['additional_file'], 4: row['note']}.get(column) or None
+        return None
+
+    def flags(self, index):
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if self.rows[index.row()]['additional_file']:
+            if index.column() == 0:
+                flags |= Qt.ItemFlag.ItemIsUserCheckable
+            elif index.column() in (1, 2):
+                flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        row = self.rows[index.row()]
+        column = index.column()
+        if column == 0 and role == Qt.ItemDataRole.CheckStateRole:
+            row['include'] = Qt.CheckState(value) == Qt.CheckState.Checked and bool(row['primary_file'])
+        elif column == 1 and role == Qt.ItemDataRole.EditRole:
+            text = str(value).strip()
+            if not text:
+                row['primary_file'], row['include'] = "", False
             else:
-                self._log("\nTidak ada file dari Folder Tambahan yang dilewati karena tidak memiliki pasangan di Folder Utama.")
+                primary_path = self._primary_lookup.get(text.lower())
+                if primary_path is None:
+                    row['note'] = f"File utama tidak dikenal: {text}"
+                    self.dataChanged.emit(self.index(index.row(), 0), self.index(index.row(), len(PLAN_COLUMNS) - 1))
+                    return False
+                row['primary_file'], row['include'] = primary_path, True
+            row['note'] = PLAN_EDITED_NOTE
+        elif column == 2 and role == Qt.ItemDataRole.EditRole:
+            text = str(value).strip()
+            if text and not text.isdigit():
+                return False
+            row['order'] = int(text) if text else ""
+            row['note'] = PLAN_EDITED_NOTE
+        else:
+            return False
+        self.dataChanged.emit(self.index(index.row(), 0), self.index(index.row(), len(PLAN_COLUMNS) - 1))
+        return True
+
+    def confirmed_plan(self):
+        """
+        Rencana sesuai isi tabel: hanya baris yang dicentang dan memiliki File Utama.
+        """
+        included_rows = [row for row in self.rows if row['include'] and row['primary_file'] and row['additional_file']]
+        edited = MergePlan.from_rows(self.plan.primary_folder, self.plan.additional_folder, included_rows)
+        return self.plan.with_pairs(edited.pairs)
 
 
-            self.finished_signal.emit(True, "Penggabungan file PDF berpasangan selesai!", self.final_output_folder_path)
+class PlanDialog(QDialog):
+    """
+    Pratinjau rencana penggabungan: operator dapat memeriksa, menyaring, memperbaiki pasangan, serta
+    mengekspor/mengimpor CSV sebelum menggabungkan. Rencana yang dikonfirmasi langsung dipakai MergeEngine.
+    """
+    def __init__(self, plan, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Pratinjau Rencana Penggabungan")
+        self.resize(1000, 600)
+        self.model = PlanTableModel(plan, self)
+        # Menghitung ringkasan menyusun ulang seluruh rencana (O(n)); suntingan beruntun digabung lewat timer.
+        self.summary_timer = QTimer(self)
+        self.summary_timer.setSingleShot(True)
+        self.summary_timer.setInterval(PLAN_SUMMARY_DELAY_MS)
+        self.summary_timer.timeout.connect(self.update_summary)
+        self.model.dataChanged.connect(lambda *args: self.summary_timer.start())
+        self.model.modelReset.connect(self.update_summary)
+
+        self.proxy_model = QSortFilterProxyModel(self)
+        self.proxy_model.setSourceModel(self.model)
+        self.proxy_model.setFilterKeyColumn(-1)
+        self.proxy_model.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+
+        layout = QVBoxLayout(self)
+        self.summary_label = QLabel()
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Saring berdasarkan nama file atau keterangan (mis. 'tidak ada pasangan')...")
+        self.filter_input.textChanged.connect(self.proxy_model.setFilterFixedString)
+        layout.addWidget(self.filter_input)
+
+        self.table_view = QTableView()
+        self.table_view.setModel(self.proxy_model)
+        self.table_view.setToolTip("Centang 'Gabung' untuk menyertakan file tambahan. Klik dua kali File Utama untuk "
+                                   "memindahkan file tambahan ke klaim lain, atau Urutan untuk mengubah urutan sisip.")
+        header = self.table_view.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setStretchLastSection(True)
+        self.table_view.setColumnWidth(0, 60)
+        self.table_view.setColumnWidth(1, 260)
+        self.table_view.setColumnWidth(2, 60)
+        self.table_view.setColumnWidth(3, 300)
+        layout.addWidget(self.table_view)
 
-        except Exception as e:
-            self._log(f"--- Terjadi Kesalahan Fatal Selama Proses: {e} ---")
-            self.finished_signal.emit(False, f"Terjadi kesalahan: {e}", "")
+        button_layout = QHBoxLayout()
+        export_button = QPushButton(_icon('fa5s.file-export'), " Ekspor CSV")
+        export_button.clicked.connect(self.export_csv)
+        button_layout.addWidget(export_button)
+        import_button = QPushButton(_icon('fa5s.file-import'), " Impor CSV")
+        import_button.clicked.connect(self.import_csv)
+        button_layout.addWidget(import_button)
+        button_layout.addStretch()
+        cancel_button = QPushButton("Batal")
+        cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_button)
+        merge_button = QPushButton(_icon('fa5s.play-circle'), " Gabungkan Sesuai Rencana")
+        merge_button.setObjectName("startButton")
+        merge_button.clicked.connect(self.confirm)
+        button_layout.addWidget(merge_button)
+        layout.addLayout(button_layout)
+
+        self.update_summary()
+
+    def update_summary(self, *args):
+        self.summary_timer.stop()
+        plan = self.model.confirmed_plan()
+        unmatched_additional = sum(1 for row in self.model.rows if row['additional_file'] and not row['include'])
+        self.summary_label.setText(
+            f"{len(plan.pairs)} pasangan dengan {sum(len(a) for _, a in plan.pairs)} file tambahan; "
+            f"{len(plan.unmatched_primary_paths())} file utama dan {unmatched_additional} file tambahan tidak digabungkan.")
+
+    def export_csv(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Ekspor Rencana", "rencana_penggabungan.csv", "CSV (*.csv)")
+        if not path:
+            return
+        try:
+            self.model.confirmed_plan().write_csv(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Gagal menulis rencana: {e}")
 
+    def import_csv(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Impor Rencana", "", "CSV (*.csv)")
+        if not path:
+            return
+        plan = self.model.plan
+        try:
+            imported = MergePlan.read_csv(path, plan.primary_folder, plan.additional_folder)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Error", f"Gagal membaca rencana: {e}")
+            return
+        primary_paths = list(dict.fromkeys(plan.primary_paths + imported.primary_paths))
+        additional_paths = list(dict.fromkeys(plan.additional_paths + imported.additional_paths))
+        self.model.set_plan(MergePlan(plan.primary_folder, plan.additional_folder, imported.pairs, primary_paths,
+                                      additional_paths, max(plan.primary_count, len(imported.pairs)),
+                                      plan.unmatched_candidates))
+
+    def confirm(self):
+        if not self.model.confirmed_plan().pairs:
+            QMessageBox.warning(self, "Rencana Kosong", "Tidak ada pasangan yang dicentang untuk digabungkan.")
+            return
+        self.accept()
+
+    def confirmed_plan(self):
+        return self.model.confirmed_plan()
 
 # PdfMergerApp Class
 class PdfMergerApp(QWidget):
-    def __init__(self):
+    engine_loaded_signal = pyqtSignal(str) # Pesan galat, atau string kosong bila merge_core berhasil dimuat
+
+    def __init__(self, measure_startup=False):
         super().__init__()
         self.setWindowTitle("PDF File Merger")
         self.setGeometry(100, 100, 600, 800)
 
         self.primary_folder = ""
         self.additional_folder = ""
+        self.extra_additional_folders = [] # Folder Tambahan berikutnya, berurutan setelah additional_folder
         self.last_output_folder = ""
         self.merger_thread = None
+        self.measure_startup = measure_startup
+        self._startup_pending = {'icons', 'engine'}
+        self._startup_started = False
+        self._deferred_icons = [] # (tombol, nama ikon, scale_factor) yang ikonnya dipasang di load_icons
+        self.engine_loaded_signal.connect(self.on_engine_loaded)
 
         self.blink_timer = QTimer(self)
         self.blink_timer.timeout.connect(self.reset_progress_bar_style)
 
+        self.log_flush_timer = QTimer(self)
+        self.log_flush_timer.setInterval(LOG_FLUSH_INTERVAL_MS)
+        self.log_flush_timer.timeout.connect(self.flush_pending_logs)
+
+        self._metrics_snapshot = None
+        self._metrics_received_at = 0.0
+        self.metrics_refresh_timer = QTimer(self)
+        self.metrics_refresh_timer.setInterval(METRICS_REFRESH_INTERVAL_MS)
+        self.metrics_refresh_timer.timeout.connect(self.render_metrics)
+
         self.init_ui()
 
     def init_ui(self):
@@ -313,6 +468,11 @@ class PdfMergerApp(QWidget):
                 border-radius: 10px;
                 padding: 10px;
             }
+            QFrame#metricsPanel {
+                background-color: #141414;
+                border: 1px solid #333333;
+                border-radius: 6px;
+            }
             QLabel {
                 color: #e0e0e0;
                 font-weight: bold;
@@ -449,11 +609,11 @@ class PdfMergerApp(QWidget):
         self.primary_path_display.setReadOnly(True)
         self.primary_path_display.setPlaceholderText("Pilih folder basis file PDF (wajib)...")
         primary_folder_layout.addWidget(self.primary_path_display)
-        self.primary_button = QPushButton(qta.icon('fa5s.folder-open', color='white', scale_factor=1.2), "")
+        self.primary_button = self._icon_button('fa5s.folder-open', 1.2)
         self.primary_button.setToolTip("Pilih Folder Utama")
         self.primary_button.clicked.connect(self.select_primary_folder)
         primary_folder_layout.addWidget(self.primary_button)
-        self.delete_primary_button = QPushButton(qta.icon('fa5s.trash-alt', color='white', scale_factor=1.2), "")
+        self.delete_primary_button = self._icon_button('fa5s.trash-alt', 1.2)
         self.delete_primary_button.setObjectName("deleteButton")
         self.delete_primary_button.setToolTip("Hapus Folder Utama")
         self.delete_primary_button.clicked.connect(self.delete_primary_folder)
@@ -467,11 +627,11 @@ class PdfMergerApp(QWidget):
         self.additional_path_display.setReadOnly(True)
         self.additional_path_display.setPlaceholderText("Pilih folder tambahan (wajib)...")
         additional_folder_layout.addWidget(self.additional_path_display)
-        self.additional_button = QPushButton(qta.icon('fa5s.folder-plus', color='white', scale_factor=1.2), "")
+        self.additional_button = self._icon_button('fa5s.folder-plus', 1.2)
         self.additional_button.setToolTip("Pilih Folder Tambahan")
         self.additional_button.clicked.connect(self.select_additional_folder)
         additional_folder_layout.addWidget(self.additional_button)
-        self.delete_additional_button = QPushButton(qta.icon('fa5s.trash-alt', color='white', scale_factor=1.2), "")
+        self.delete_additional_button = self._icon_button('fa5s.trash-alt', 1.2)
         self.delete_additional_button.setObjectName("deleteButton")
         self.delete_additional_button.setToolTip("Hapus Folder Tambahan")
         self.delete_additional_button.clicked.connect(self.delete_additional_folder)
@@ -479,15 +639,162 @@ class PdfMergerApp(QWidget):
         additional_folder_layout.addWidget(self.delete_additional_button)
         frame_layout.addLayout(additional_folder_layout)
 
+        extra_folders_layout = QHBoxLayout()
+        extra_folders_layout.addWidget(QLabel("Folder Sumber Lain:"))
+        self.extra_folders_display = QLineEdit()
+        self.extra_folders_display.setReadOnly(True)
+        self.extra_folders_display.setPlaceholderText("Opsional: mis. resume medis, billing, lab (berurutan)...")
+        self.extra_folders_display.setToolTip("File tambahan disisipkan per folder sesuai urutan: Folder Tambahan PDF, lalu folder-folder ini dari kiri ke kanan.")
+        extra_folders_layout.addWidget(self.extra_folders_display)
+        self.add_extra_folder_button = self._icon_button('fa5s.plus', 1.2)
+        self.add_extra_folder_button.setToolTip("Tambah Folder Sumber di urutan berikutnya")
+        self.add_extra_folder_button.clicked.connect(self.add_extra_folder)
+        extra_folders_layout.addWidget(self.add_extra_folder_button)
+        self.clear_extra_folders_button = self._icon_button('fa5s.times', 1.2)
+        self.clear_extra_folders_button.setToolTip("Kosongkan daftar Folder Sumber Lain (folder di disk tidak dihapus)")
+        self.clear_extra_folders_button.clicked.connect(self.clear_extra_folders)
+        self.clear_extra_folders_button.setEnabled(False)
+        extra_folders_layout.addWidget(self.clear_extra_folders_button)
+        extra_folders_layout.addWidget(QLabel("File Utama Ganda:"))
+        self.primary_policy_combo = QComboBox()
+        self.primary_policy_combo.addItem("Pakai satu file", "first")
+        self.primary_policy_combo.addItem("Output terpisah", "separate")
+        self.primary_policy_combo.addItem("Gabungkan semua", "combine")
+        self.primary_policy_combo.setCurrentIndex(self.primary_policy_combo.findData(DEFAULT_PRIMARY_POLICY))
+        self.primary_policy_combo.setToolTip("Bila satu prefiks memiliki beberapa File Utama (mis. x.pdf dan x_2.pdf): pakai satu file (tanpa nomor diutamakan), buat output terpisah untuk setiap File Utama, atau gabungkan semuanya ke satu output.")
+        extra_folders_layout.addWidget(self.primary_policy_combo)
+        frame_layout.addLayout(extra_folders_layout)
+
+        jobs_layout = QHBoxLayout()
+        jobs_layout.addWidget(QLabel("Jumlah Proses Paralel:"))
+        self.jobs_spinbox = QSpinBox()
+        self.jobs_spinbox.setRange(1, os.cpu_count() or 1)
+        self.jobs_spinbox.setValue(1)
+        self.jobs_spinbox.setToolTip("1 = serial. Lebih dari 1 = pasangan file digabungkan di beberapa proses sekaligus.")
+        jobs_layout.addWidget(self.jobs_spinbox)
+        jobs_layout.addWidget(QLabel("Profil Simpan:"))
+        self.save_profile_combo = QComboBox()
+        self.save_profile_combo.addItem("Cepat (file lebih besar)", "fast")
+        self.save_profile_combo.addItem("Seimbang", "balanced")
+        self.save_profile_combo.addItem("Kompresi Maksimal", "max")
+        self.save_profile_combo.setCurrentIndex(self.save_profile_combo.findData(DEFAULT_SAVE_PROFILE))
+        self.save_profile_combo.setToolTip("Waktu simpan dan ukuran output per profil ditampilkan di ringkasan proses.")
+        jobs_layout.addWidget(self.save_profile_combo)
+        jobs_layout.addWidget(QLabel("Batas Memori (MB):"))
+        self.memory_limit_spinbox = QSpinBox()
+        self.memory_limit_spinbox.setRange(0, 65536)
+        self.memory_limit_spinbox.setSingleStep(256)
+        self.memory_limit_spinbox.setSpecialValueText("Tanpa batas")
+        self.memory_limit_spinbox.setToolTip("Mode hemat memori untuk bundel klaim yang sangat besar: batas RSS per proses. Dokumen ditulis sementara ke disk saat mendekati batas.")
+        jobs_layout.addWidget(self.memory_limit_spinbox)
+        jobs_layout.addWidget(QLabel("Baca di Muka (pasangan):"))
+        self.prefetch_spinbox = QSpinBox()
+        self.prefetch_spinbox.setRange(0, 16)
+        self.prefetch_spinbox.setValue(DEFAULT_PREFETCH_PAIRS)
+        self.prefetch_spinbox.setSpecialValueText("Nonaktif")
+        self.prefetch_spinbox.setToolTip("File pasangan berikutnya dibaca ke memori di latar selagi pasangan saat ini digabungkan. Membantu bila folder berada di share jaringan.")
+        jobs_layout.addWidget(self.prefetch_spinbox)
+        jobs_layout.addWidget(QLabel("Cache Lampiran (MB):"))
+        self.attachment_cache_spinbox = QSpinBox()
+        self.attachment_cache_spinbox.setRange(0, 4096)
+        self.attachment_cache_spinbox.setSingleStep(64)
+        self.attachment_cache_spinbox.setValue(DEFAULT_ATTACHMENT_CACHE_MB)
+        self.attachment_cache_spinbox.setSpecialValueText("Nonaktif")
+        self.attachment_cache_spinbox.setToolTip("Lampiran yang disisipkan ke banyak file utama (formulir persetujuan, kop surat, lembar tarif) hanya dibuka dan diurai sekali per proses. Setiap proses paralel memiliki cache sendiri, jadi aktifkan hanya bila banyak pasangan memakai lampiran yang sama. Jumlah pemakaian ulang ditampilkan di ringkasan proses.")
+        jobs_layout.addWidget(self.attachment_cache_spinbox)
+        jobs_layout.addStretch()
+        frame_layout.addLayout(jobs_layout)
+
+        incremental_layout = QHBoxLayout()
+        self.incremental_checkbox = QCheckBox("Lewati pasangan yang tidak berubah")
+        self.incremental_checkbox.setChecked(True)
+        self.incremental_checkbox.setToolTip("Pasangan yang semua file input-nya sama dengan proses sebelumnya tidak digabungkan ulang.")
+        incremental_layout.addWidget(self.incremental_checkbox)
+        self.verify_hash_checkbox = QCheckBox("Periksa hash isi file")
+        self.verify_hash_checkbox.setToolTip("Simpan hash SHA-256 input agar file yang disalin ulang (mtime berubah, isi sama) tetap dilewati. Lebih lambat.")
+        incremental_layout.addWidget(self.verify_hash_checkbox)
+        self.streaming_checkbox = QCheckBox("Gabung sambil memindai")
+        self.streaming_checkbox.setToolTip("Mode streaming: pasangan digabungkan begitu folder klaimnya selesai dipindai. Cocok untuk share jaringan besar dengan satu subfolder per klaim.")
+        incremental_layout.addWidget(self.streaming_checkbox)
+        self.timing_report_checkbox = QCheckBox("Simpan laporan waktu")
+        self.timing_report_checkbox.setToolTip("Tulis waktu buka/sisip/simpan, jumlah halaman dan ukuran per pasangan ke JSON dan CSV di folder output.")
+        incremental_layout.addWidget(self.timing_report_checkbox)
+        self.resume_checkbox = QCheckBox("Lanjutkan proses yang terhenti")
+        self.resume_checkbox.setChecked(True)
+        self.resume_checkbox.setToolTip("Pasangan yang sudah tercatat selesai di jurnal checkpoint proses sebelumnya (ditutup, dibatalkan, atau listrik padam) tidak digabungkan ulang.")
+        incremental_layout.addWidget(self.resume_checkbox)
+        self.prevalidate_checkbox = QCheckBox("Validasi PDF dulu")
+        self.prevalidate_checkbox.setChecked(True)
+        self.prevalidate_checkbox.setToolTip("Sebelum menggabungkan, periksa semua file (header, xref/trailer, enkripsi, jumlah halaman) secara paralel. File rusak dikecualikan dan dilaporkan di awal. Hasil disimpan di cache sehingga file yang tidak berubah tidak diperiksa ulang.")
+        incremental_layout.addWidget(self.prevalidate_checkbox)
+        incremental_layout.addStretch()
+        frame_layout.addLayout(incremental_layout)
+
+        watch_layout = QHBoxLayout()
+        self.watch_checkbox = QCheckBox("Mode pantau (gabungkan otomatis saat file datang)")
+        self.watch_checkbox.setToolTip("Folder Utama dan Folder Tambahan terus dipantau setelah Mulai ditekan. Setiap klaim digabungkan begitu file-nya tidak berubah lagi selama periode tenang, sampai proses dihentikan dengan tombol Batalkan.")
+        watch_layout.addWidget(self.watch_checkbox)
+        watch_layout.addWidget(QLabel("Periode Tenang (detik):"))
+        self.watch_quiet_spinbox = QSpinBox()
+        self.watch_quiet_spinbox.setRange(1, 3600)
+        self.watch_quiet_spinbox.setValue(DEFAULT_WATCH_QUIET_SECONDS)
+        self.watch_quiet_spinbox.setToolTip("Pasangan baru digabungkan setelah semua file-nya tidak berubah selama sekian detik, agar file yang masih disalin atau dipindai tidak ikut setengah jadi.")
+        watch_layout.addWidget(self.watch_quiet_spinbox)
+        watch_layout.addStretch()
+        frame_layout.addLayout(watch_layout)
+
+        image_layout = QHBoxLayout()
+        image_layout.addWidget(QLabel("Optimasi Gambar, Maks DPI:"))
+        self.image_dpi_spinbox = QSpinBox()
+        self.image_dpi_spinbox.setRange(0, 600)
+        self.image_dpi_spinbox.setSingleStep(50)
+        self.image_dpi_spinbox.setSpecialValueText("Nonaktif")
+        self.image_dpi_spinbox.setToolTip("Gambar hasil scan di atas DPI ini diperkecil dan dikompresi ulang, dan gambar duplikat dibuang. 150 biasanya cukup untuk unggah klaim.")
+        image_layout.addWidget(self.image_dpi_spinbox)
+        image_layout.addWidget(QLabel("Kualitas JPEG:"))
+        self.image_quality_spinbox = QSpinBox()
+        self.image_quality_spinbox.setRange(10, 100)
+        self.image_quality_spinbox.setValue(DEFAULT_IMAGE_QUALITY)
+        image_layout.addWidget(self.image_quality_spinbox)
+        image_layout.addWidget(QLabel("Lampiran Duplikat:"))
+        self.dedup_combo = QComboBox()
+        self.dedup_combo.addItem("Tetap disisipkan", "off")
+        self.dedup_combo.addItem("Lewati file yang sama persis", "file")
+        self.dedup_combo.addItem("Lewati file/halaman yang sama", "page")
+        self.dedup_combo.setToolTip("File tambahan yang isinya sama (mis. x_1.pdf dan x (2).pdf) hanya disisipkan sekali. Daftar duplikat ditampilkan di ringkasan proses.")
+        image_layout.addWidget(self.dedup_combo)
+        image_layout.addWidget(QLabel("Aturan Nama:"))
+        self.match_rules_combo = QComboBox()
+        for index, (name, description) in enumerate(available_rule_sets()):
+            self.match_rules_combo.addItem(name, name)
+            self.match_rules_combo.setItemData(index, description, Qt.ItemDataRole.ToolTipRole)
+        self.match_rules_combo.setToolTip(f"Cara mencocokkan nama File Utama dan File Tambahan (mis. nomor SEP atau nomor RM). Aturan khusus rumah sakit dapat disimpan sebagai file JSON di {RULES_DIR}.")
+        image_layout.addWidget(self.match_rules_combo)
+        image_layout.addStretch()
+        frame_layout.addLayout(image_layout)
+
         button_layout = QHBoxLayout()
-        self.start_button = QPushButton(qta.icon('fa5s.play-circle', color='white', scale_factor=1.5), "")
+        self.start_button = self._icon_button('fa5s.play-circle', 1.5)
         self.start_button.setObjectName("startButton")
         self.start_button.setToolTip("Mulai Proses Penggabungan")
         self.start_button.clicked.connect(self.start_merging)
         self.start_button.setEnabled(False)
         button_layout.addWidget(self.start_button)
+
+        self.preview_button = self._icon_button('fa5s.list-alt', 1.5)
+        self.preview_button.setToolTip("Pratinjau Pasangan (pindai dan cocokkan saja, tanpa menggabungkan)")
+        self.preview_button.clicked.connect(self.preview_merging)
+        self.preview_button.setEnabled(False)
+        button_layout.addWidget(self.preview_button)
+
+        self.cancel_button = self._icon_button('fa5s.stop-circle', 1.5)
+        self.cancel_button.setObjectName("deleteButton")
+        self.cancel_button.setToolTip("Batalkan Proses (berhenti setelah pasangan yang sedang diproses selesai)")
+        self.cancel_button.clicked.connect(self.cancel_merging)
+        self.cancel_button.setEnabled(False)
+        button_layout.addWidget(self.cancel_button)
         
-        self.open_output_button = QPushButton(qta.icon('fa5s.folder-open', color='white', scale_factor=1.5), "")
+        self.open_output_button = self._icon_button('fa5s.folder-open', 1.5)
         self.open_output_button.setToolTip("Buka Folder Hasil Penggabungan")
         self.open_output_button.clicked.connect(self.open_output_folder)
         self.open_output_button.setEnabled(False)
@@ -505,6 +812,27 @@ class PdfMergerApp(QWidget):
         self.status_label.setStyleSheet("font-weight: bold; color: #888888; background: transparent; margin-top: 5px;")
         frame_layout.addWidget(self.status_label)
 
+        self.metrics_panel = QFrame()
+        self.metrics_panel.setObjectName("metricsPanel")
+        metrics_layout = QGridLayout(self.metrics_panel)
+        self.metric_value_labels = {}
+        for index, (key, title) in enumerate(METRIC_PANEL_FIELDS):
+            row, column = divmod(index, 3)
+            title_label = QLabel(f"{title}:")
+            title_label.setStyleSheet("color: #888888; font-weight: normal;")
+            metrics_layout.addWidget(title_label, row, column * 2)
+            value_label = QLabel("-")
+            metrics_layout.addWidget(value_label, row, column * 2 + 1)
+            self.metric_value_labels[key] = value_label
+        self.metrics_activity_label = QLabel("Belum ada proses berjalan.")
+        self.metrics_activity_label.setWordWrap(True)
+        self.metrics_activity_label.setStyleSheet("font-weight: normal;")
+        metrics_layout.addWidget(self.metrics_activity_label, 2, 0, 1, 6)
+        self.metrics_idle_label = QLabel("")
+        self.metrics_idle_label.setWordWrap(True)
+        metrics_layout.addWidget(self.metrics_idle_label, 3, 0, 1, 6)
+        frame_layout.addWidget(self.metrics_panel)
+
         log_label = QLabel("Log Proses:")
         log_label.setStyleSheet("font-weight: bold; margin-top: 10px; background: transparent;")
         frame_layout.addWidget(log_label)
@@ -514,6 +842,7 @@ class PdfMergerApp(QWidget):
         self.log_display.setPlaceholderText("Log proses akan muncul di sini...")
         self.log_display.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         self.log_display.setHtml("<html><body style='color:#cccccc; font-family:\"Consolas\", \"Courier New\", monospace; font-size:12px;'></body></html>")
+        self.log_display.document().setMaximumBlockCount(LOG_MAX_LINES)
         
         log_scroll_area = QScrollArea()
         log_scroll_area.setWidgetResizable(True)
@@ -536,6 +865,18 @@ class PdfMergerApp(QWidget):
             self.additional_path_display.setText(folder)
             self.update_button_states()
 
+    def add_extra_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Pilih Folder Sumber Berikutnya")
+        if folder and folder not in self.extra_additional_folders and folder != self.additional_folder:
+            self.extra_additional_folders.append(folder)
+            self.extra_folders_display.setText(" → ".join(self.extra_additional_folders))
+            self.update_button_states()
+
+    def clear_extra_folders(self):
+        self.extra_additional_folders = []
+        self.extra_folders_display.clear()
+        self.update_button_states()
+
     def delete_primary_folder(self):
         if not self.primary_folder or not os.path.isdir(self.primary_folder):
             QMessageBox.warning(self, "Error", "Folder Utama tidak valid atau tidak ada.")
@@ -579,8 +920,10 @@ class PdfMergerApp(QWidget):
         is_additional_ready = bool(self.additional_folder)
         
         self.start_button.setEnabled(is_primary_ready)
+        self.preview_button.setEnabled(is_primary_ready)
         self.delete_primary_button.setEnabled(is_primary_ready)
         self.delete_additional_button.setEnabled(is_additional_ready)
+        self.clear_extra_folders_button.setEnabled(bool(self.extra_additional_folders))
         
         if not is_primary_ready:
             self.status_label.setText("Pilih Folder Utama untuk memulai.")
@@ -589,10 +932,86 @@ class PdfMergerApp(QWidget):
         else:
             self.status_label.setText("Siap untuk memulai penggabungan.")
 
+    def reset_metrics(self):
+        self._metrics_snapshot = None
+        for label in self.metric_value_labels.values():
+            label.setText("-")
+        self.metrics_activity_label.setText("Menunggu pasangan pertama...")
+        self.metrics_idle_label.clear()
+
+    def update_metrics(self, snapshot):
+        self._metrics_snapshot = snapshot
+        self._metrics_received_at = time.monotonic()
+        self.render_metrics()
+
+    def render_metrics(self):
+        """
+        Menampilkan snapshot metrik terakhir. Di antara snapshot, durasi aktivitas dan waktu sejak pasangan terakhir
+        selesai terus bertambah (timer per detik), sehingga pasangan yang tertahan tetap terlihat.
+        """
+        snapshot = self._metrics_snapshot
+        if snapshot is None:
+            return
+        age = 0.0 if snapshot['final'] else time.monotonic() - self._metrics_received_at
+        megabyte = 1024 * 1024
+        eta = snapshot['eta_seconds']
+        memory = f"{snapshot['peak_rss_bytes'] / megabyte:.0f} MB"
+        if snapshot['rss_bytes']:
+            memory = f"{snapshot['rss_bytes'] / megabyte:.0f} MB ({memory})"
+        values = {
+            'pairs': f"{snapshot['pairs_per_second']:.2f}",
+            'pages': f"{snapshot['pages_per_second']:.1f}",
+            'eta': format_duration(max(0.0, eta - age)) if eta is not None else "-",
+            'read': f"{snapshot['read_mb_per_second']:.1f}",
+            'written': f"{snapshot['written_mb_per_second']:.1f}",
+            'memory': memory,
+        }
+        for key, text in values.items():
+            self.metric_value_labels[key].setText(text)
+
+        if snapshot['final']:
+            self.metrics_activity_label.setText(
+                f"Selesai dalam {format_duration(snapshot['elapsed_seconds'])}: {snapshot['merged_pairs']} pasangan, "
+                f"{snapshot['total_pages']} halaman, {snapshot['total_read_bytes'] / megabyte:.1f} MB dibaca, "
+                f"{snapshot['total_written_bytes'] / megabyte:.1f} MB ditulis.")
+            self.metrics_idle_label.clear()
+            return
+        active = [f"{activity['file']} ({format_duration(activity['seconds'] + age)})" for activity in snapshot['active']]
+        activity_text = f"Sedang diproses ({len(active)}/{snapshot['workers']} pekerja): {', '.join(active) if active else '-'}"
+        if snapshot['queued_count']:
+            activity_text += f"; {snapshot['queued_count']} mengantre"
+        self.metrics_activity_label.setText(activity_text)
+        idle_seconds = snapshot['seconds_since_completion'] + age
+        if active and idle_seconds >= STALL_WARNING_SECONDS:
+            self.metrics_idle_label.setStyleSheet("color: #ffaa33;")
+            self.metrics_idle_label.setText(f"Tidak ada pasangan selesai selama {format_duration(idle_seconds)}: "
+                                            f"share mungkin melambat atau pasangan tertahan.")
+        else:
+            self.metrics_idle_label.setStyleSheet("color: #888888; font-weight: normal;")
+            if snapshot['completed_pairs']:
+                self.metrics_idle_label.setText(f"Pasangan terakhir selesai {format_duration(idle_seconds)} lalu.")
+            else:
+                self.metrics_idle_label.setText(f"Belum ada pasangan selesai ({format_duration(idle_seconds)}).")
+
     def append_log(self, message):
         self.log_display.append(message)
         self.log_display.verticalScrollBar().setValue(self.log_display.verticalScrollBar().maximum())
 
+    def flush_pending_logs(self):
+        """
+        Menampilkan semua log yang tertampung di thread sekaligus, dengan satu kali repaint dan scroll.
+        """
+        if not self.merger_thread:
+            return
+        pending_logs = self.merger_thread.take_pending_logs()
+        if not pending_logs:
+            return
+        self.log_display.setUpdatesEnabled(False)
+        for message in pending_logs:
+            self.log_display.append(message)
+        self.log_display.setUpdatesEnabled(True)
+        self.log_display.verticalScrollBar().setValue(self.log_display.verticalScrollBar().maximum())
+
     def reset_progress_bar_style(self):
         self.progress_bar.setStyleSheet("""
             QProgressBar {
@@ -615,29 +1034,114 @@ class PdfMergerApp(QWidget):
             }
         """)
 
+    def _set_inputs_enabled(self, enabled):
+        for widget in (self.start_button, self.preview_button, self.primary_button, self.additional_button,
+                       self.jobs_spinbox, self.save_profile_combo, self.memory_limit_spinbox, self.image_dpi_spinbox,
+                       self.image_quality_spinbox, self.dedup_combo, self.match_rules_combo, self.prefetch_spinbox,
+                       self.attachment_cache_spinbox, self.add_extra_folder_button, self.primary_policy_combo,
+                       self.resume_checkbox, self.prevalidate_checkbox, self.incremental_checkbox, self.verify_hash_checkbox,
+                       self.streaming_checkbox, self.timing_report_checkbox, self.watch_checkbox,
+                       self.watch_quiet_spinbox):
+            widget.setEnabled(enabled)
+        self.delete_primary_button.setEnabled(enabled and bool(self.primary_folder))
+        self.delete_additional_button.setEnabled(enabled and bool(self.additional_folder))
+        self.clear_extra_folders_button.setEnabled(enabled and bool(self.extra_additional_folders))
+
+    def _create_merger_thread(self, plan=None, plan_only=False):
+        return PdfMergerThread(
+            self.primary_folder, self.additional_folder,
+            jobs=self.jobs_spinbox.value(),
+            incremental=self.incremental_checkbox.isChecked(),
+            verify_hash=self.verify_hash_checkbox.isChecked(),
+            save_profile=self.save_profile_combo.currentData(),
+            streaming=self.streaming_checkbox.isChecked(),
+            timing_report=self.timing_report_checkbox.isChecked(),
+            memory_limit_mb=self.memory_limit_spinbox.value(),
+            image_dpi=self.image_dpi_spinbox.value(),
+            image_quality=self.image_quality_spinbox.value(),
+            dedup=self.dedup_combo.currentData(),
+            prefetch_pairs=self.prefetch_spinbox.value(),
+            resume=self.resume_checkbox.isChecked(),
+            match_rules=self.match_rules_combo.currentData(),
+            prevalidate=self.prevalidate_checkbox.isChecked(),
+            attachment_cache_mb=self.attachment_cache_spinbox.value(),
+            additional_folders=[self.additional_folder] + self.extra_additional_folders,
+            primary_policy=self.primary_policy_combo.currentData(),
+            plan=plan, plan_only=plan_only,
+            watch=self.watch_checkbox.isChecked() and plan is None and not plan_only,
+            watch_quiet_seconds=self.watch_quiet_spinbox.value(),
+        )
+
     def start_merging(self):
+        self._start_merging()
+
+    def preview_merging(self):
+        """
+        Mode pratinjau: pindai dan cocokkan di thread latar, lalu tampilkan tabel rencana yang bisa disunting.
+        """
+        if not self.primary_folder:
+            QMessageBox.warning(self, "Input Error", "Silakan pilih Folder Utama PDF.")
+            return
+
+        self.log_display.clear()
+        try:
+            self.merger_thread = self._create_merger_thread(plan_only=True)
+        except ValueError as e:
+            QMessageBox.warning(self, "Opsi Penggabungan", str(e))
+            return
+
+        self._set_inputs_enabled(False)
+        self.open_output_button.setEnabled(False)
+        self.status_label.setText("Memindai dan mencocokkan file untuk pratinjau...")
+        self.merger_thread.status_signal.connect(self.status_label.setText)
+        self.merger_thread.plan_ready_signal.connect(self.on_plan_ready)
+        self.log_flush_timer.start()
+        self.merger_thread.start()
+
+    def on_plan_ready(self, plan):
+        self.log_flush_timer.stop()
+        self.flush_pending_logs()
+        self._set_inputs_enabled(True)
+        self.update_button_states()
+        if plan is None:
+            QMessageBox.critical(self, "Gagal", "Folder Utama tidak ditemukan.")
+            return
+
+        dialog = PlanDialog(plan, self)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self._start_merging(dialog.confirmed_plan())
+
+    def _start_merging(self, plan=None):
         if not self.primary_folder:
             QMessageBox.warning(self, "Input Error", "Silakan pilih Folder Utama PDF.")
             return
             
         self.log_display.clear()
         
-        self.merger_thread = PdfMergerThread(self.primary_folder, self.additional_folder)
+        try:
+            self.merger_thread = self._create_merger_thread(plan=plan)
+        except ValueError as e:
+            QMessageBox.warning(self, "Opsi Penggabungan", str(e))
+            return
         
-        self.merger_thread.merged_pairs_count = 0
-        self.merger_thread.skipped_primary_due_to_corruption = 0
-        self.merger_thread.skipped_additional_due_to_corruption = 0
-        self.merger_thread.skipped_primary_no_pair = 0
-
         self.merger_thread._log("--- Memulai Sesi Penggabungan Baru ---")
         self.merger_thread._log(f"Folder Sumber Utama: {self.primary_folder}")
         self.merger_thread._log(f"Folder Sumber Tambahan: {self.additional_folder if self.additional_folder else 'Tidak Dipilih'}")
-
-        self.start_button.setEnabled(False)
-        self.primary_button.setEnabled(False)
-        self.additional_button.setEnabled(False)
-        self.delete_primary_button.setEnabled(False)
-        self.delete_additional_button.setEnabled(False)
+        for folder in self.extra_additional_folders:
+            self.merger_thread._log(f"Folder Sumber Tambahan (berikutnya): {folder}")
+        self.merger_thread._log(f"File Utama Ganda: {self.primary_policy_combo.currentText()}")
+        self.merger_thread._log(f"Jumlah Proses Paralel: {self.jobs_spinbox.value()}")
+        self.merger_thread._log(f"Profil Simpan: {self.save_profile_combo.currentText()}")
+        self.merger_thread._log(f"Aturan Pencocokan Nama: {self.match_rules_combo.currentText()}")
+        self.merger_thread._log(f"Batas Memori per Proses: {self.memory_limit_spinbox.text()}")
+        if plan is not None:
+            self.merger_thread._log(f"Rencana Penggabungan: dikonfirmasi dari pratinjau ({len(plan.pairs)} pasangan)")
+        elif self.merger_thread.watch_daemon is not None:
+            self.merger_thread._log(f"Mode Pantau: aktif, periode tenang {self.watch_quiet_spinbox.value()} detik")
+        self.merger_thread._log(f"Log lengkap disimpan di: {os.path.join(LOG_DIR, LOG_FILENAME)}")
+
+        self._set_inputs_enabled(False)
+        self.cancel_button.setEnabled(True)
         self.open_output_button.setEnabled(False)
         self.status_label.setText("Memulai proses penggabungan...")
         self.progress_bar.setValue(0)
@@ -647,12 +1151,17 @@ class PdfMergerApp(QWidget):
 
         self.merger_thread.progress_signal.connect(self.progress_bar.setValue)
         self.merger_thread.status_signal.connect(self.status_label.setText)
-        self.merger_thread.log_signal.connect(self.append_log)
+        self.merger_thread.metrics_signal.connect(self.update_metrics)
         self.merger_thread.finished_signal.connect(self.on_merging_finished)
+        self.reset_metrics()
+        self.metrics_refresh_timer.start()
+        self.log_flush_timer.start()
         self.merger_thread.start()
         
     def on_merging_finished(self, success, message, output_folder_path):
         self.blink_timer.stop()
+        self.metrics_refresh_timer.stop()
+        self.render_metrics()
         self.last_output_folder = output_folder_path
 
         if success:
@@ -684,9 +1193,14 @@ class PdfMergerApp(QWidget):
             """)
             self.open_output_button.setEnabled(True)
         else:
-            QMessageBox.critical(self, "Gagal", message)
-            self.status_label.setText(f"Gagal: {message}")
-            self.merger_thread._log(f"--- Proses Gagal: {message} ---")
+            if self.merger_thread.cancelled:
+                QMessageBox.information(self, "Dibatalkan", message)
+                self.status_label.setText("Proses dibatalkan. Centang 'Lanjutkan proses yang terhenti' untuk meneruskan.")
+                self.merger_thread._log(f"--- Proses Dibatalkan: {message} ---")
+            else:
+                QMessageBox.critical(self, "Gagal", message)
+                self.status_label.setText(f"Gagal: {message}")
+                self.merger_thread._log(f"--- Proses Gagal: {message} ---")
             
             self.progress_bar.setStyleSheet("""
                 QProgressBar {
@@ -710,14 +1224,120 @@ class PdfMergerApp(QWidget):
             """)
             self.open_output_button.setEnabled(False)
 
-        self.start_button.setEnabled(True)
-        self.primary_button.setEnabled(True)
-        self.additional_button.setEnabled(True)
-        self.delete_primary_button.setEnabled(bool(self.primary_folder))
-        self.delete_additional_button.setEnabled(bool(self.additional_folder))
+        self._set_inputs_enabled(True)
+        self.cancel_button.setEnabled(False)
         
         self.update_button_states()
+
+        self.log_flush_timer.stop()
+        self.flush_pending_logs()
         
+    def cancel_merging(self):
+        if self.merger_thread and self.merger_thread.isRunning():
+            self.merger_thread.cancel()
+            self.cancel_button.setEnabled(False)
+            self.status_label.setText("Membatalkan... menunggu pasangan yang sedang diproses selesai.")
+
+    def closeEvent(self, event):
+        """
+        Menutup jendela saat proses berjalan: batalkan dengan bersih dan tunggu pasangan yang sedang diproses
+        selesai agar jurnal checkpoint konsisten untuk dilanjutkan nanti.
+        """
+        if self.merger_thread and self.merger_thread.isRunning():
+            reply = QMessageBox.question(
+                self, "Proses Masih Berjalan",
+                "Penggabungan masih berjalan. Batalkan dan tutup aplikasi?\n"
+                "Pasangan yang sudah selesai tercatat dan bisa dilanjutkan nanti.")
+            if reply != QMessageBox.StandardButton.Yes:
+                event.ignore()
+                return
+            self.merger_thread.cancel()
+            self.status_label.setText("Membatalkan... menunggu pasangan yang sedang diproses selesai.")
+            self.merger_thread.wait()
+        event.accept()
+
+    def _icon_button(self, icon_name, scale_factor):
+        """
+        Tombol ikon yang ikonnya baru dipasang di load_icons, setelah jendela tampil.
+        """
+        button = QPushButton("")
+        self._deferred_icons.append((button, icon_name, scale_factor))
+        return button
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self._startup_started:
+            self._startup_started = True
+            # Dijalankan dari event loop agar jendela sudah tergambar sebelum ikon dan mesin dimuat.
+            QTimer.singleShot(0, self._finish_startup)
+
+    def _finish_startup(self):
+        _mark_startup("jendela tampil")
+        threading.Thread(target=self._preload_engine, name="preload-mesin", daemon=True).start()
+        self.load_icons()
+
+    def load_icons(self):
+        for button, icon_name, scale_factor in self._deferred_icons:
+            button.setIcon(_icon(icon_name, scale_factor=scale_factor))
+        self._deferred_icons = []
+        _mark_startup("ikon dimuat")
+        self._startup_step_done('icons')
+
+    def _preload_engine(self):
+        """
+        Mengimpor merge_core (dan PyMuPDF) di thread latar agar penggabungan pertama tidak menunggu impor.
+        Bila pengguna menekan Mulai lebih dulu, impor di PdfMergerThread menunggu impor ini selesai.
+        """
+        try:
+            import merge_core # noqa: F401
+            self.engine_loaded_signal.emit("")
+        except Exception as e:
+            self.engine_loaded_signal.emit(str(e) or type(e).__name__)
+
+    def on_engine_loaded(self, error):
+        _mark_startup("mesin dimuat")
+        if error:
+            self.status_label.setText(f"Gagal memuat mesin penggabung: {error}")
+        self._startup_step_done('engine')
+
+    def _startup_step_done(self, step):
+        self._startup_pending.discard(step)
+        if self.measure_startup and not self._startup_pending:
+            QApplication.instance().exit(self.report_startup_time())
+
+    def report_startup_time(self):
+        """
+        Menulis waktu tiap tahap start ke stderr dan ke LOG_DIR/STARTUP_REPORT_FILENAME.
+        Mengembalikan kode keluar: 0 bila jendela tampil dalam STARTUP_TARGET_SECONDS, 1 bila tidak.
+        """
+        process_age = _process_age_seconds()
+        marks = dict(_startup_marks)
+        elapsed = time.perf_counter() - _STARTUP_T0
+        # Waktu sebelum _STARTUP_T0 (bootloader dan interpreter) hanya bisa dihitung dari umur proses.
+        before_script = max(0.0, process_age - elapsed) if process_age is not None else None
+        first_window = marks["jendela tampil"] + (before_script or 0.0)
+        report = {
+            'before_script_seconds': round(before_script, 3) if before_script is not None else None,
+            'marks_seconds': {label: round(seconds, 3) for label, seconds in _startup_marks},
+            'time_to_first_window_seconds': round(first_window, 3),
+            'target_seconds': STARTUP_TARGET_SECONDS,
+            'within_target': first_window < STARTUP_TARGET_SECONDS,
+            'frozen': bool(getattr(sys, 'frozen', False)),
+        }
+        if before_script is not None:
+            print(f"Sebelum skrip (bootloader + interpreter): {before_script:.3f} dtk", file=sys.stderr)
+        for label, seconds in _startup_marks:
+            print(f"{label}: {seconds:.3f} dtk", file=sys.stderr)
+        print(f"Waktu sampai jendela pertama: {first_window:.3f} dtk (target < {STARTUP_TARGET_SECONDS:.1f} dtk)",
+              file=sys.stderr)
+        try:
+            os.makedirs(LOG_DIR, exist_ok=True)
+            with open(os.path.join(LOG_DIR, STARTUP_REPORT_FILENAME), 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            print(f"Gagal menulis laporan waktu start: {e}", file=sys.stderr)
+        return 0 if report['within_target'] else 1
+
     def open_output_folder(self):
         if self.last_output_folder and os.path.exists(self.last_output_folder):
             try:
@@ -735,6 +1355,7 @@ class PdfMergerApp(QWidget):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    window = PdfMergerApp()
+    window = PdfMergerApp(measure_startup=STARTUP_MEASURE_FLAG in sys.argv[1:])
+    _mark_startup("jendela dibuat")
     window.show()
     sys.exit(app.exec())
@@ -0,0 +1,129 @@
+"""
+Rencana penggabungan (mode pratinjau / dry-run): hasil tahap pindai dan cocokkan tanpa membuka PDF sama sekali.
+
+Rencana bisa ditinjau dan diperbaiki operator (di tabel GUI atau sebagai CSV) lalu diteruskan langsung ke
+MergeEngine(plan=...) tanpa memindai ulang folder.
+
+Format CSV: satu baris per file tambahan (PLAN_CSV_FIELDS). Baris dengan primary_file kosong adalah file tambahan
+tanpa pasangan, dan baris dengan additional_file kosong adalah file utama tanpa pasangan; keduanya diabaikan saat
+rencana dibaca kecuali operator mengisi pasangannya.
+"""
+import os
+import csv
+
+PLAN_CSV_FIELDS = ['primary_file', 'order', 'additional_file', 'note']
+NOTE_NO_PAIR = "tidak ada pasangan"
+
+
+class MergePlan:
+    """
+    - pairs: daftar (file_utama, [file_tambahan, ...]) berurutan, sama seperti hasil MergeEngine._build_pairs
+    - primary_paths / additional_paths: semua file yang ditemukan saat pemindaian (untuk ringkasan file dilewati)
+    - primary_count: jumlah file utama yang bisa dipasangkan (satu per prefiks)
+    - unmatched_candidates: nama_file -> [nama_file_kandidat, ...] untuk file tanpa pasangan
+    """
+    def __init__(self, primary_folder, additional_folder, pairs, primary_paths=None, additional_paths=None,
+                 primary_count=None, unmatched_candidates=None):
+        self.primary_folder = primary_folder
+        self.additional_folder = additional_folder
+        self.pairs = [(primary, list(additionals)) for primary, additionals in pairs]
+        self.primary_paths = list(primary_paths) if primary_paths is not None else [p for p, _ in self.pairs]
+        self.additional_paths = (list(additional_paths) if additional_paths is not None
+                                 else [a for _, additionals in self.pairs for a in additionals])
+        self.primary_count = primary_count if primary_count is not None else len(self.pairs)
+        self.unmatched_candidates = dict(unmatched_candidates or {})
+
+    def paired_paths(self):
+        primaries = {primary for primary, _ in self.pairs}
+        additionals = {path for _, additionals in self.pairs for path in additionals}
+        return primaries, additionals
+
+    def unmatched_primary_paths(self):
+        primaries, _ = self.paired_paths()
+        return [path for path in self.primary_paths if path not in primaries]
+
+    def unmatched_additional_paths(self):
+        _, additionals = self.paired_paths()
+        return [path for path in self.additional_paths if path not in additionals]
+
+    def with_pairs(self, pairs):
+        """
+        Rencana baru dengan pasangan hasil suntingan operator; daftar file hasil pemindaian tetap sama.
+        """
+        return MergePlan(self.primary_folder, self.additional_folder, pairs, self.primary_paths,
+                         self.additional_paths, max(self.primary_count, len(pairs)), self.unmatched_candidates)
+
+    def rows(self):
+        """
+        Baris CSV (dict PLAN_CSV_FIELDS): pasangan dulu, lalu file utama dan file tambahan tanpa pasangan.
+        """
+        rows = []
+        for primary, additionals in self.pairs:
+            for order, additional in enumerate(additionals, start=1):
+                rows.append({'primary_file': primary, 'order': order, 'additional_file': additional, 'note': ""})
+        for path in self.unmatched_primary_paths():
+            rows.append({'primary_file': path, 'order': "", 'additional_file': "",
+                         'note': _no_pair_note(path, self.unmatched_candidates)})
+        for path in self.unmatched_additional_paths():
+            rows.append({'primary_file': "", 'order': "", 'additional_file': path,
+                         'note': _no_pair_note(path, self.unmatched_candidates)})
+        return rows
+
+    def write_csv(self, path):
+        with open(path, 'w', newline='', encoding='utf-8-sig') as f: # BOM agar Excel membaca UTF-8 dengan benar
+            writer = csv.DictWriter(f, fieldnames=PLAN_CSV_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.rows())
+
+    @classmethod
+    def from_rows(cls, primary_folder, additional_folder, rows):
+        """
+        Menyusun rencana dari baris (dict) hasil suntingan. Urutan pasangan mengikuti kemunculan pertama file utama;
+        file tambahan diurutkan berdasarkan kolom order (kosong = di akhir, urutan baris dipertahankan).
+        ValueError bila nilai order bukan angka.
+        """
+        grouped = {}
+        primary_paths = []
+        additional_paths = []
+        for line_number, row in enumerate(rows, start=2):
+            primary = (row.get('primary_file') or "").strip()
+            additional = (row.get('additional_file') or "").strip()
+            order_text = str(row.get('order') or "").strip()
+            try:
+                order = int(order_text) if order_text else None
+            except ValueError:
+                raise ValueError(f"Baris {line_number}: kolom order harus berupa angka, bukan '{order_text}'.")
+            if primary and primary not in primary_paths:
+                primary_paths.append(primary)
+            if additional and additional not in additional_paths:
+                additional_paths.append(additional)
+            if primary and additional:
+                entries = grouped.setdefault(primary, [])
+                entries.append((order is None, order or 0, len(entries), additional))
+
+        pairs = []
+        for primary in primary_paths:
+            if primary in grouped:
+                pairs.append((primary, [additional for *_, additional in sorted(grouped[primary])]))
+        return cls(primary_folder, additional_folder, pairs, primary_paths, additional_paths,
+                   primary_count=len(primary_paths))
+
+    @classmethod
+    def read_csv(cls, path, primary_folder="", additional_folder=""):
+        with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            missing = [field for field in ('primary_file', 'additional_file') if field not in (reader.fieldnames or [])]
+            if missing:
+                raise ValueError(f"File rencana '{path}' tidak memiliki kolom: {', '.join(missing)}")
+            rows = list(reader)
+        if not primary_folder:
+            first_primary = next((row['primary_file'] for row in rows if row.get('primary_file')), "")
+            primary_folder = os.path.dirname(first_primary)
+        return cls.from_rows(primary_folder, additional_folder, rows)
+
+
+def _no_pair_note(path, unmatched_candidates):
+    closest = unmatched_candidates.get(os.path.basename(path))
+    if closest:
+        return f"{NOTE_NO_PAIR}; kandidat terdekat: {', '.join(closest)}"
+    return NOTE_NO_PAIR
@@ -0,0 +1,141 @@
+"""
+Baca di muka (prefetch) file input PDF ke memori di thread latar.
+
+Folder Utama/Tambahan umumnya berada di share SMB; setiap fitz.open ke share tertahan latensi jaringan sebelum
+pekerjaan CPU dimulai. InputPrefetcher membaca file pasangan berikutnya sebagai bytes selagi pasangan saat ini
+digabungkan, lalu merge_pair membukanya dengan fitz.open(stream=...). Entri arsip ZIP didekompresi langsung
+ke memori dengan cara yang sama (lihat archives.py).
+
+Bytes yang sudah diambil (take) tetap dihitung dalam batas memori sampai pasangan selesai dan release() dipanggil,
+karena dalam mode paralel bytes itu masih ditahan oleh pekerjaan yang mengantre di pool proses.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from archives import read_bytes, stat_path
+
+DEFAULT_PREFETCH_THREADS = 4
+
+
+class InputPrefetcher:
+    """
+    Membaca file ke memori di ThreadPoolExecutor dengan batas total byte (memory_budget_bytes) yang ditahan.
+    File yang akan melewati batas tidak dibaca di muka dan nantinya dibuka langsung dari disk (dihitung meleset).
+
+    Statistik:
+    - hits: file sudah selesai dibaca saat dibutuhkan
+    - waits: file sedang dibaca saat dibutuhkan (penggabungan menunggu sisa pembacaan)
+    - misses: file tidak dibaca di muka (batas memori, gagal dibaca, atau tidak diminta)
+    """
+    def __init__(self, memory_budget_bytes, threads=DEFAULT_PREFETCH_THREADS):
+        self.memory_budget_bytes = memory_budget_bytes
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="penggabung-prefetch")
+        self._lock = threading.Lock()
+        self._futures = {}
+        self._held_bytes = 0
+        self._closed = False
+        self.hits = 0
+        self.waits = 0
+        self.misses = 0
+        self.prefetched_bytes = 0
+
+    def _load(self, path):
+        try:
+            size = stat_path(path).st_size
+        except OSError:
+            return None
+        with self._lock:
+            if self._held_bytes + size > self.memory_budget_bytes:
+                return None
+            self._held_bytes += size
+        try:
+            data = read_bytes(path)
+        except OSError:
+            self._release(size)
+            return None
+        if len(data) != size: # File berubah saat dibaca; samakan hitungan dengan isi yang ditahan.
+            self._release(size - len(data))
+        return data
+
+    def _release(self, size):
+        with self._lock:
+            self._held_bytes -= size
+
+    def _release_future(self, future):
+        if not future.cancelled() and future.result() is not None:
+            self._release(len(future.result()))
+
+    def request(self, paths):
+        """
+        Menjadwalkan pembacaan paths yang belum diminta. Diabaikan setelah close()
+        (thread pemindai mode streaming bisa masih berjalan).
+        """
+        with self._lock:
+            if self._closed:
+                return
+            for path in paths:
+                if path not in self._futures:
+                    self._futures[path] = self._executor.submit(self._load, path)
+
+    def take(self, paths):
+        """
+        Mengambil isi paths yang sudah (atau sedang) dibaca sebagai dict path -> bytes. Bytes tetap dihitung dalam
+        batas memori sampai dict itu diserahkan ke release() setelah pasangan selesai. Path yang tidak tersedia
+        tidak ada di dict dan harus dibuka dari disk.
+        """
+        found = {}
+        for path in paths:
+            with self._lock:
+                future = self._futures.pop(path, None)
+            if future is None:
+                self.misses += 1
+                continue
+            ready = future.done()
+            data = future.result()
+            if data is None:
+                self.misses += 1
+                continue
+            if ready:
+                self.hits += 1
+            else:
+                self.waits += 1
+            self.prefetched_bytes += len(data)
+            found[path] = data
+        return found
+
+    def release(self, taken):
+        """
+        Melepaskan bytes hasil take() dari hitungan memori. Aman dipanggil dari thread lain (callback Future).
+        """
+        if taken:
+            self._release(sum(len(data) for data in taken.values()))
+
+    def held_bytes(self):
+        with self._lock:
+            return self._held_bytes
+
+    def discard(self, paths):
+        """
+        Membuang hasil baca di muka untuk paths yang ternyata tidak diperlukan (mis. pasangan tidak berubah).
+        """
+        for path in paths:
+            with self._lock:
+                future = self._futures.pop(path, None)
+            if future is not None and not future.cancel():
+                future.add_done_callback(self._release_future)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            futures, self._futures = list(self._futures.values()), {}
+        for future in futures:
+            future.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'waits': self.waits,
+            'misses': self.misses,
+            'prefetched_bytes': self.prefetched_bytes,
+        }
@@ -0,0 +1,180 @@
+"""
+Pemindai folder PDF berbasis os.scandir.
+
+Setiap nama file hanya diurai satu kali oleh extract_prefix_and_number; hasilnya disimpan di PdfEntry
+dan indeks prefiks dibangun sambil memindai, tanpa os.walk atau penguraian ulang.
+Arsip ZIP di dalam folder (atau arsip yang dipilih sebagai folder) diperlakukan sebagai folder virtual;
+lihat archives.py.
+"""
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from archives import is_archive_name, is_source_folder, iter_archive_pdfs
+
+# Pola dikompilasi sekali di tingkat modul, bukan lewat re.search pada setiap pemanggilan.
+_PAREN_NUMBER_RE = re.compile(r'\s*([a-z0-9_.-]*)\((\d+)\)$')
+_UNDERSCORE_NUMBER_RE = re.compile(r'(_(\d+))$')
+_SPACE_NUMBER_RE = re.compile(r'\s(\d+)$')
+
+# Helper function to extract prefix and number from a filename
+def extract_prefix_and_number(filename):
+    """
+    Mengekstrak prefiks (nama depan) dan angka urutan dari nama file.
+    """
+    base_name = os.path.splitext(filename)[0]
+    base_name_lower = base_name.lower()
+
+    match_paren_with_char = _PAREN_NUMBER_RE.search(base_name_lower)
+    if match_paren_with_char:
+        number_str = match_paren_with_char.group(2)
+        prefix = base_name_lower[:match_paren_with_char.start()]
+        prefix = prefix.rstrip(' ')
+        return prefix, int(number_str), base_name_lower
+
+    match_underscore = _UNDERSCORE_NUMBER_RE.search(base_name_lower)
+    if match_underscore:
+        number_str = match_underscore.group(2)
+        prefix = base_name_lower[:match_underscore.start(1)]
+        return prefix, int(number_str), base_name_lower
+
+    match_space_number = _SPACE_NUMBER_RE.search(base_name_lower)
+    if match_space_number:
+        number_str = match_space_number.group(1)
+        prefix = base_name_lower[:match_space_number.start(1) - 1]
+        prefix = prefix.rstrip(' ')
+        return prefix, int(number_str), base_name_lower
+
+    return base_name_lower, None, base_name_lower
+
+# Satu file PDF hasil pemindaian beserta hasil penguraian namanya.
+PdfEntry = namedtuple('PdfEntry', ['path', 'name', 'prefix', 'number', 'original_base_name_lower'])
+
+def iter_pdf_dirs(folder, expand_archives=True):
+    """
+    Menghasilkan (folder, [(path, nama), ...]) untuk setiap folder di bawah folder, berisi file .pdf-nya,
+    dengan urutan yang sama seperti os.walk (topdown, subfolder sesuai urutan daftar direktori).
+    Setiap folder dihasilkan segera setelah isinya selesai didaftar.
+    Folder yang tidak bisa dibaca dilewati, sama seperti os.walk.
+    Dengan expand_archives, entri .pdf arsip ZIP (path virtual) didaftar bersama file .pdf folder tempat arsip
+    berada, sehingga mode streaming tidak menggabungkan klaim sebelum arsipnya ikut dibaca; tanpa itu, file ZIP
+    sendiri yang didaftar (dipakai mode pantau, yang memantau file arsipnya). folder sendiri boleh berupa arsip ZIP.
+    """
+    if is_archive_name(folder) and os.path.isfile(folder):
+        if expand_archives:
+            yield folder, iter_archive_pdfs(folder)
+        else:
+            yield os.path.dirname(folder), [(folder, os.path.basename(folder))]
+        return
+    stack = [folder]
+    while stack:
+        current = stack.pop()
+        subdirs = []
+        pdf_files = []
+        archives = []
+        try:
+            with os.scandir(current) as it:
+                for dir_entry in it:
+                    try:
+                        if dir_entry.is_dir():
+                            if not dir_entry.is_symlink(): # os.walk juga tidak mengikuti symlink folder
+                                subdirs.append(dir_entry.path)
+                        elif dir_entry.name.lower().endswith('.pdf'):
+                            pdf_files.append((dir_entry.path, dir_entry.name))
+                        elif is_archive_name(dir_entry.name):
+                            archives.append((dir_entry.path, dir_entry.name))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        for archive_path, archive_name in archives:
+            if expand_archives:
+                pdf_files.extend(iter_archive_pdfs(archive_path))
+            else:
+                pdf_files.append((archive_path, archive_name))
+        yield current, pdf_files
+        stack.extend(reversed(subdirs))
+
+def iter_pdf_files(folder):
+    """
+    Menghasilkan (path, nama) untuk setiap file .pdf di bawah folder, dengan urutan yang sama seperti os.walk.
+    """
+    for _, pdf_files in iter_pdf_dirs(folder):
+        yield from pdf_files
+
+class FolderIndex:
+    """
+    Indeks prefiks sebuah folder yang dibangun dalam satu kali pemindaian:
+    - by_prefix: prefiks -> daftar PdfEntry (dipakai untuk Folder Tambahan)
+    - primary_by_prefix: prefiks -> satu PdfEntry terpilih (dipakai untuk Folder Utama;
+      file tanpa nomor diutamakan, selain itu file pertama yang ditemukan)
+    parse_name menguraikan nama file menjadi (prefiks, nomor, nama_dasar_lower); bawaan extract_prefix_and_number.
+    File dengan prefiks None tetap tercatat tetapi tidak masuk indeks prefiks.
+    """
+    def __init__(self, folder, parse_name=extract_prefix_and_number):
+        self.folder = folder
+        self.parse_name = parse_name
+        self.entries = []
+        self.all_paths = set()
+        self.by_prefix = {}
+        self.primary_by_prefix = {}
+
+    def add(self, path, name):
+        prefix, number, original_base_name_lower = self.parse_name(name)
+        return self.add_entry(PdfEntry(path, name, prefix, number, original_base_name_lower))
+
+    def add_entry(self, entry):
+        self.entries.append(entry)
+        self.all_paths.add(entry.path)
+        if entry.prefix is None:
+            return entry
+        self.by_prefix.setdefault(entry.prefix, []).append(entry)
+
+        current_candidate = self.primary_by_prefix.get(entry.prefix)
+        if current_candidate is None or (entry.number is None and current_candidate.number is not None):
+            self.primary_by_prefix[entry.prefix] = entry
+        return entry
+
+def scan_folder(folder, parse_name=extract_prefix_and_number):
+    """
+    Memindai satu pohon folder dan mengembalikan FolderIndex-nya.
+    """
+    index = FolderIndex(folder, parse_name)
+    for path, name in iter_pdf_files(folder):
+        index.add(path, name)
+    return index
+
+def combine_indexes(indexes, folder=""):
+    """
+    Menggabungkan beberapa FolderIndex (berurutan) menjadi satu tanpa mengurai ulang nama file.
+    """
+    combined = FolderIndex(folder, indexes[0].parse_name if indexes else extract_prefix_and_number)
+    for index in indexes:
+        for entry in index.entries:
+            combined.add_entry(entry)
+    return combined
+
+def scan_folder_list(folders, concurrent=True, parse_name=extract_prefix_and_number):
+    """
+    Memindai beberapa folder, opsional secara bersamaan (satu thread per folder) karena pemindaian share jaringan
+    didominasi latensi I/O. Mengembalikan daftar FolderIndex dengan urutan yang sama seperti folders;
+    indeks kosong untuk folder yang tidak ada.
+    """
+    existing = [is_source_folder(folder) for folder in folders]
+    if concurrent and sum(existing) > 1:
+        with ThreadPoolExecutor(max_workers=len(folders)) as executor:
+            futures = [executor.submit(scan_folder, folder, parse_name) if exists else None
+                       for folder, exists in zip(folders, existing)]
+            return [future.result() if future is not None else FolderIndex(folder, parse_name)
+                    for folder, future in zip(folders, futures)]
+    return [scan_folder(folder, parse_name) if exists else FolderIndex(folder, parse_name)
+            for folder, exists in zip(folders, existing)]
+
+def scan_folders(primary_folder, additional_folder, concurrent=True, parse_name=extract_prefix_and_number):
+    """
+    Memindai Folder Utama dan Folder Tambahan (bila ada), opsional secara bersamaan di dua thread.
+    Mengembalikan (indeks_utama, indeks_tambahan); indeks_tambahan kosong bila folder tidak ada.
+    """
+    primary_index, additional_index = scan_folder_list([primary_folder, additional_folder], concurrent, parse_name)
+    return primary_index, additional_index
@@ -0,0 +1,92 @@
+"""
+Penjadwalan pasangan berdasarkan perkiraan biaya dan kemajuan berbobot.
+
+Pasangan semula diproses berurutan menurut prefiks, sehingga beberapa bundel klaim 400 halaman sering tertinggal
+di akhir dan membuat satu proses pekerja bekerja sendirian lama setelah pekerja lain selesai. Dengan beberapa
+pekerja, schedule_pairs mengurutkan pasangan dari perkiraan biaya terbesar (longest-processing-time first):
+pekerjaan besar dimulai lebih dulu dan pekerjaan kecil mengisi sisa waktu di pekerja lain.
+
+Biaya sebuah pasangan diperkirakan dari ukuran file input ditambah jumlah halaman (dari validasi awal, bila ada)
+dikali PAGE_COST_BYTES, karena waktu insert_pdf dan simpan tumbuh dengan jumlah halaman dan byte. Ukuran yang
+sudah diketahui dari validasi awal dipakai langsung; hanya file lain yang di-stat, karena di share jaringan setiap
+stat adalah satu permintaan metadata sebelum penggabungan pertama dimulai.
+Bobot yang sama dipakai WeightedProgress agar persentase kemajuan dan perkiraan sisa waktu mengikuti
+pekerjaan yang benar-benar tersisa, bukan jumlah pasangan.
+"""
+from archives import stat_path
+
+# Perkiraan kasar biaya satu halaman dalam byte setara (objek halaman, resource, dan content stream yang disalin).
+PAGE_COST_BYTES = 64 * 1024
+
+
+def estimate_pair_cost(paths, page_counts=None, sizes=None):
+    """
+    Perkiraan biaya (byte setara) satu pasangan dari ukuran file dan jumlah halaman yang diketahui.
+    sizes (path -> byte) berisi ukuran yang sudah diketahui; file lain di-stat. File yang tidak bisa di-stat
+    dihitung 0; minimal 1 agar setiap pasangan tetap berbobot.
+    """
+    cost = 0
+    for path in paths:
+        size = sizes.get(path) if sizes else None
+        if size is None:
+            try:
+                size = stat_path(path).st_size
+            except OSError:
+                size = 0
+        cost += size
+        if page_counts:
+            cost += page_counts.get(path, 0) * PAGE_COST_BYTES
+    return max(cost, 1)
+
+
+def schedule_pairs(pairs, page_counts=None, largest_first=True, sizes=None):
+    """
+    Mengembalikan (pasangan, biaya) untuk setiap pasangan. Dengan largest_first urutannya dari biaya terbesar;
+    pasangan dengan biaya sama tetap dalam urutan semula (sort stabil).
+    """
+    scheduled = [((primary, additionals), estimate_pair_cost([primary] + additionals, page_counts, sizes))
+                 for primary, additionals in pairs]
+    if largest_first:
+        scheduled.sort(key=lambda item: item[1], reverse=True)
+    return scheduled
+
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds} dtk"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes} mnt {seconds} dtk"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours} jam {minutes} mnt"
+
+
+class WeightedProgress:
+    """
+    Kemajuan berbobot per pasangan (kunci: path File Utama). Pasangan yang dilewati (tidak berubah, sudah selesai)
+    dikeluarkan dari total, sehingga perkiraan sisa waktu hanya dihitung dari pekerjaan penggabungan yang sebenarnya.
+    """
+    def __init__(self, weights):
+        self.weights = dict(weights)
+        self.total = sum(self.weights.values())
+        self.done = 0
+
+    def skip(self, key):
+        self.total -= self.weights.pop(key, 0)
+
+    def complete(self, key):
+        """
+        Menandai pasangan selesai dan mengembalikan bobotnya.
+        """
+        weight = self.weights.pop(key, 0)
+        self.done += weight
+        return weight
+
+    def remaining(self):
+        return max(0, self.total - self.done)
+
+    def fraction(self):
+        if self.total <= 0:
+            return 1.0
+        return min(1.0, self.done / self.total)
@@ -0,0 +1,64 @@
+"""
+Konstanta opsi penggabungan dan logger berkas yang dipakai bersama GUI, CLI dan MergeEngine.
+
+Modul ini sengaja tidak mengimpor fitz (PyMuPDF) maupun Qt: GUI dan CLI membutuhkan nilai bawaan ini sebelum
+mesin penggabung dimuat, sedangkan memuat PyMuPDF menambah waktu start executable (lihat penggabung.py).
+"""
+import os
+import logging
+import logging.handlers
+
+# Opsi Document.save per profil simpan. "max" adalah perilaku lama (deduplikasi penuh + tulis ulang content stream);
+# "fast" hanya membuang objek yang tidak terpakai dan menyalin stream yang sudah terkompresi apa adanya.
+SAVE_PROFILES = {
+    'fast': {'garbage': 1, 'deflate': False, 'clean': False},
+    'balanced': {'garbage': 2, 'deflate': True, 'clean': False},
+    'max': {'garbage': 4, 'deflate': True, 'clean': True},
+}
+DEFAULT_SAVE_PROFILE = 'max'
+
+DEFAULT_IMAGE_QUALITY = 75
+
+# Deduplikasi lampiran: 'file' melewati file tambahan yang isinya sama persis (SHA-256) dengan file lain di pasangan,
+# 'page' juga melewati dokumen yang semua halamannya sudah ada di hasil gabungan.
+DEDUP_MODES = ('off', 'file', 'page')
+
+# Baca di muka: jumlah pasangan berikutnya yang file-nya dibaca ke memori selagi pasangan saat ini digabungkan,
+# dan batas total byte yang boleh ditahan oleh pembacaan di muka.
+DEFAULT_PREFETCH_PAIRS = 2
+DEFAULT_PREFETCH_MEMORY_MB = 256
+
+# Kebijakan bila satu prefiks memiliki beberapa File Utama (mis. 'x.pdf' dan 'x_2.pdf'): 'first' hanya memakai satu
+# file (tanpa nomor diutamakan; perilaku lama), 'separate' membuat satu output per File Utama dengan file tambahan
+# yang sama, 'combine' menggabungkan semua File Utama (urut nomor) ke dalam satu output.
+PRIMARY_POLICIES = ('first', 'separate', 'combine')
+DEFAULT_PRIMARY_POLICY = 'first'
+
+# Cache lampiran bersama: batas ukuran file tambahan yang dokumennya tetap terbuka untuk dipakai ulang, per proses.
+# Nonaktif secara bawaan: setiap proses pekerja memiliki cache sendiri dan objek hasil urai MuPDF tidak ikut dihitung,
+# sehingga pada data tanpa lampiran bersama cache hanya menahan memori. Aktifkan (mis. 128 MB) bila banyak pasangan
+# memakai lampiran yang sama.
+DEFAULT_ATTACHMENT_CACHE_MB = 0
+
+LOG_DIR = os.path.join(os.path.expanduser("~"), ".penggabung", "logs")
+LOG_FILENAME = "penggabung.log"
+
+
+def get_file_logger(log_dir=LOG_DIR, max_bytes=5 * 1024 * 1024, backup_count=5):
+    """
+    Logger berkas berputar (RotatingFileHandler) yang menyimpan log lengkap setiap proses di disk,
+    sehingga tampilan log di UI boleh dibatasi tanpa kehilangan riwayat.
+    """
+    logger = logging.getLogger("penggabung")
+    if not logger.handlers:
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                os.path.join(log_dir, LOG_FILENAME), maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+            handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", "%Y-%m-%d %H:%M:%S"))
+        except OSError:
+            handler = logging.NullHandler()
+        logger.addHandler(handler)
+    return logger
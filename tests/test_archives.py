@@ -0,0 +1,195 @@
+import hashlib
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import archives
+from archives import open_binary, read_bytes, split_archive_path, stat_path
+
+
+@pytest.fixture(autouse=True)
+def _close_archives():
+    yield
+    archives.close_archives()
+
+
+def _corrupt_member(archive_path, member):
+    """
+    Merusak stream deflate satu entri tanpa menyentuh central directory.
+    """
+    with zipfile.ZipFile(archive_path) as archive:
+        info = archive.getinfo(member)
+    data = bytearray(open(archive_path, 'rb').read())
+    start = info.header_offset + 30 + len(info.filename.encode()) + len(info.extra)
+    for i in range(start, start + min(16, info.compress_size)):
+        data[i] ^= 0xFF
+    with open(archive_path, 'wb') as f:
+        f.write(bytes(data))
+
+
+@pytest.fixture
+def broken_archive(tmp_path):
+    archive_path = str(tmp_path / "lab.zip")
+    with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("rusak_1.pdf", b"%PDF-1.7 " + b"isi rusak " * 500)
+        archive.writestr("baik_1.pdf", b"%PDF-1.7 " + b"isi baik " * 500)
+    _corrupt_member(archive_path, "rusak_1.pdf")
+    return archive_path
+
+
+def test_read_bytes_reports_corrupt_member_as_oserror(broken_archive):
+    with pytest.raises(OSError):
+        read_bytes(os.path.join(broken_archive, "rusak_1.pdf"))
+    assert read_bytes(os.path.join(broken_archive, "baik_1.pdf")).startswith(b"%PDF-1.7 isi baik")
+
+
+def test_open_binary_reports_corrupt_member_as_oserror(broken_archive):
+    with pytest.raises(OSError):
+        with open_binary(os.path.join(broken_archive, "rusak_1.pdf")) as f:
+            while f.read(64):
+                pass
+
+
+@pytest.mark.parametrize('error', [NotImplementedError("Deflate64"), EOFError(), RuntimeError("terenkripsi")])
+def test_read_bytes_converts_decompression_errors(broken_archive, monkeypatch, error):
+    def fail(self, *args, **kwargs):
+        raise error
+    monkeypatch.setattr(zipfile.ZipFile, 'read', fail)
+    with pytest.raises(OSError):
+        read_bytes(os.path.join(broken_archive, "baik_1.pdf"))
+
+
+def test_validate_pdf_marks_corrupt_member_invalid(broken_archive):
+    from validation import validate_pdf
+    result = validate_pdf(os.path.join(broken_archive, "rusak_1.pdf"))
+    assert not result['ok']
+    assert "tidak bisa dibaca" in result['reason']
+
+
+def test_split_archive_path_member(tmp_path):
+    archive_path = str(tmp_path / "kiriman.zip")
+    with zipfile.ZipFile(archive_path, 'w') as archive:
+        archive.writestr("2024/x_1.pdf", b"%PDF-")
+    assert split_archive_path(os.path.join(archive_path, "2024", "x_1.pdf")) == (archive_path, "2024/x_1.pdf")
+    assert split_archive_path(archive_path) is None
+
+
+def test_split_archive_path_ignores_folder_named_like_archive(tmp_path):
+    folder = tmp_path / "arsip.zip"
+    folder.mkdir()
+    (folder / "x_1.pdf").write_bytes(b"%PDF-")
+    assert split_archive_path(str(folder / "x_1.pdf")) is None
+    assert stat_path(str(folder / "x_1.pdf")).st_size == 5
+
+
+def test_split_archive_path_archive_inside_folder_named_like_archive(tmp_path):
+    folder = tmp_path / "Kiriman.ZIP"
+    folder.mkdir()
+    archive_path = str(folder / "lab.zip")
+    with zipfile.ZipFile(archive_path, 'w') as archive:
+        archive.writestr("x_1.pdf", b"%PDF-")
+    assert split_archive_path(os.path.join(archive_path, "x_1.pdf")) == (archive_path, "x_1.pdf")
+
+
+def test_member_stat_uses_archive_mtime(tmp_path):
+    archive_path = str(tmp_path / "lab.zip")
+    with zipfile.ZipFile(archive_path, 'w') as archive:
+        archive.writestr("x_1.pdf", b"%PDF-1.7")
+    member_stat = stat_path(os.path.join(archive_path, "x_1.pdf"))
+    assert member_stat.st_size == 8
+    assert member_stat.st_mtime_ns == os.stat(archive_path).st_mtime_ns
+
+
+def _write_pdf(path, text):
+    from merge_core import fitz
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    doc.save(path)
+    doc.close()
+
+
+def _pdf_bytes(text):
+    from merge_core import fitz
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text * 50)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.mark.parametrize('prevalidate', [True, False])
+def test_corrupt_archive_member_does_not_stop_batch(tmp_path, prevalidate):
+    from merge_core import MergeEngine
+    primary = tmp_path / "utama"
+    additional = tmp_path / "tambahan"
+    primary.mkdir()
+    additional.mkdir()
+    _write_pdf(str(primary / "a1.pdf"), "utama a1")
+    _write_pdf(str(primary / "a2.pdf"), "utama a2")
+    archive_path = str(additional / "lab.zip")
+    with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("a1_1.pdf", _pdf_bytes("rusak"))
+        archive.writestr("a2_1.pdf", _pdf_bytes("baik"))
+    _corrupt_member(archive_path, "a1_1.pdf")
+
+    output = tmp_path / "hasil"
+    engine = MergeEngine(str(primary), str(additional), output_folder=str(output), prevalidate=prevalidate)
+    success, _, _ = engine.run()
+    assert success
+    from merge_core import fitz
+    with fitz.open(str(output / "a2.pdf")) as doc:
+        assert doc.page_count == 2
+
+
+def _inherited_handle_count(_):
+    return len(archives._open_archives)
+
+
+def _member_digest(path):
+    try:
+        return hashlib.sha256(read_bytes(path)).hexdigest()
+    except OSError as e:
+        return str(e)
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason="hanya untuk proses hasil fork")
+def test_forked_workers_do_not_share_archive_handles(tmp_path):
+    archive_path = str(tmp_path / "lab.zip")
+    members = {}
+    with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for i in range(24):
+            data = os.urandom(512 * 1024)
+            archive.writestr(f"e{i:02d}.bin", data)
+            members[os.path.join(archive_path, f"e{i:02d}.bin")] = hashlib.sha256(data).hexdigest()
+    stat_path(next(iter(members))) # Proses induk sudah membuka arsip sebelum pekerja dibuat (seperti saat memindai)
+
+    with ProcessPoolExecutor(max_workers=4, mp_context=multiprocessing.get_context('fork')) as executor:
+        assert list(executor.map(_inherited_handle_count, range(4))) == [0, 0, 0, 0]
+        digests = list(executor.map(_member_digest, members))
+    assert digests == list(members.values())
+
+
+def test_parallel_merge_reads_every_archive_member(tmp_path):
+    from merge_core import MergeEngine, fitz
+    primary = tmp_path / "utama"
+    additional = tmp_path / "tambahan"
+    primary.mkdir()
+    additional.mkdir()
+    with zipfile.ZipFile(str(additional / "lab.zip"), 'w', zipfile.ZIP_DEFLATED) as archive:
+        for i in range(16):
+            _write_pdf(str(primary / f"f{i:02d}.pdf"), f"utama {i}")
+            archive.writestr(f"f{i:02d}_1.pdf", _pdf_bytes(f"lab {i} "))
+            archive.writestr(f"f{i:02d}_2.pdf", _pdf_bytes(f"resume {i} "))
+    stat_path(os.path.join(str(additional / "lab.zip"), "f00_1.pdf"))
+
+    output = tmp_path / "hasil"
+    engine = MergeEngine(str(primary), str(additional), jobs=4, prefetch_pairs=0, output_folder=str(output))
+    success, _, _ = engine.run()
+    assert success
+    assert engine.skipped_additional_due_to_corruption == 0
+    for i in range(16):
+        with fitz.open(str(output / f"f{i:02d}.pdf")) as doc:
+            assert doc.page_count == 3
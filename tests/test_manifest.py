@@ -0,0 +1,185 @@
+import os
+import zipfile
+
+import pytest
+
+import archives
+from merge_core import MANIFEST_FILENAME, MergeJournal, MergeManifest
+
+
+@pytest.fixture
+def pair(tmp_path):
+    inputs = []
+    for name, content in (("a1.pdf", b"%PDF-utama"), ("a1_1.pdf", b"%PDF-tambahan")):
+        path = tmp_path / name
+        path.write_bytes(content)
+        inputs.append(str(path))
+    output_folder = tmp_path / "hasil"
+    output_folder.mkdir()
+    output = output_folder / "a1.pdf"
+    output.write_bytes(b"%PDF-hasil")
+    return str(output_folder), str(output), inputs
+
+
+def _touch(path, offset_ns=5_000_000_000):
+    stat_result = os.stat(path)
+    os.utime(path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + offset_ns))
+
+
+def test_recorded_pair_is_up_to_date_after_reload(pair):
+    output_folder, output, inputs = pair
+    manifest = MergeManifest(output_folder)
+    assert not manifest.is_up_to_date(output, inputs)
+    manifest.record(output, inputs)
+    manifest.save()
+    assert os.path.isfile(os.path.join(output_folder, MANIFEST_FILENAME))
+    assert MergeManifest(output_folder).is_up_to_date(output, inputs)
+
+
+@pytest.mark.parametrize('change', ['mtime', 'size', 'output', 'inputs', 'profile', 'options'])
+def test_changes_invalidate_entry(pair, change):
+    output_folder, output, inputs = pair
+    manifest = MergeManifest(output_folder)
+    manifest.record(output, inputs, save_profile='fast', output_options={'dedup': 'off'})
+    kwargs = {'save_profile': 'fast', 'output_options': {'dedup': 'off'}}
+    if change == 'mtime':
+        _touch(inputs[1])
+    elif change == 'size':
+        with open(inputs[1], 'ab') as f:
+            f.write(b"lagi")
+    elif change == 'output':
+        os.remove(output)
+    elif change == 'inputs':
+        inputs = inputs[:1]
+    elif change == 'profile':
+        kwargs['save_profile'] = 'max'
+    elif change == 'options':
+        kwargs['output_options'] = {'dedup': 'page'}
+    assert not manifest.is_up_to_date(output, inputs, **kwargs)
+
+
+def test_verify_hash_accepts_same_content_with_new_mtime(pair):
+    output_folder, output, inputs = pair
+    manifest = MergeManifest(output_folder)
+    manifest.record(output, inputs, with_hash=True)
+    manifest.save()
+    _touch(inputs[0])
+    assert not manifest.is_up_to_date(output, inputs)
+    assert manifest.is_up_to_date(output, inputs, verify_hash=True)
+    assert manifest.dirty # mtime baru dicatat agar proses berikutnya tidak meng-hash ulang
+    manifest.save()
+    assert MergeManifest(output_folder).is_up_to_date(output, inputs)
+
+
+def test_forget_and_corrupt_manifest(pair):
+    output_folder, output, inputs = pair
+    manifest = MergeManifest(output_folder)
+    manifest.record(output, inputs)
+    manifest.forget(output)
+    assert not manifest.is_up_to_date(output, inputs)
+    with open(os.path.join(output_folder, MANIFEST_FILENAME), 'w', encoding='utf-8') as f:
+        f.write("{rusak")
+    assert MergeManifest(output_folder).entries == {}
+
+
+def test_archive_member_invalidated_when_archive_changes(tmp_path):
+    archive_path = str(tmp_path / "lab.zip")
+    with zipfile.ZipFile(archive_path, 'w') as archive:
+        archive.writestr("a1_1.pdf", b"%PDF-tambahan")
+    member = os.path.join(archive_path, "a1_1.pdf")
+    output = tmp_path / "a1.pdf"
+    output.write_bytes(b"%PDF-hasil")
+    try:
+        manifest = MergeManifest(str(tmp_path))
+        manifest.record(str(output), [member])
+        assert manifest.is_up_to_date(str(output), [member])
+        _touch(archive_path)
+        assert not manifest.is_up_to_date(str(output), [member])
+    finally:
+        archives.close_archives()
+
+
+def test_journal_round_trip_ignores_truncated_line(pair):
+    output_folder, output, inputs = pair
+    manifest = MergeManifest(output_folder)
+    entry = manifest.record(output, inputs)
+
+    journal = MergeJournal(output_folder)
+    journal.open(keep_existing=False)
+    journal.record("a1.pdf", entry)
+    journal.record("a2.pdf", None)
+    journal.close()
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"output": "a3.pdf", "ent') # Baris terakhir terpotong (listrik padam saat menulis)
+
+    entries = MergeJournal(output_folder).load()
+    assert entries == {"a1.pdf": entry, "a2.pdf": None}
+
+    restored = MergeManifest(os.path.join(output_folder, "lain"))
+    restored.entries["a2.pdf"] = {'inputs': []}
+    restored.apply(entries)
+    assert restored.entries == {"a1.pdf": entry}
+    assert restored.dirty
+
+    journal.remove()
+    assert not os.path.exists(journal.path)
+
+
+def _make_pair_folders(tmp_path, count=2):
+    from merge_core import fitz
+    primary = tmp_path / "utama"
+    additional = tmp_path / "tambahan"
+    primary.mkdir()
+    additional.mkdir()
+    for i in range(count):
+        for path in (primary / f"k{i}.pdf", additional / f"k{i}_1.pdf"):
+            doc = fitz.open()
+            doc.new_page().insert_text((72, 72), path.name)
+            doc.save(str(path))
+            doc.close()
+    return primary, additional, tmp_path / "hasil"
+
+
+def test_input_changed_during_merge_is_merged_again(tmp_path, monkeypatch):
+    import merge_core
+    primary, additional, output = _make_pair_folders(tmp_path)
+    changed = str(additional / "k0_1.pdf")
+    real_merge_pair = merge_core.merge_pair
+
+    def merge_pair_while_file_changes(*args, **kwargs):
+        result = real_merge_pair(*args, **kwargs)
+        if args[0].endswith("k0.pdf"):
+            with open(changed, 'ab') as f: # Kiriman baru menimpa file selagi pasangan digabungkan
+                f.write(b"\n% revisi\n")
+            _touch(changed)
+        return result
+
+    monkeypatch.setattr(merge_core, 'merge_pair', merge_pair_while_file_changes)
+    first = merge_core.MergeEngine(str(primary), str(additional), output_folder=str(output))
+    assert first.run()[0]
+    monkeypatch.setattr(merge_core, 'merge_pair', real_merge_pair)
+
+    second = merge_core.MergeEngine(str(primary), str(additional), output_folder=str(output))
+    assert second.run()[0]
+    assert second.merged_pairs_count == 1
+    assert second.skipped_unchanged_count == 1
+
+
+def test_verify_hash_records_hashes_without_rereading_inputs(tmp_path, monkeypatch):
+    import merge_core
+    primary, additional, output = _make_pair_folders(tmp_path)
+    reads = []
+    real_sha256_file = merge_core._sha256_file
+    monkeypatch.setattr(merge_core, '_sha256_file', lambda path, *args: reads.append(path) or real_sha256_file(path, *args))
+
+    engine = merge_core.MergeEngine(str(primary), str(additional), output_folder=str(output), verify_hash=True)
+    assert engine.run()[0]
+    assert reads == [] # Hash dihitung dari isi yang dibaca di muka, bukan dengan membaca ulang file
+    manifest = MergeManifest(str(output))
+    for entry in manifest.entries.values():
+        assert all('sha256' in recorded for recorded in entry['inputs'])
+
+    _touch(str(additional / "k1_1.pdf"))
+    rerun = merge_core.MergeEngine(str(primary), str(additional), output_folder=str(output), verify_hash=True)
+    assert rerun.run()[0]
+    assert rerun.skipped_unchanged_count == 2
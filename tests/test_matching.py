@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+from matching import (BUILTIN_RULE_SETS, DEFAULT_RULE_SET, MatchRuleSet, SortedPrefixIndex, available_rule_sets,
+                      load_rule_set)
+from scanner import extract_prefix_and_number
+
+
+@pytest.mark.parametrize('filename', ["123.pdf", "123_2.pdf", "123 (3).pdf", "Budi Santoso 2.pdf",
+                                      "lab RM 1234567.pdf", "foto.pdf"])
+def test_default_rule_set_matches_extract_prefix_and_number(filename):
+    rule_set = load_rule_set(DEFAULT_RULE_SET)
+    assert rule_set.is_default
+    assert rule_set.parse(filename) == extract_prefix_and_number(filename)
+
+
+def test_awalan_preset_only_enables_starts_with():
+    rule_set = load_rule_set('awalan')
+    assert rule_set.starts_with
+    assert rule_set.parse("123_2.pdf") == ('123', 2, '123_2')
+
+
+@pytest.mark.parametrize('filename, expected', [
+    ("Resume 0301R0011117V000001.pdf", ('0301r0011117v000001', None, 'resume 0301r0011117v000001')),
+    ("SEP-0301-R001-1117-V000001_2.pdf", ('0301r0011117v000001', 2, 'sep-0301-r001-1117-v000001_2')),
+    ("123_2.pdf", ('123', 2, '123_2')), # Tanpa nomor SEP: fallback ke aturan bawaan
+])
+def test_sep_preset(filename, expected):
+    assert load_rule_set('sep').parse(filename) == expected
+
+
+@pytest.mark.parametrize('filename, expected', [
+    ("lab RM 1234567.pdf", ('1234567', None, 'lab rm 1234567')), # Akhiran angka adalah kunci, bukan nomor urut
+    ("lab rm 1234567 2.pdf", ('1234567', 2, 'lab rm 1234567 2')),
+    ("1234567 resume.pdf", ('1234567', None, '1234567 resume')),
+    ("foto.pdf", ('foto', None, 'foto')),
+])
+def test_rm_preset(filename, expected):
+    assert load_rule_set('rm').parse(filename) == expected
+
+
+def test_json_rule_file_by_name_and_path(tmp_path):
+    config = {
+        "description": "RS Contoh",
+        "normalize": {"lowercase": True, "collapse_whitespace": True, "remove_chars": "-."},
+        "rules": [{"name": "klaim", "pattern": r"klaim\s*(?P<key>\d+)(?:\s*hal\s*(?P<number>\d+))?"}],
+        "fallback": "none",
+    }
+    path = tmp_path / "rs_contoh.json"
+    path.write_text(json.dumps(config), encoding='utf-8')
+
+    by_name = load_rule_set("rs_contoh", rules_dir=str(tmp_path))
+    by_path = load_rule_set(str(path))
+    for rule_set in (by_name, by_path):
+        assert rule_set.name == "rs_contoh"
+        assert rule_set.parse("KLAIM-00123  hal 4.pdf") == ('00123', 4, 'klaim-00123  hal 4')
+        assert rule_set.parse("Klaim 77.pdf") == ('77', None, 'klaim 77')
+        assert rule_set.parse("foto.pdf") == (None, None, 'foto')
+    assert ("rs_contoh", "RS Contoh") in available_rule_sets(str(tmp_path))
+    assert [name for name, _ in available_rule_sets(str(tmp_path))][:len(BUILTIN_RULE_SETS)] == list(BUILTIN_RULE_SETS)
+
+
+def test_basename_fallback():
+    rule_set = MatchRuleSet("uji", {"rules": [{"pattern": r"x(?P<key>\d+)"}], "fallback": "basename"})
+    assert rule_set.parse("Resume Medis.pdf") == ('resume medis', None, 'resume medis')
+
+
+@pytest.mark.parametrize('config', [
+    {"fallback": "tebak"},
+    {"rules": [{"name": "rusak", "pattern": "(?P<key>"}]},
+    {"rules": [{"name": "tanpa_pola"}]},
+])
+def test_invalid_rule_set_raises_value_error(config):
+    with pytest.raises(ValueError):
+        MatchRuleSet("uji", config)
+
+
+def test_load_rule_set_errors(tmp_path):
+    with pytest.raises(ValueError):
+        load_rule_set("tidak_ada", rules_dir=str(tmp_path))
+    (tmp_path / "rusak.json").write_text("{bukan json", encoding='utf-8')
+    with pytest.raises(ValueError):
+        load_rule_set("rusak", rules_dir=str(tmp_path))
+    (tmp_path / "daftar.json").write_text("[]", encoding='utf-8')
+    with pytest.raises(ValueError):
+        load_rule_set("daftar", rules_dir=str(tmp_path))
+
+
+def test_longest_prefix_respects_word_boundaries():
+    index = SortedPrefixIndex(["123", "1234", "pasien budi", "pasien budiman", ""])
+    assert len(index) == 4
+    assert index.longest_prefix("1234 hasil lab") == "1234"
+    assert index.longest_prefix("123_lab") == "123"
+    assert index.longest_prefix("1234") == "1234"
+    assert index.longest_prefix("12345") is None # '1234' bukan awalan sampai batas kata
+    assert index.longest_prefix("pasien budiman rawat inap") == "pasien budiman"
+    assert index.longest_prefix("000") is None
+
+
+def test_closest_orders_by_similarity_then_key():
+    index = SortedPrefixIndex(["pasien budi", "pasien budiman", "pasien bude", "zaenal"])
+    assert index.closest("pasien budy") == ["pasien bude", "pasien budi"]
+    assert index.closest("pasien budy", limit=3) == ["pasien bude", "pasien budi", "pasien budiman"]
+    assert index.closest("qqqq") == []
+    assert SortedPrefixIndex([]).closest("pasien") == []
+
+
+def test_closest_searches_from_word_starts():
+    index = SortedPrefixIndex(["0301r0011117v000001", "0301r0011117v000777", "resume"])
+    assert index.closest("resume 0301r0011117v000002", limit=1) == ["0301r0011117v000001"]
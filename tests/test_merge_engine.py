@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+import merge_core
+from merge_core import MergeEngine, fitz
+
+
+def _write_pdf(path, pages=1):
+    doc = fitz.open()
+    for _ in range(pages):
+        doc.new_page().insert_text((72, 72), os.path.basename(path))
+    doc.save(path)
+    doc.close()
+
+
+@pytest.fixture
+def folders(tmp_path):
+    primary = tmp_path / "utama"
+    additional = tmp_path / "tambahan"
+    primary.mkdir()
+    additional.mkdir()
+    return primary, additional, tmp_path / "hasil"
+
+
+def _output_files(output):
+    return sorted(name for name in os.listdir(output) if name.endswith('.pdf'))
+
+
+def test_cancel_only_finishes_running_pairs(folders):
+    primary, additional, output = folders
+    for i in range(12):
+        _write_pdf(str(primary / f"k{i:02d}.pdf"), pages=20)
+        _write_pdf(str(additional / f"k{i:02d}_1.pdf"), pages=20)
+    engine = MergeEngine(str(primary), str(additional), jobs=2, output_folder=str(output))
+    merged_before_cancel = []
+    handle_merge_result = engine._handle_merge_result
+
+    def cancel_after_first(manifest, job, result):
+        handle_merge_result(manifest, job, result)
+        if not merged_before_cancel:
+            merged_before_cancel.append(job)
+            engine.cancel()
+
+    engine._handle_merge_result = cancel_after_first
+    success, _, _ = engine.run()
+    assert not success
+    # Selain pasangan yang memicu pembatalan, hanya pasangan yang sedang diproses kedua pekerja yang diselesaikan.
+    assert len(_output_files(output)) <= 1 + 2
+
+    resumed = MergeEngine(str(primary), str(additional), jobs=2, output_folder=str(output), resume=True)
+    success, _, _ = resumed.run()
+    assert success
+    assert len(_output_files(output)) == 12
+
+
+def test_memory_limit_below_current_rss_is_rejected(folders, monkeypatch):
+    primary, additional, output = folders
+    monkeypatch.setattr(merge_core, 'current_rss_bytes', lambda: 100 * 1024 * 1024)
+    with pytest.raises(ValueError):
+        MergeEngine(str(primary), str(additional), output_folder=str(output), memory_limit_mb=60)
+    MergeEngine(str(primary), str(additional), output_folder=str(output),
+                memory_limit_mb=100 + merge_core.MEMORY_LIMIT_MIN_HEADROOM_MB)
+
+
+def test_run_fails_when_every_pair_exceeds_memory_limit(folders, monkeypatch):
+    primary, additional, output = folders
+    for i in range(2):
+        _write_pdf(str(primary / f"k{i}.pdf"))
+        _write_pdf(str(additional / f"k{i}_1.pdf"))
+    engine = MergeEngine(str(primary), str(additional), output_folder=str(output), memory_limit_mb=1024)
+    monkeypatch.setattr(merge_core, 'current_rss_bytes', lambda: 4096 * 1024 * 1024)
+    success, message, _ = engine.run()
+    assert not success
+    assert engine.skipped_memory_limit == 2
+    assert "batas memori" in message
@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+import output_writer
+from merge_core import fitz
+from output_writer import PARTIAL_SUFFIX, save_atomic, write_atomic
+
+
+@pytest.fixture
+def fsynced(monkeypatch):
+    """
+    Mencatat path file yang di-fsync sebelum di-rename.
+    """
+    synced = []
+    real_fsync, real_replace = os.fsync, os.replace
+    fsync_count = []
+
+    def record_fsync(fd):
+        fsync_count.append(fd)
+        real_fsync(fd)
+
+    def record_replace(src, dst):
+        if fsync_count:
+            synced.append(src)
+        real_replace(src, dst)
+
+    monkeypatch.setattr(output_writer.os, 'fsync', record_fsync)
+    monkeypatch.setattr(output_writer.os, 'replace', record_replace)
+    return synced
+
+
+def test_write_atomic_fsyncs_before_replace(tmp_path, fsynced):
+    path = str(tmp_path / "hasil.pdf")
+    write_atomic(path, b"%PDF-1.7")
+    assert fsynced == [path + PARTIAL_SUFFIX]
+    assert open(path, 'rb').read() == b"%PDF-1.7"
+
+
+def test_save_atomic_fsyncs_before_replace(tmp_path, fsynced):
+    path = str(tmp_path / "hasil.pdf")
+    doc = fitz.open()
+    doc.new_page()
+    save_atomic(doc, path, {})
+    doc.close()
+    assert fsynced == [path + PARTIAL_SUFFIX]
+    assert not os.path.exists(path + PARTIAL_SUFFIX)
+    with fitz.open(path) as saved:
+        assert saved.page_count == 1
@@ -0,0 +1,55 @@
+import os
+import re
+
+import pytest
+
+from merge_core import MergeEngine, fitz
+
+# /ID di trailer dibuat dari waktu dan lokasi penyimpanan, sehingga selalu berbeda antar proses.
+_TRAILER_ID_RE = re.compile(rb"/ID\s*\[\s*<[0-9A-Fa-f]*>\s*<[0-9A-Fa-f]*>\s*\]")
+
+
+def _write_pdf(path, pages, label):
+    doc = fitz.open()
+    for page_number in range(pages):
+        doc.new_page().insert_text((72, 72), f"{label} halaman {page_number + 1}")
+    doc.save(path)
+    doc.close()
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    primary = tmp_path / "utama"
+    additional = tmp_path / "tambahan"
+    primary.mkdir()
+    additional.mkdir()
+    for i in range(8):
+        _write_pdf(str(primary / f"klaim{i}.pdf"), 1 + i % 3, f"utama {i}")
+        for order in range(1, 2 + i % 3):
+            _write_pdf(str(additional / f"klaim{i}_{order}.pdf"), 2, f"tambahan {i}.{order}")
+    return primary, additional
+
+
+def _outputs(folder):
+    outputs = {}
+    for name in sorted(os.listdir(folder)):
+        if name.endswith('.pdf'):
+            with open(os.path.join(folder, name), 'rb') as f:
+                outputs[name] = _TRAILER_ID_RE.sub(b"", f.read())
+    return outputs
+
+
+@pytest.mark.parametrize('save_profile', ['fast', 'max'])
+def test_parallel_output_matches_serial(corpus, tmp_path, save_profile):
+    primary, additional = corpus
+    results = {}
+    for jobs in (1, 3):
+        output = tmp_path / f"hasil_{jobs}"
+        engine = MergeEngine(str(primary), str(additional), jobs=jobs, save_profile=save_profile,
+                             output_folder=str(output))
+        success, _, _ = engine.run()
+        assert success
+        assert engine.merged_pairs_count == 8
+        results[jobs] = _outputs(str(output))
+    assert list(results[1]) == [f"klaim{i}.pdf" for i in range(8)]
+    assert results[3] == results[1]
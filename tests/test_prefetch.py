@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+from prefetch import InputPrefetcher
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for i in range(12):
+        path = tmp_path / f"f{i:02d}.pdf"
+        path.write_bytes(bytes([i]) * 1000)
+        paths.append(str(path))
+    return paths
+
+
+class _RecordingPrefetcher(InputPrefetcher):
+    """
+    Mencatat nilai tertinggi _held_bytes setiap kali hitungan berubah.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.peak_held_bytes = 0
+        self._peak_lock = threading.Lock()
+
+    def _load(self, path):
+        data = super()._load(path)
+        with self._peak_lock:
+            self.peak_held_bytes = max(self.peak_held_bytes, self.held_bytes())
+        return data
+
+
+def test_taken_bytes_stay_charged_until_released(files):
+    prefetcher = InputPrefetcher(memory_budget_bytes=2500)
+    try:
+        prefetcher.request(files[:2])
+        taken = prefetcher.take(files[:2])
+        assert set(taken) == set(files[:2])
+        assert prefetcher.held_bytes() == 2000
+
+        # Pasangan sebelumnya masih diproses: hanya sisa batas (500 byte) yang boleh dipakai, jadi file ini meleset.
+        prefetcher.request(files[2:3])
+        assert prefetcher.take(files[2:3]) == {}
+        assert prefetcher.held_bytes() == 2000
+
+        prefetcher.release(taken)
+        assert prefetcher.held_bytes() == 0
+        prefetcher.request(files[3:4])
+        assert set(prefetcher.take(files[3:4])) == {files[3]}
+    finally:
+        prefetcher.close()
+
+
+def test_held_bytes_never_exceed_budget(files):
+    budget = 3500
+    prefetcher = _RecordingPrefetcher(memory_budget_bytes=budget, threads=4)
+    in_flight = []
+    try:
+        for start in range(0, len(files), 2):
+            prefetcher.request(files[start:start + 6])
+            in_flight.append(prefetcher.take(files[start:start + 2]))
+            assert prefetcher.held_bytes() <= budget
+            if len(in_flight) > 2: # Seperti pool: pekerjaan terlama selesai dan bytes-nya dilepas
+                prefetcher.release(in_flight.pop(0))
+        for taken in in_flight:
+            prefetcher.release(taken)
+        prefetcher.discard(files)
+    finally:
+        prefetcher.close()
+    assert prefetcher.peak_held_bytes <= budget
+    assert prefetcher.stats()['hits'] + prefetcher.stats()['waits'] > 0
+    assert prefetcher.stats()['misses'] > 0
+
+
+def test_discard_releases_pending_reads(files):
+    prefetcher = InputPrefetcher(memory_budget_bytes=10_000)
+    try:
+        prefetcher.request(files[:4])
+        prefetcher.discard(files[:4])
+        prefetcher._executor.shutdown(wait=True)
+        assert prefetcher.held_bytes() == 0
+    finally:
+        prefetcher.close()
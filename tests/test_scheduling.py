@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+import scheduling
+from scheduling import PAGE_COST_BYTES, WeightedProgress, estimate_pair_cost, format_duration, schedule_pairs
+
+
+@pytest.fixture
+def no_stat(monkeypatch):
+    stat_calls = []
+
+    def fail(path):
+        stat_calls.append(path)
+        raise OSError(path)
+
+    monkeypatch.setattr(scheduling, 'stat_path', fail)
+    return stat_calls
+
+
+def test_known_sizes_are_not_stat_again(no_stat):
+    sizes = {'a.pdf': 100, 'a_1.pdf': 50}
+    assert estimate_pair_cost(['a.pdf', 'a_1.pdf'], {'a.pdf': 2}, sizes) == 150 + 2 * PAGE_COST_BYTES
+    assert no_stat == []
+    # Ukuran yang tidak diketahui di-stat; file yang tidak bisa di-stat dihitung 0 (minimal biaya 1).
+    assert estimate_pair_cost(['b.pdf'], None, sizes) == 1
+    assert no_stat == ['b.pdf']
+
+
+def test_largest_first_is_stable_lpt_order(no_stat):
+    pairs = [('a.pdf', ['a_1.pdf']), ('b.pdf', []), ('c.pdf', ['c_1.pdf']), ('d.pdf', [])]
+    sizes = {'a.pdf': 10, 'a_1.pdf': 10, 'b.pdf': 5, 'c.pdf': 100, 'c_1.pdf': 1, 'd.pdf': 20}
+    scheduled = schedule_pairs(pairs, None, True, sizes)
+    assert [pair[0] for pair, _ in scheduled] == ['c.pdf', 'a.pdf', 'd.pdf', 'b.pdf']
+    assert [cost for _, cost in scheduled] == [101, 20, 20, 5] # Biaya sama: urutan semula dipertahankan
+    assert [pair for pair, _ in schedule_pairs(pairs, None, False, sizes)] == pairs
+    assert no_stat == []
+
+
+def test_page_counts_outweigh_small_byte_differences(no_stat):
+    pairs = [('kecil.pdf', []), ('tebal.pdf', [])]
+    scheduled = schedule_pairs(pairs, {'tebal.pdf': 400}, True, {'kecil.pdf': 2_000_000, 'tebal.pdf': 1_000_000})
+    assert scheduled[0][0][0] == 'tebal.pdf'
+
+
+def test_weighted_progress():
+    progress = WeightedProgress({'a': 30, 'b': 10, 'c': 60})
+    progress.skip('b')
+    assert progress.total == 90
+    assert progress.complete('c') == 60
+    assert progress.fraction() == pytest.approx(60 / 90)
+    assert progress.remaining() == 30
+    assert progress.complete('c') == 0 # Sudah selesai: tidak dihitung dua kali
+    progress.complete('a')
+    assert progress.fraction() == 1.0
+    assert WeightedProgress({}).fraction() == 1.0
+
+
+@pytest.mark.parametrize('seconds, text', [(4.6, "5 dtk"), (75, "1 mnt 15 dtk"), (3 * 3600 + 120, "3 jam 2 mnt")])
+def test_format_duration(seconds, text):
+    assert format_duration(seconds) == text
+
+
+def test_engine_schedules_from_validation_results(tmp_path, monkeypatch):
+    from merge_core import MergeEngine, fitz
+    primary = tmp_path / "utama"
+    additional = tmp_path / "tambahan"
+    primary.mkdir()
+    additional.mkdir()
+    for name, pages in (("kecil", 1), ("besar", 6), ("sedang", 3)):
+        for path in (primary / f"{name}.pdf", additional / f"{name}_1.pdf"):
+            doc = fitz.open()
+            for _ in range(pages):
+                doc.new_page()
+            doc.save(str(path))
+            doc.close()
+
+    stat_calls = []
+    real_stat_path = scheduling.stat_path
+    monkeypatch.setattr(scheduling, 'stat_path', lambda path: stat_calls.append(path) or real_stat_path(path))
+    engine = MergeEngine(str(primary), str(additional), jobs=2, output_folder=str(tmp_path / "hasil"))
+    scheduled = []
+    schedule = engine._schedule
+    engine._schedule = lambda pairs, largest_first: scheduled.extend(schedule(pairs, largest_first)) or scheduled
+    success, _, _ = engine.run()
+    assert success
+    assert engine.schedule_order == 'largest_first'
+    assert [os.path.basename(primary_path) for primary_path, _ in scheduled] == ["besar.pdf", "sedang.pdf", "kecil.pdf"]
+    assert stat_calls == []
@@ -0,0 +1,84 @@
+"""
+Validasi awal file PDF sebelum penggabungan.
+
+File rusak sebelumnya baru ketahuan saat fitz.open/insert_pdf gagal di tengah penggabungan, setelah waktu terpakai
+untuk membuka dan menyisipkan sebagian pasangan. validate_pdf memeriksa setiap file secara ringan (header, trailer
+startxref/%%EOF, bisa dibuka sebagai PDF, enkripsi, jumlah halaman) tanpa memuat isi halaman, sehingga file rusak
+bisa dikecualikan dan dilaporkan sebelum penggabungan panjang dimulai.
+
+Hasilnya disimpan di cache per path + ukuran + mtime (lihat MergeEngine), jadi file yang tidak berubah tidak
+divalidasi ulang pada proses berikutnya.
+"""
+try:
+    import pymupdf as fitz  # PyMuPDF; modul 'fitz' versi baru mencetak peringatan deprecation ke stdout
+except ImportError:
+    import fitz  # PyMuPDF versi lama (sebelum 1.24.3)
+
+from archives import read_bytes, split_archive_path, stat_path
+
+HEADER_SCAN_BYTES = 1024 # Spesifikasi PDF mengizinkan sampah sebelum %PDF- selama masih di 1024 byte pertama
+TRAILER_SCAN_BYTES = 2048
+VALIDATION_THREADS = 8 # Didominasi latensi I/O (share jaringan), bukan CPU
+
+
+def validate_pdf(path):
+    """
+    Memvalidasi satu file PDF. Mengembalikan dict (bisa diserialisasi ke JSON untuk cache):
+    - size, mtime_ns: kunci cache
+    - ok: file bisa digabungkan; reason: alasan bila tidak
+    - page_count
+    - warning: masalah yang tidak menghalangi penggabungan (mis. trailer rusak yang diperbaiki MuPDF)
+    Mengembalikan None bila file tidak bisa di-stat (hilang); kasus ini ditangani merge_pair seperti sebelumnya.
+    """
+    try:
+        stat_result = stat_path(path)
+    except OSError:
+        return None
+    result = {'size': stat_result.st_size, 'mtime_ns': stat_result.st_mtime_ns, 'ok': False, 'reason': None,
+              'page_count': 0, 'warning': None}
+    if stat_result.st_size == 0:
+        result['reason'] = "file kosong (0 byte)"
+        return result
+
+    data = None
+    try:
+        if split_archive_path(path) is not None:
+            # Entri arsip terkompresi tidak bisa dilompati ke bagian akhir; baca sekali ke memori dan buka dari sana.
+            data = read_bytes(path)
+            head, tail = data[:HEADER_SCAN_BYTES], data[-TRAILER_SCAN_BYTES:]
+        else:
+            with open(path, 'rb') as f:
+                head = f.read(HEADER_SCAN_BYTES)
+                f.seek(max(0, stat_result.st_size - TRAILER_SCAN_BYTES))
+                tail = f.read(TRAILER_SCAN_BYTES)
+    except OSError as e:
+        result['reason'] = f"tidak bisa dibaca: {e}"
+        return result
+    if b'%PDF-' not in head:
+        result['reason'] = "bukan file PDF (header %PDF- tidak ditemukan)"
+        return result
+    trailer_ok = b'startxref' in tail and b'%%EOF' in tail
+
+    try:
+        doc = fitz.open(stream=data, filetype="pdf") if data is not None else fitz.open(path, filetype="pdf")
+    except Exception as e:
+        result['reason'] = f"tidak bisa dibuka: {e}"
+        return result
+    try:
+        if doc.needs_pass:
+            result['reason'] = "terenkripsi (memerlukan kata sandi)"
+        elif doc.page_count == 0:
+            result['reason'] = "tidak memiliki halaman"
+        else:
+            result['ok'] = True
+        result['page_count'] = doc.page_count
+        if result['ok'] and (doc.is_repaired or not trailer_ok):
+            # MuPDF membangun ulang tabel xref; file seperti ini (mis. unduhan terpotong) biasanya tetap
+            # bisa digabungkan, jadi hanya dicatat sebagai peringatan.
+            result['warning'] = "struktur xref/trailer rusak, diperbaiki otomatis saat dibuka"
+    except Exception as e:
+        result['ok'] = False
+        result['reason'] = f"struktur rusak: {e}"
+    finally:
+        doc.close()
+    return result
@@ -0,0 +1,389 @@
+"""
+Mode pantau (watch): memantau Folder Utama dan Folder Tambahan dan menggabungkan klaim begitu file-nya lengkap,
+sehingga output di "Hasil Penggabungan" terbentuk sepanjang hari, bukan dalam satu batch besar di akhir bulan.
+
+Perubahan file dideteksi dengan inotify di Linux (lewat ctypes, tanpa dependensi tambahan) dan dengan polling
+(os.scandir berkala, membandingkan ukuran + mtime) di platform lain atau bila inotify tidak tersedia, misalnya
+pada share jaringan yang tidak mengirim event. Sebuah pasangan baru digabungkan setelah semua file-nya yang berubah
+"tenang" (tidak berubah lagi) selama quiet_seconds, agar file yang masih disalin tidak ikut digabungkan setengah jadi.
+
+Setiap putaran memakai MergeEngine dengan rencana (MergePlan) yang hanya berisi pasangan yang siap, dan manifest
+penggabungan inkremental tetap mencegah pasangan yang tidak berubah digabungkan ulang.
+"""
+import os
+import sys
+import time
+import select
+import struct
+import threading
+
+from scanner import iter_pdf_dirs
+from archives import is_archive_name, is_source_folder, split_archive_path
+from plan import MergePlan
+
+DEFAULT_WATCH_QUIET_SECONDS = 60
+DEFAULT_WATCH_POLL_SECONDS = 5
+WATCH_WAKE_SECONDS = 1.0 # Interval maksimum memeriksa permintaan berhenti saat menunggu event
+
+# Konstanta inotify dari <sys/inotify.h>.
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_INOTIFY_MASK = (_IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+                 | _IN_DELETE_SELF)
+_INOTIFY_EVENT = struct.Struct('iIII')
+_INOTIFY_READ_BYTES = 64 * 1024
+
+
+def _is_watched_file(name):
+    """
+    File yang dipantau: PDF dan arsip ZIP (entri arsip berubah bersama file arsipnya).
+    """
+    return name.lower().endswith('.pdf') or is_archive_name(name)
+
+
+def _is_excluded(path, excluded_dirs):
+    return any(path == d or path.startswith(d + os.sep) for d in excluded_dirs)
+
+
+class PollingWatcher:
+    """
+    Mendeteksi perubahan dengan memindai ulang folder setiap poll_seconds (ukuran + mtime per file PDF).
+    poll() mengembalikan {path: umur_perubahan_detik} untuk file yang baru, berubah atau terhapus.
+    """
+    name = "polling"
+
+    def __init__(self, folders, poll_seconds=DEFAULT_WATCH_POLL_SECONDS, excluded_dirs=()):
+        self.folders = [f for f in folders if f]
+        self.poll_seconds = max(0.1, poll_seconds)
+        self.excluded_dirs = [os.path.normpath(d) for d in excluded_dirs if d]
+        self._snapshot = None
+        self._next_poll = 0.0
+
+    def _take_snapshot(self):
+        snapshot = {}
+        for folder in self.folders:
+            for directory, pdf_files in iter_pdf_dirs(folder, expand_archives=False):
+                if _is_excluded(os.path.normpath(directory), self.excluded_dirs):
+                    continue
+                for path, _ in pdf_files:
+                    try:
+                        stat_result = os.stat(path)
+                    except OSError:
+                        continue
+                    snapshot[path] = (stat_result.st_size, stat_result.st_mtime_ns)
+        return snapshot
+
+    def initial(self):
+        """
+        Pindaian awal: semua file yang sudah ada dilaporkan dengan umur sejak mtime-nya, sehingga file lama
+        langsung dianggap tenang dan file yang baru saja ditulis tetap menunggu periode tenang.
+        """
+        self._snapshot = self._take_snapshot()
+        self._next_poll = time.monotonic() + self.poll_seconds
+        now_ns = time.time_ns()
+        return {path: max(0.0, (now_ns - mtime_ns) / 1e9) for path, (_, mtime_ns) in self._snapshot.items()}
+
+    def poll(self, timeout, stop_event):
+        stop_event.wait(max(0.0, min(timeout, self._next_poll - time.monotonic())))
+        if stop_event.is_set() or time.monotonic() < self._next_poll:
+            return {}
+        snapshot = self._take_snapshot()
+        self._next_poll = time.monotonic() + self.poll_seconds
+        changed = {path: 0.0 for path, state in snapshot.items() if self._snapshot.get(path) != state}
+        changed.update((path, 0.0) for path in self._snapshot if path not in snapshot)
+        self._snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher(PollingWatcher):
+    """
+    Mendeteksi perubahan lewat inotify (Linux) tanpa memindai ulang folder. Setiap subfolder dipantau
+    tersendiri; subfolder baru ikut dipantau begitu dibuat. Bila antrean event kernel meluap, satu pindaian
+    polling dipakai untuk menyusul perubahan yang terlewat.
+    OSError bila inotify tidak tersedia (mis. batas max_user_watches tercapai).
+    """
+    name = "inotify"
+
+    def __init__(self, folders, poll_seconds=DEFAULT_WATCH_POLL_SECONDS, excluded_dirs=()):
+        super().__init__(folders, poll_seconds, excluded_dirs)
+        import ctypes
+        import ctypes.util
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 gagal: {os.strerror(errno)}")
+        self._ctypes = ctypes
+        self._watch_dirs = {}
+
+    def _add_watch(self, directory):
+        if _is_excluded(os.path.normpath(directory), self.excluded_dirs):
+            return
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _INOTIFY_MASK)
+        if wd < 0:
+            errno = self._ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch '{directory}' gagal: {os.strerror(errno)}")
+        self._watch_dirs[wd] = directory
+
+    def _add_tree(self, folder, changed):
+        for directory, pdf_files in iter_pdf_dirs(folder, expand_archives=False):
+            if _is_excluded(os.path.normpath(directory), self.excluded_dirs):
+                continue
+            self._add_watch(directory)
+            changed.update((path, 0.0) for path, _ in pdf_files)
+
+    def initial(self):
+        for folder in self.folders:
+            for directory, _ in iter_pdf_dirs(folder, expand_archives=False):
+                self._add_watch(directory)
+        return super().initial()
+
+    def poll(self, timeout, stop_event):
+        deadline = time.monotonic() + timeout
+        changed = {}
+        while not stop_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            readable, _, _ = select.select([self._fd], [], [], min(remaining, WATCH_WAKE_SECONDS))
+            if readable:
+                self._read_events(changed)
+                if changed:
+                    break
+        return changed
+
+    def _read_events(self, changed):
+        try:
+            data = os.read(self._fd, _INOTIFY_READ_BYTES)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _INOTIFY_EVENT.size <= len(data):
+            wd, mask, _, name_length = _INOTIFY_EVENT.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT.size
+            name = os.fsdecode(data[offset:offset + name_length].rstrip(b'\0'))
+            offset += name_length
+            if mask & _IN_Q_OVERFLOW:
+                snapshot = self._take_snapshot()
+                changed.update((path, 0.0) for path, state in snapshot.items() if self._snapshot.get(path) != state)
+                changed.update((path, 0.0) for path in self._snapshot if path not in snapshot)
+                self._snapshot = snapshot
+                continue
+            if mask & _IN_IGNORED:
+                self._watch_dirs.pop(wd, None)
+                continue
+            directory = self._watch_dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    self._add_tree(path, changed)
+            elif _is_watched_file(name):
+                changed[path] = 0.0
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(folders, poll_seconds=DEFAULT_WATCH_POLL_SECONDS, excluded_dirs=(), force_polling=False,
+                   log_callback=None):
+    """
+    InotifyWatcher di Linux, PollingWatcher di platform lain, bila force_polling, atau bila inotify gagal.
+    """
+    if not force_polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(folders, poll_seconds, excluded_dirs)
+        except (OSError, AttributeError) as e:
+            if log_callback:
+                log_callback(f"Peringatan: inotify tidak tersedia ({e}); memakai polling setiap {poll_seconds} detik.")
+    return PollingWatcher(folders, poll_seconds, excluded_dirs)
+
+
+class WatchDaemon:
+    """
+    Perulangan mode pantau. engine_factory(**opsi) membuat MergeEngine dengan pengaturan pengguna; daemon
+    memanggilnya dengan plan=... untuk menggabungkan pasangan yang siap, dan dengan log_callback=None untuk
+    pemindaian pasangan (agar log tidak dibanjiri analisis pasangan di setiap putaran).
+
+    Perubahan dicatat per path. Sebuah pasangan siap bila memuat path yang berubah dan semua path berubah di
+    pasangannya sudah tenang selama quiet_seconds. Path tenang yang tidak masuk pasangan mana pun (mis. file
+    tambahan yang file utamanya belum datang) dilupakan; pasangan itu terbentuk lagi saat file utamanya datang.
+    """
+    def __init__(self, primary_folder, additional_folder, engine_factory, match_rules,
+                 quiet_seconds=DEFAULT_WATCH_QUIET_SECONDS, poll_seconds=DEFAULT_WATCH_POLL_SECONDS,
+                 force_polling=False, output_folder=None, log_callback=None, status_callback=None,
+                 additional_folders=None):
+        self.primary_folder = primary_folder
+        self.additional_folder = additional_folder
+        self.additional_folders = [folder for folder in (additional_folders or [additional_folder]) if folder]
+        self.engine_factory = engine_factory
+        self.match_rules = match_rules
+        self.quiet_seconds = max(0.0, quiet_seconds)
+        self.poll_seconds = poll_seconds
+        self.force_polling = force_polling
+        self.output_folder = output_folder
+        self.log_callback = log_callback
+        self.status_callback = status_callback
+
+        self.cycles = 0
+        self.merged_pairs_count = 0
+        self.skipped_unchanged_count = 0
+        self.failed_cycles = 0
+        self.final_output_folder_path = ""
+        self.watcher_name = ""
+        self.engine = None # MergeEngine putaran yang sedang berjalan
+        self._pending = {} # path -> waktu monotonic perubahan terakhir
+        self._stop_event = threading.Event()
+
+    def _log(self, message):
+        if self.log_callback:
+            self.log_callback(message)
+
+    def _status(self, message):
+        if self.status_callback:
+            self.status_callback(message)
+
+    def stop(self):
+        """
+        Menghentikan mode pantau; putaran yang sedang menggabungkan dibatalkan dengan bersih. Aman dari thread lain.
+        """
+        self._stop_event.set()
+        engine = self.engine
+        if engine is not None:
+            engine.cancel()
+
+    @property
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    def _record_changes(self, changed):
+        now = time.monotonic()
+        for path, age in changed.items():
+            self._pending[path] = now - age
+
+    def _next_wait(self):
+        """
+        Detik sampai path berubah yang paling lama menjadi tenang (0 bila sudah ada yang tenang),
+        dibatasi poll_seconds.
+        """
+        if not self._pending:
+            return self.poll_seconds
+        remaining = min(self._pending.values()) + self.quiet_seconds - time.monotonic()
+        return min(self.poll_seconds, max(0.0, remaining))
+
+    def _group_key(self, path):
+        return self.match_rules.parse(os.path.basename(path))[0]
+
+    @staticmethod
+    def _changed_path(path):
+        """
+        Path yang dipantau untuk sebuah file pasangan: arsip ZIP-nya untuk entri arsip, selain itu path itu sendiri.
+        """
+        location = split_archive_path(path)
+        return location[0] if location is not None else path
+
+    def _ready_pairs(self, pairs):
+        """
+        Memilih pasangan yang siap digabungkan dan membersihkan path tenang dari _pending.
+        """
+        now = time.monotonic()
+        quiet = {path for path, t in self._pending.items() if now - t >= self.quiet_seconds}
+        # File yang terhapus tidak ada lagi di pasangan; perubahannya dipetakan ke pasangan lewat kunci prefiksnya.
+        removed_keys = {self._group_key(path) for path in quiet if not os.path.exists(path)}
+        ready = []
+        for primary, additionals in pairs:
+            paths = {self._changed_path(path) for path in [primary] + additionals}
+            pending_paths = [path for path in paths if path in self._pending]
+            touched = bool(pending_paths) or (removed_keys and self._group_key(primary) in removed_keys)
+            if touched and all(path in quiet for path in pending_paths):
+                ready.append((primary, additionals))
+        for path in quiet:
+            del self._pending[path]
+        return ready
+
+    def _scan_pairs(self):
+        return self.engine_factory(log_callback=None, status_callback=None).build_plan()
+
+    def _merge_ready(self, ready):
+        self.cycles += 1
+        self._log(f"--- Putaran Pantau #{self.cycles}: {len(ready)} pasangan siap digabungkan ---")
+        plan = MergePlan(self.primary_folder, self.additional_folder, ready)
+        self.engine = self.engine_factory(plan=plan)
+        if self._stop_event.is_set():
+            self.engine.cancel()
+        try:
+            success, message, output_folder_path = self.engine.run()
+        finally:
+            engine, self.engine = self.engine, None
+        self.merged_pairs_count += engine.merged_pairs_count
+        self.skipped_unchanged_count += engine.skipped_unchanged_count
+        if output_folder_path:
+            self.final_output_folder_path = output_folder_path
+        if not success and not engine.cancelled:
+            self.failed_cycles += 1
+            self._log(f"Putaran pantau #{self.cycles} gagal: {message}")
+
+    def run(self):
+        """
+        Memantau sampai stop() dipanggil. Mengembalikan (berhasil, pesan, folder_output) seperti MergeEngine.run.
+        """
+        if not is_source_folder(self.primary_folder):
+            self._log(f"Error: Folder Utama '{self.primary_folder}' tidak ditemukan atau bukan direktori.")
+            return False, "Folder Utama tidak ditemukan.", ""
+        folders = [self.primary_folder] + [folder for folder in self.additional_folders if is_source_folder(folder)]
+        excluded_dirs = [self.output_folder] if self.output_folder else []
+        # inotify hanya memantau folder; arsip ZIP yang dipilih langsung sebagai folder sumber dipantau lewat polling.
+        force_polling = self.force_polling or any(not os.path.isdir(folder) for folder in folders)
+        watcher = create_watcher(folders, self.poll_seconds, excluded_dirs, force_polling, self._log)
+        self.watcher_name = watcher.name
+        self._log(f"--- Mode Pantau Dimulai ({watcher.name}): pasangan digabungkan setelah tenang "
+                  f"{self.quiet_seconds:g} detik ---")
+        try:
+            self._record_changes(watcher.initial())
+            while not self._stop_event.is_set():
+                if self._pending:
+                    self._status(f"Memantau folder: {len(self._pending)} file menunggu periode tenang...")
+                else:
+                    self._status(f"Memantau folder ({watcher.name}): {self.merged_pairs_count} pasangan digabungkan "
+                                 f"sejak mode pantau dimulai.")
+                self._record_changes(watcher.poll(self._next_wait(), self._stop_event))
+                if self._stop_event.is_set() or self._next_wait() > 0:
+                    continue
+                plan = self._scan_pairs()
+                ready = self._ready_pairs(plan.pairs if plan is not None else [])
+                if ready and not self._stop_event.is_set():
+                    self._merge_ready(ready)
+        finally:
+            watcher.close()
+        message = (f"Mode pantau dihentikan: {self.merged_pairs_count} pasangan digabungkan dalam "
+                   f"{self.cycles} putaran.")
+        self._log(f"--- {message} ---")
+        return self.failed_cycles == 0, message, self.final_output_folder_path
+
+    def summary(self):
+        return {
+            'watch': True,
+            'watcher': self.watcher_name,
+            'quiet_seconds': self.quiet_seconds,
+            'cycles': self.cycles,
+            'merged_pairs': self.merged_pairs_count,
+            'skipped_unchanged': self.skipped_unchanged_count,
+            'failed_cycles': self.failed_cycles,
+            'output_folder': self.final_output_folder_path,
+        }